@@ -1,17 +1,26 @@
+from time import perf_counter
+DEBUT_CHARGEMENT = perf_counter()  # Début du chargement du module : la durée des imports est suivie dans les diagnostics
+import argparse
+import os
 import sys
-from collections import deque
-from threading import Thread
-from datetime import datetime, date
+from datetime import datetime
+from time import monotonic
+import numpy as np
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QFrame, QLabel,
-    QSplitter, QPushButton, QMenu, QTableWidget, QTableWidgetItem, QStackedWidget, QHeaderView, QGraphicsOpacityEffect
+    QSplitter, QPushButton, QMenu, QTableView, QStackedWidget, QHeaderView, QGraphicsOpacityEffect, QPlainTextEdit
 )
-from PySide6.QtGui import QAction, QIcon, QPixmap, QColor
-from PySide6.QtCore import Qt, QTimer, QPropertyAnimation
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.dates as mdates
-import serial
+from PySide6.QtGui import QAction, QActionGroup, QIcon, QPixmap, QColor
+from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QAbstractTableModel, QModelIndex, QObject, Signal
+# Réception, stockage, statistiques et journal, partagés avec le collecteur sans affichage
+from noyau_meteo import (DOSSIER_HISTORIQUE, DUREE_AFFICHEE_DEFAUT, DUREE_VUE_MAX, DUREE_VUE_MIN, FACTEUR_ZOOM,
+                         FREQUENCE_RAFRAICHISSEMENT_MAX, PERIODE_STATISTIQUES_TABLEAU, SOCKET_COLLECTEUR, STATIONS,
+                         Instrumentation, JournalBinaire, NotificateurDonnees, RechargementHistorique, ReceptionCollecteur,
+                         ReceptionDonnees, ReceptionMultiPorts, RequeteHistorique, StatistiquesGlissantes, StockageAnneau,
+                         ajouter_options_reception, creer_source, dates_mpl_vers_ns, decrire_seuil, importer_captures,
+                         ns_vers_dates_mpl, ns_vers_heure, ouvrir_port_serie)
+# matplotlib (~0,4 s) et pyserial sont importés à leur première utilisation : la fenêtre s'ouvre sans les attendre
+DUREE_IMPORTS = perf_counter() - DEBUT_CHARGEMENT
 
 class AnimatedMenu(QMenu):
     """Menu déroulant avec animation de fondu"""
@@ -44,156 +53,149 @@ class AnimatedMenu(QMenu):
         self.anim.start()
         super().showEvent(event)
         
-# Configuration du port série
-PORT_UTILISE = '/dev/ttyUSB0'  # Port série utilisé
-VITESSE = 115200  # Vitesse de communication en bauds
+class SignalDonnees(QObject):
+    """Relaie vers le thread Qt principal l'arrivée de nouvelles données."""
+    nouvelles_donnees = Signal()
 
 
-# Classe de réception de données
-class ReceptionDonnees:
-    def __init__(self, stations, donnees):
-        """Initialise la réception des données depuis le port série."""
-        self.stations = stations
+class ModeleTableau(QAbstractTableModel):
+    """Modèle du tableau : une ligne d'en-tête par station puis une ligne par variable."""
+    def __init__(self, stations, unites, donnees, statistiques=None, parent=None):
+        super().__init__(parent)
         self.donnees = donnees
-        self.ser = None
-        self.running = True
-        self.thread = Thread(target=self.reception, daemon=True)
-        self.thread.start()
-        self.station4_time = None  # Store the latest time from Station 4
-
-    def reception(self):
-        """Lit les données du port série et les stocke dans une structure de données."""
-        try:
-            self.ser = serial.Serial(PORT_UTILISE, baudrate=VITESSE, timeout=1)
-            while self.running:
-                data = self.ser.readline()
-                if data:  # Si réception de données :
-                    try:
-                        decoded_data = data.decode('utf-8').strip()
-                        dic = self.extraction_val_stations_en_dict(decoded_data)
-                        for station, (temps, valeurs) in dic.items():
-                            if station in self.stations:
-                                # If this is Station 4, update the reference time
-                                if station == "Wakanda":  # Assuming "Wakanda" is Station 4
-                                    self.station4_time = temps  # Update the reference time
-                                # Use the time from Station 4 for all stations
-                                current_time = self.station4_time if self.station4_time else temps
-                                for i, variable in enumerate(self.stations[station]):
-                                    if i < len(valeurs):
-                                        self.donnees[station][variable].append((current_time, valeurs[i]))
-                                        if len(self.donnees[station][variable]) > 50:
-                                            self.donnees[station][variable].popleft()
-                    except UnicodeDecodeError:
-                        print("Les données ne peuvent pas être décodées")
-        except serial.SerialException as e:
-            print(f"Erreur de connexion au port série: {e}")
-        finally:
-            if self.ser:
-                self.ser.close()
-
-    def extraction_val_stations_en_dict(self, chaine_carac):
-        """Convertit les données reçues en un dictionnaire organisé par station."""
-        parts = chaine_carac.split('|')[1:-1]
-        dic, station_actuel = {}, []
-        for item in parts:
-            if item == ' & ':
-                if station_actuel:
-                    # Le premier élément du dictionnaire est le numéro de la station
-                    station_num = int(station_actuel[0])
-                    # Association du numéro de la station à son nom
-                    station_nom = list(self.stations.keys())[station_num - 1]  # -1 car les indices commencent à 0
-                    # Extraction du temps (supposons que le temps est le troisième élément)
-                    temps_str = station_actuel[2]  # Exemple : "13:11:16"
-                    try:
-                        temps = datetime.strptime(temps_str.strip(), "%H:%M:%S").time()
-                        # Ajoute la date actuelle pour créer un objet datetime.datetime
-                        temps = datetime.combine(date.today(), temps)
-                    except (ValueError, AttributeError):
-                        print(f"Format de temps invalide : {temps_str}")
-                        temps = None
-                    # Stockage des données avec le temps
-                    dic[station_nom] = (temps, station_actuel[3:])  # Exemple : (13:11:16, [21.64, 46.0])
-                station_actuel = []
-            else:
-                try:
-                    # Convertir en float uniquement si c'est une valeur numérique
-                    if item.strip().replace('.', '', 1).isdigit():  # Vérifie si c'est un nombre
-                        station_actuel.append(float(item))
-                    else:
-                        station_actuel.append(item.strip())  # Conserve les chaînes de caractères
-                except ValueError:
-                    print(f"Donnée non valide ignorée: {item}")
-        if station_actuel:
-            station_num = int(station_actuel[0])
-            station_nom = list(self.stations.keys())[station_num - 1]
-            temps_str = station_actuel[2]
-            try:
-                temps = datetime.strptime(temps_str.strip(), "%H:%M:%S").time()
-                # Ajoute la date actuelle pour créer un objet datetime.datetime
-                temps = datetime.combine(date.today(), temps)
-            except (ValueError, AttributeError):
-                print(f"Format de temps invalide : {temps_str}")
-                temps = None
-            dic[station_nom] = (temps, station_actuel[3:])
-        return dic
-
-    def stop(self):
-        """Arrête le thread de réception des données."""
-        self.running = False
-        if self.thread.is_alive():
-            self.thread.join()
+        self.statistiques = statistiques
+        # Structure figée à la construction : (station, None) pour les en-têtes, (station, variable) sinon
+        self.lignes = []
+        self.unites = []
+        for station, variables in stations.items():
+            self.lignes.append((station, None))
+            self.unites.append("")
+            for variable in variables:
+                self.lignes.append((station, variable))
+                self.unites.append(unites.get(variable, "N/A"))
+        self.ligne_de = {cle: row for row, cle in enumerate(self.lignes) if cle[1] is not None}
+        self.libelles = statistiques.libelles if statistiques is not None else []  # Une colonne par fenêtre glissante
+        # Textes affichés dans les colonnes Valeur puis statistiques, et alerte en cours (ou None) par ligne
+        self.valeurs = ["N/A" if variable else "" for _, variable in self.lignes]
+        self.textes_statistiques = [["" for _ in self.libelles] for _ in self.lignes]
+        self.alertes = [None] * len(self.lignes)
+        self.lignes_statistiques = set()  # Lignes dont les statistiques ont changé depuis leur dernière mise à jour
+        self.prochaines_statistiques = 0.0
+        self.fond_station = QColor(Qt.darkGray)
+        self.texte_station = QColor(Qt.white)
+        self.fond_alerte = QColor("#8B0000")
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lignes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 4 + len(self.libelles)  # Station, Variable, Unité, Valeur, puis une par fenêtre
+
+    def data(self, index, role=Qt.DisplayRole):
+        station, variable = self.lignes[index.row()]
+        col = index.column()
+        if variable is None:  # Ligne d'en-tête de la station, avec un fond plus sombre
+            if role == Qt.DisplayRole:
+                return station if col == 0 else self.libelles[col - 4] if col >= 4 else None
+            if role == Qt.BackgroundRole:
+                return self.fond_station
+            if role == Qt.ForegroundRole:
+                return self.texte_station
+            if role == Qt.TextAlignmentRole:
+                return int(Qt.AlignCenter)
+            return None
+        if role == Qt.DisplayRole:
+            if col == 1:
+                return variable
+            if col == 2:
+                return self.unites[index.row()]
+            if col == 3:
+                return self.valeurs[index.row()]
+            if col >= 4:
+                return self.textes_statistiques[index.row()][col - 4]
+        alerte = self.alertes[index.row()]
+        if alerte is not None and col >= 3:
+            if role == Qt.BackgroundRole:
+                return self.fond_alerte
+            if role == Qt.ToolTipRole:
+                temps, valeur = alerte
+                seuil = decrire_seuil(*self.statistiques.seuils[station, variable])
+                return f"Alerte depuis {ns_vers_heure(temps)} : {valeur:g} (seuil {seuil})"
+        return None
+
+    def rafraichir(self, cles=None):
+        """Relit les dernières valeurs (des clés données, ou toutes) et signale uniquement les cellules qui ont changé.
+
+        Les colonnes de statistiques, qui portent sur une minute ou plus, sont relues au plus une fois par période.
+        """
+        lignes = self.ligne_de.values() if cles is None else [self.ligne_de[cle] for cle in cles if cle in self.ligne_de]
+        derniere_colonne = self.columnCount() - 1
+        for row in lignes:
+            station, variable = self.lignes[row]
+            valeur = self.donnees.derniere_valeur(station, variable)
+            texte = "N/A" if valeur is None else str(valeur)
+            alerte = self.statistiques.alerte(station, variable) if self.statistiques is not None else None
+            if alerte != self.alertes[row]:  # Changement d'alerte : fond de toute la ligne à repeindre
+                self.valeurs[row], self.alertes[row] = texte, alerte
+                self.dataChanged.emit(self.index(row, 3), self.index(row, derniere_colonne),
+                                      [Qt.DisplayRole, Qt.BackgroundRole, Qt.ToolTipRole])
+            elif texte != self.valeurs[row]:
+                self.valeurs[row] = texte
+                cellule = self.index(row, 3)
+                self.dataChanged.emit(cellule, cellule, [Qt.DisplayRole])
+        if self.statistiques is None:
+            return
+        self.lignes_statistiques.update(lignes)
+        if monotonic() < self.prochaines_statistiques:
+            return
+        self.prochaines_statistiques = monotonic() + PERIODE_STATISTIQUES_TABLEAU
+        resumes = {}  # Statistiques calculées une seule fois par station
+        for row in self.lignes_statistiques:
+            station, variable = self.lignes[row]
+            if station not in resumes:
+                resumes[station] = [mesure.tolist() for mesure in self.statistiques.resume(station)]
+            k = self.statistiques.index_variables[station][variable]
+            textes = [texte_statistique(*(mesure[f][k] for mesure in resumes[station])) for f in range(len(self.libelles))]
+            if textes != self.textes_statistiques[row]:
+                self.textes_statistiques[row] = textes
+                self.dataChanged.emit(self.index(row, 4), self.index(row, derniere_colonne), [Qt.DisplayRole])
+        self.lignes_statistiques.clear()
+
+
+def texte_statistique(compte, moyenne, ecart_type, minimum, maximum):
+    """Texte d'une cellule de statistiques : "moyenne ± écart type [min ; max]"."""
+    if not compte:
+        return "N/A"
+    return f"{moyenne:.4g} ± {ecart_type:.2g} [{minimum:.4g} ; {maximum:.4g}]"
 
 
 class FenetrePrincipale(QMainWindow):
-    def __init__(self):
-        """Initialise la fenêtre principale de l'application."""
+    def __init__(self, source=ouvrir_port_serie, stations=STATIONS, dossier_historique=DOSSIER_HISTORIQUE, processus=0,
+                 demarrage_rapide=False, collecteur=None):
+        """Initialise la fenêtre principale de l'application.
+
+        La réception démarre avant la construction de l'interface, l'historique étant rechargé en tâche de fond.
+        Avec `demarrage_rapide`, les pages (graphique, tableau, diagnostic) ne sont construites qu'à leur premier
+        affichage : la fenêtre s'ouvre sans attendre matplotlib.
+        Avec `collecteur` (chemin de sa socket), la fenêtre affiche les données d'un collecteur au lieu de lire `source`.
+        """
+        debut = perf_counter()
         super().__init__()
         self.setWindowTitle("Visualisation des Données Météo")
         self.setGeometry(100, 100, 800, 500)
         self.setStyleSheet("background-color: black; color: white;")
 
-        # Widget central et layout principal
-        self.central_widget = QWidget()
-        self.setCentralWidget(self.central_widget)
-        self.main_layout = QVBoxLayout(self.central_widget)
-
-        # En-tête
-        self.header = QLabel("Station Météo", self)
-        self.header.setAlignment(Qt.AlignCenter)
-        self.main_layout.addWidget(self.header)
-
-        # Widget empilé pour basculer entre les pages
-        self.stacked_widget = QStackedWidget()
-        self.main_layout.addWidget(self.stacked_widget)
-
-        # Configuration de la page du graphique
-        self.page_graphique = QWidget()
-        self.setup_page_graphique()
-        self.stacked_widget.addWidget(self.page_graphique)
-
-        # Configuration de la page du tableau
-        self.page_tableau = QWidget()
-        self.setup_page_tableau()
-        self.stacked_widget.addWidget(self.page_tableau)
-
-        # Bouton pour basculer entre les pages
-        self.btn_switch = QPushButton("Afficher le Tableau")
-        self.btn_switch.setStyleSheet("background-color: #4CAF50; color: white; font-size: 16px; padding: 10px; border-radius: 5px;")
-        self.btn_switch.clicked.connect(self.basculer_page)
-        self.main_layout.addWidget(self.btn_switch)
-
         # Initialisation des stations et des données
-        self.stations = {
-            "Rennes": ["Luminosité ☀️"],
-            "Guingamp": ["Pression(b) 🌫️", "Oxygène 🌱"],
-            "Pouillac": ["Anémomètre 🌬️"],
-            "Wakanda": ["Température 🌡️", "Humidité 💧"],
-            "Thouars": ["Température 🌡️", "Humidité 💧", "CO2 🏭"],
-            "Saint-Leu": ["Particules fines ⚪"],
-            "Perpignan": ["Particules fines ⚪", "UV", "Anémomètre 🌬️", "Température 🌡️", "Humidité 💧", "Luminosité ☀️", "Pression 🌫️", "CO2 🏭", "Girou 🌬️", "Pluie 🌧️", "Oxygène 🌱", "COV", "ECO2"],
-        }
-
-        self.donnees = {station: {variable: deque(maxlen=50) for variable in variables} for station, variables in self.stations.items()}
+        self.stations = {station: list(variables) for station, variables in stations.items()}
+
+        self.donnees = StockageAnneau(self.stations)
+        self.instrumentation = Instrumentation(self.stations)
+        self.instrumentation.demarrage["imports"] = DUREE_IMPORTS * 1000
+        self.statistiques = StatistiquesGlissantes(self.stations)
+        self.duree_affichee = DUREE_AFFICHEE_DEFAUT  # Fenêtre de temps tracée (s)
+        self.vue = None  # Fenêtre (t0, t1) en ns choisie à la souris ; None : suivi du direct
+        self.deplacement = None  # Glisser en cours : (abscisse du clic en pixels, vue au moment du clic)
+        self.forcer_limites = False
         self.active_stations = set(self.stations.keys())
 
         # Dictionnaire pour stocker les unités de chaque variable
@@ -214,24 +216,117 @@ class FenetrePrincipale(QMainWindow):
             "ECO2": "dave",
         }
 
-        # Initialisation des menus déroulants
-        self.checkboxes = {}
-        self.initialiser_menu_variables()
+        # Rafraîchissement piloté par l'arrivée des données, regroupé en au plus un par intervalle
+        self.intervalle_rafraichissement = 1.0 / FREQUENCE_RAFRAICHISSEMENT_MAX
+        self.dernier_rafraichissement = 0.0
+        self.timer_rafraichissement = QTimer()
+        self.timer_rafraichissement.setSingleShot(True)
+        self.timer_rafraichissement.timeout.connect(self.rafraichir)
+        self.signal_donnees = SignalDonnees()
+        self.signal_donnees.nouvelles_donnees.connect(self.planifier_rafraichissement)
+        self.notificateur = NotificateurDonnees(self.signal_donnees.nouvelles_donnees.emit)
+        self.instrumentation.files["notifications"] = self.notificateur.file
+        # Zoom et déplacement : au plus un tracé par passage dans la boucle d'évènements
+        self.timer_vue = QTimer()
+        self.timer_vue.setSingleShot(True)
+        self.timer_vue.timeout.connect(self.maj_graphique)
+
+        if collecteur is not None:
+            # Client d'un collecteur : historique, réception et journal sont chez lui ; ses anneaux sont relus
+            self.journal = self.rechargement = None
+            self.reception_donnees = ReceptionCollecteur(self.stations, self.donnees, self.notificateur, collecteur,
+                                                         self.instrumentation, self.statistiques)
+        else:
+            self.demarrer_reception(source, dossier_historique, processus)
+        # Fenêtres plus anciennes que les anneaux : lues dans le journal par son index
+        self.historique = RequeteHistorique(self.donnees, dossier_historique)
 
-        # Configuration des timers
-        self.timer_graphique = QTimer()
-        self.timer_graphique.timeout.connect(self.maj_graphique)
-        self.timer_graphique.start(2000)  # Fréquence de mise à jour du graph
+        # Widget central et layout principal
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        self.main_layout = QVBoxLayout(self.central_widget)
 
-        self.timer_tableau = QTimer()
-        self.timer_tableau.timeout.connect(self.maj_tableau)
-        self.timer_tableau.start(2000)  # Fréquence de mise à jour du tableau
+        # En-tête
+        self.header = QLabel("Station Météo", self)
+        self.header.setAlignment(Qt.AlignCenter)
+        self.main_layout.addWidget(self.header)
 
-        # Démarrage de la réception des données
-        self.reception_donnees = ReceptionDonnees(self.stations, self.donnees)
+        # Widget empilé pour basculer entre les pages
+        self.stacked_widget = QStackedWidget()
+        self.main_layout.addWidget(self.stacked_widget)
+
+        # Pages du graphique, du tableau et de diagnostic, construites maintenant ou à leur premier affichage
+        self.page_graphique = QWidget()
+        self.page_tableau = QWidget()
+        self.page_diagnostics = QWidget()
+        self.pages_a_construire = {self.page_graphique: self.setup_page_graphique, self.page_tableau: self.setup_page_tableau,
+                                   self.page_diagnostics: self.setup_page_diagnostics}
+        for page in self.pages_a_construire:
+            self.stacked_widget.addWidget(page)
+        if not demarrage_rapide:
+            for page in list(self.pages_a_construire):
+                self.construire_page(page)
+
+        # Boutons pour basculer entre les pages
+        self.boutons_pages = QHBoxLayout()
+        self.btn_switch = QPushButton("Afficher le Tableau")
+        self.btn_switch.setStyleSheet("background-color: #4CAF50; color: white; font-size: 16px; padding: 10px; border-radius: 5px;")
+        self.btn_switch.clicked.connect(self.basculer_page)
+        self.boutons_pages.addWidget(self.btn_switch, 3)
+        self.btn_diagnostics = QPushButton("Diagnostics")
+        self.btn_diagnostics.setStyleSheet("background-color: #555555; color: white; font-size: 16px; padding: 10px; border-radius: 5px;")
+        self.btn_diagnostics.clicked.connect(self.afficher_diagnostics)
+        self.boutons_pages.addWidget(self.btn_diagnostics, 1)
+        self.main_layout.addLayout(self.boutons_pages)
+        self.instrumentation.demarrage["fenetre"] = (perf_counter() - debut) * 1000
+
+    def demarrer_reception(self, source, dossier_historique, processus):
+        """Démarre la journalisation et la réception des nouvelles données ; l'historique enregistré est rechargé
+        en tâche de fond, la réception range ses trames à sa suite et la fenêtre s'ouvre sans l'attendre."""
+        self.rechargement = RechargementHistorique(self.stations, self.donnees, self.statistiques, dossier_historique,
+                                                   self.notificateur, self.instrumentation)
+        self.journal = JournalBinaire(self.stations, dossier_historique)
+        self.instrumentation.files["journal"] = self.journal.file
+
+        # Une liste d'adresses (ou le décodage délégué) passe par le moteur multi-ports
+        if processus and not isinstance(source, (list, tuple)):
+            source = [source]
+        if isinstance(source, (list, tuple)):
+            self.reception_donnees = ReceptionMultiPorts(self.stations, self.donnees, self.notificateur, self.journal, source,
+                                                         self.instrumentation, processus, self.statistiques,
+                                                         self.rechargement)
+        else:
+            self.reception_donnees = ReceptionDonnees(self.stations, self.donnees, self.notificateur, self.journal, source,
+                                                      self.instrumentation, self.statistiques, self.rechargement)
+
+    def construire_page(self, page):
+        """Construit une page qui ne l'est pas encore (démarrage rapide) et note la durée de sa construction."""
+        construction = self.pages_a_construire.pop(page, None)
+        if construction is None:
+            return
+        debut = perf_counter()
+        construction()
+        self.instrumentation.demarrage[construction.__name__.replace("setup_", "")] = (perf_counter() - debut) * 1000
+
+    def paintEvent(self, event):
+        """Au premier dessin de la fenêtre, note le temps de démarrage et programme la construction du graphique s'il est différé."""
+        super().paintEvent(event)
+        if "affichage" not in self.instrumentation.demarrage:
+            self.instrumentation.demarrage["affichage"] = (perf_counter() - DEBUT_CHARGEMENT) * 1000
+            if self.page_graphique in self.pages_a_construire:
+                QTimer.singleShot(0, self.afficher_graphique)  # Après ce dessin : la fenêtre est déjà à l'écran
+
+    def afficher_graphique(self):
+        """Construit la page du graphique au besoin et trace les données déjà reçues."""
+        if self.page_graphique in self.pages_a_construire:
+            self.construire_page(self.page_graphique)
+            self.maj_graphique()
 
     def setup_page_graphique(self):
         """Configure la page du graphique avec un graphique en temps réel et des boutons de contrôle."""
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        import matplotlib.dates as mdates
         layout = QVBoxLayout(self.page_graphique)
         self.splitter = QSplitter(Qt.Horizontal)
         self.splitter.setHandleWidth(0)
@@ -246,7 +341,29 @@ class FenetrePrincipale(QMainWindow):
         self.ax.set_title("Données en Temps Réel", color="white")
         self.ax.set_facecolor("black")
         self.ax.tick_params(colors="white")
+        self.ax.grid(True, which='both', axis='both', color='white', linestyle='--', linewidth=0.5)
+        # Graduations de l'axe des temps adaptées à l'étendue affichée, de la seconde à la semaine
+        localisateur = mdates.AutoDateLocator(minticks=3, maxticks=7)
+        self.ax.xaxis.set_major_locator(localisateur)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(localisateur))
+        debut = mdates.date2num(datetime.now())
+        self.ax.set_xlim(debut, debut + 60 / 86400)
+        self.texte_vide = self.ax.text(0.5, 0.5, "Aucune donnée disponible", color="white", ha="center", va="center", transform=self.ax.transAxes)
         self.graph_layout.addWidget(self.canvas)
+
+        # Artistes persistants : une courbe par (station, variable) cochée, mise à jour avec set_data
+        self.lignes = {}
+        self.legende = None
+        self.fond_legende = None  # Pixels de la légende, recollés par-dessus les courbes
+        self.compteurs_traces = {}  # Compteurs du stockage lors du dernier tracé
+        self.fond = None  # Fond de l'axe (sans les courbes) pour le blitting
+        self.canvas.mpl_connect('draw_event', self.memoriser_fond)
+        # Navigation dans l'historique : molette pour zoomer, glisser pour se déplacer, double-clic pour revenir au direct
+        self.canvas.setToolTip("Molette : zoom — glisser : déplacement — double-clic : retour au direct")
+        self.canvas.mpl_connect('scroll_event', self.zoomer)
+        self.canvas.mpl_connect('button_press_event', self.debut_deplacement)
+        self.canvas.mpl_connect('motion_notify_event', self.deplacer)
+        self.canvas.mpl_connect('button_release_event', self.fin_deplacement)
         self.splitter.addWidget(self.graph_frame)
 
         # Cadre pour les boutons de sélection
@@ -275,6 +392,12 @@ class FenetrePrincipale(QMainWindow):
         ) 
         self.btn_variables.clicked.connect(self.afficher_variables)
         self.selection_layout.addWidget(self.btn_variables)
+
+        # Bouton pour choisir la durée affichée
+        self.btn_duree = QPushButton("Durée affichée")
+        self.btn_duree.setStyleSheet(self.btn_variables.styleSheet())
+        self.btn_duree.clicked.connect(self.afficher_durees)
+        self.selection_layout.addWidget(self.btn_duree)
         
         # Bouton de réinitialisation
         self.btn_reset = QPushButton("Réinitialiser")
@@ -323,47 +446,56 @@ class FenetrePrincipale(QMainWindow):
         self.splitter.addWidget(self.selection_frame)
         self.splitter.setSizes([500, 250])
 
+        # Initialisation des menus déroulants
+        self.initialiser_menu_variables()
+        self.initialiser_menu_duree()
+
     def setup_page_tableau(self):
         """Configure la page du tableau pour afficher les données sous forme de tableau."""
         layout = QVBoxLayout(self.page_tableau)
-        self.tableau = QTableWidget()
-        self.tableau.setColumnCount(4)  # Ajout d'une colonne pour les unités
-        self.tableau.setHorizontalHeaderLabels(["Station", "Variable", "Unité", "Valeur"])
+        self.modele_tableau = ModeleTableau(self.stations, self.unites, self.donnees, self.statistiques, self)
+        self.tableau = QTableView()
+        self.tableau.setModel(self.modele_tableau)
 
         # Désactiver l'affichage des en-têtes de colonnes et de lignes
         self.tableau.verticalHeader().setVisible(False)  # Masquer les en-têtes de lignes
         self.tableau.horizontalHeader().setVisible(False)  # Masquer les en-têtes de colonnes
 
-        # Style du tableau
-        self.tableau.setStyleSheet("""
-            QTableWidget {
-                background-color: black; 
-                color: white; 
-                font-size: 14px; 
-                gridline-color: #555555;
-            } 
-            QTableWidget::item {
-                padding: 10px; 
-                border: 1px solid #555555;
-            } 
-            QTableWidget::item:selected {
-                background-color: #4CAF50; 
-                color: white;
-            }
-        """)
+        # Fusionne les lignes d'en-tête des stations (structure fixe, posée une seule fois)
+        for row, (_, variable) in enumerate(self.modele_tableau.lignes):
+            if variable is None:
+                self.tableau.setSpan(row, 0, 1, 4)  # Les colonnes suivantes portent le libellé des fenêtres
 
-        # Configuration des colonnes
+        # Style et configuration des colonnes
         self.tableau.setAlternatingRowColors(True)
-        self.tableau.setStyleSheet("alternate-background-color: #222222; background-color: black; color: white;")
-        self.tableau.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
-        self.tableau.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        self.tableau.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        self.tableau.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        self.tableau.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.tableau.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tableau.setSelectionMode(QTableWidget.SingleSelection)
+        self.tableau.setStyleSheet("border: 1px solid #444; alternate-background-color: #222;")
+        self.tableau.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        for col in range(4, self.modele_tableau.columnCount()):  # Statistiques : largeur fixe, pour ne pas tronquer les textes
+            self.tableau.horizontalHeader().setSectionResizeMode(col, QHeaderView.Fixed)
+            self.tableau.setColumnWidth(col, 190)
+        self.tableau.setEditTriggers(QTableView.NoEditTriggers)
+        self.tableau.setSelectionBehavior(QTableView.SelectRows)
+        self.tableau.setSelectionMode(QTableView.SingleSelection)
         layout.addWidget(self.tableau)
 
+    def setup_page_diagnostics(self):
+        """Configure la page de diagnostic : compteurs par station et histogrammes de latence."""
+        layout = QVBoxLayout(self.page_diagnostics)
+        self.texte_diagnostics = QPlainTextEdit()
+        self.texte_diagnostics.setReadOnly(True)
+        self.texte_diagnostics.setStyleSheet("background-color: black; color: white; font-family: monospace; font-size: 13px; border: 1px solid #444;")
+        layout.addWidget(self.texte_diagnostics)
+
+        self.btn_exporter = QPushButton("Exporter les diagnostics")
+        self.btn_exporter.setStyleSheet("background-color: #555555; color: white; font-size: 16px; padding: 10px; border-radius: 18px;")
+        self.btn_exporter.clicked.connect(self.exporter_diagnostics)
+        layout.addWidget(self.btn_exporter)
+
+        # Rafraîchi une fois par seconde, seulement quand la page est affichée
+        self.timer_diagnostics = QTimer()
+        self.timer_diagnostics.timeout.connect(self.maj_diagnostics)
+        self.timer_diagnostics.start(1000)
+
     def initialiser_menu_variables(self):
         """Initialise le menu déroulant pour sélectionner les variables."""
         self.menu_variables = AnimatedMenu(self)
@@ -396,88 +528,263 @@ class FenetrePrincipale(QMainWindow):
                 action = QAction(variable, self, checkable=True)
                 action.setIcon(QIcon())
                 action.toggled.connect(lambda checked, a=action: a.setIcon(icon_green if checked else QIcon()))
+                action.toggled.connect(lambda checked: self.planifier_rafraichissement())
                 station_menu.addAction(action)
                 self.checkboxes[station][variable] = action  # Stocke la référence à l'action
 
+    def initialiser_menu_duree(self):
+        """Initialise le menu déroulant pour choisir la fenêtre de temps tracée."""
+        self.menu_duree = AnimatedMenu(self)
+        groupe = QActionGroup(self)
+        durees = {"1 minute": 60, "10 minutes": 600, "1 heure": 3600, "6 heures": 6 * 3600, "24 heures": 86400, "7 jours": 7 * 86400}
+        for texte, duree in durees.items():
+            action = QAction(texte, self, checkable=True)
+            action.setChecked(duree == self.duree_affichee)
+            action.triggered.connect(lambda checked, d=duree: self.changer_duree(d))
+            groupe.addAction(action)
+            self.menu_duree.addAction(action)
+
+    def afficher_durees(self):
+        """Affiche le menu déroulant des durées."""
+        self.menu_duree.exec(self.btn_duree.mapToGlobal(self.btn_duree.rect().bottomLeft()))
+
+    def changer_duree(self, duree):
+        """Change la fenêtre de temps tracée et revient au suivi du direct."""
+        self.duree_affichee = duree
+        self.changer_vue(None)
+
+    def changer_vue(self, vue):
+        """Trace la fenêtre (t0, t1) en ns, ou suit de nouveau le direct avec None ; le tracé est regroupé."""
+        self.vue = vue
+        self.forcer_limites = True
+        self.compteurs_traces = {}
+        if not self.timer_vue.isActive():
+            self.timer_vue.start(0)
+
+    def vue_courante(self):
+        """Fenêtre tracée (t0, t1) en ns : celle choisie à la souris, sinon la durée affichée jusqu'au dernier échantillon."""
+        if self.vue is not None:
+            return self.vue
+        derniers = [t for t in (self.donnees.dernier_temps(station) for station, _ in self.lignes) if t is not None]
+        fin = max(derniers, default=0)
+        return fin - self.duree_affichee * 10**9, fin
+
+    def zoomer(self, event):
+        """Molette : zoom de l'axe des temps autour du curseur."""
+        if event.inaxes is not self.ax or event.xdata is None:
+            return
+        t0, t1 = self.vue_courante()
+        centre = dates_mpl_vers_ns(event.xdata)
+        facteur = FACTEUR_ZOOM ** -event.step  # Molette vers le haut : zoom avant
+        facteur = min(max(facteur, DUREE_VUE_MIN * 10**9 / max(t1 - t0, 1)), DUREE_VUE_MAX * 10**9 / max(t1 - t0, 1))
+        self.changer_vue((int(centre - (centre - t0) * facteur), int(centre + (t1 - centre) * facteur)))
+
+    def debut_deplacement(self, event):
+        """Clic dans le graphique : commence un déplacement, ou revient au direct sur un double-clic."""
+        if event.inaxes is not self.ax:
+            return
+        if event.dblclick:
+            self.deplacement = None
+            self.changer_vue(None)
+        elif event.button == 1:
+            self.deplacement = event.x, self.vue_courante()
+
+    def deplacer(self, event):
+        """Glisser : déplace la fenêtre tracée de la distance parcourue par la souris."""
+        if self.deplacement is None or event.x is None:
+            return
+        x0, (t0, t1) = self.deplacement
+        decalage = int((event.x - x0) / max(self.ax.bbox.width, 1) * (t1 - t0))
+        self.changer_vue((t0 - decalage, t1 - decalage))
+
+    def fin_deplacement(self, event):
+        """Relâchement du bouton : fin du déplacement."""
+        self.deplacement = None
+
+    def afficher_diagnostics(self):
+        """Affiche la page de diagnostic."""
+        self.construire_page(self.page_diagnostics)
+        self.stacked_widget.setCurrentWidget(self.page_diagnostics)
+        self.btn_switch.setText("Afficher le Graphique")
+        self.maj_diagnostics()
+
+    def maj_diagnostics(self):
+        """Met à jour le texte de la page de diagnostic si elle est affichée."""
+        if self.stacked_widget.currentWidget() is not self.page_diagnostics:
+            return
+        if self.journal is not None:
+            self.instrumentation.enregistrer("file_journal", len(self.journal.file))
+        self.texte_diagnostics.setPlainText("\n\n".join((self.instrumentation.texte(), self.reception_donnees.horodateur.texte(),
+                                                        self.statistiques.texte())))
+
+    def exporter_diagnostics(self):
+        """Écrit les diagnostics dans un fichier JSON du dossier courant."""
+        chemin = os.path.abspath(datetime.now().strftime("diagnostics_%Y%m%d_%H%M%S.json"))
+        try:
+            self.instrumentation.exporter(chemin)
+            self.btn_exporter.setText(f"Diagnostics exportés : {os.path.basename(chemin)}")
+        except OSError as e:
+            self.btn_exporter.setText(f"Erreur d'export : {e}")
+
     def basculer_page(self):
         """Bascule entre la page du graphique et celle du tableau."""
         if self.stacked_widget.currentIndex() == 0:
+            self.construire_page(self.page_tableau)
             self.stacked_widget.setCurrentIndex(1)
             self.btn_switch.setText("Afficher le Graphique")
+            self.maj_tableau()
         else:
             self.stacked_widget.setCurrentIndex(0)
             self.btn_switch.setText("Afficher le Tableau")
+            self.afficher_graphique()
 
     def afficher_variables(self):
         """Affiche le menu déroulant pour sélectionner les variables."""
         self.menu_variables.exec(self.btn_variables.mapToGlobal(self.btn_variables.rect().bottomLeft()))
 
-    def maj_graphique(self):
-        """Met à jour le graphique avec les dernières données disponibles."""
-        self.ax.clear()
-        self.ax.grid(True, which='both', axis='both', color='white', linestyle='--', linewidth=0.5)
-        has_data = False
-        
-        # Parcourir toutes les stations et variables
-        for station, variables in self.checkboxes.items():
-            for variable, action in variables.items():
-                if action.isChecked():
-                    if len(self.donnees[station][variable]) > 0:
-                        # Use the time from Station 4 for all stations
-                        temps = [t for t, _ in self.donnees[station][variable]]
-                        valeurs = [v for _, v in self.donnees[station][variable]]
-                        self.ax.plot(temps, valeurs, label=f"{station} - {variable}")
-                        has_data = True
-        
-        if not has_data:
-            self.ax.text(0.5, 0.5, "Aucune donnée disponible", color="white", ha="center", va="center", transform=self.ax.transAxes)
+    def planifier_rafraichissement(self):
+        """Programme un rafraîchissement, au plus tôt un intervalle après le précédent."""
+        if self.timer_rafraichissement.isActive():
+            return  # Déjà programmé : les nouvelles clés seront prises au passage
+        attente = self.dernier_rafraichissement + self.intervalle_rafraichissement - monotonic()
+        self.timer_rafraichissement.start(max(0, int(attente * 1000)))
+
+    def rafraichir(self):
+        """Met à jour le graphique et le tableau pour les clés modifiées depuis le dernier rafraîchissement."""
+        self.dernier_rafraichissement = monotonic()
+        cles, debut_lot = self.notificateur.recuperer()
+        debut = perf_counter()
+        self.maj_graphique(cles)
+        milieu = perf_counter()
+        self.maj_tableau(cles)
+        fin = perf_counter()
+        self.maj_entete()
+        self.instrumentation.enregistrer("maj_graphique", (milieu - debut) * 1e6)
+        self.instrumentation.enregistrer("maj_tableau", (fin - milieu) * 1e6)
+        if debut_lot is not None:
+            self.instrumentation.enregistrer("arrivee_affichage", (fin - debut_lot) * 1e6)
+        if self.journal is not None:
+            self.instrumentation.enregistrer("file_journal", len(self.journal.file))
+
+    def maj_graphique(self, cles=None):
+        """Met à jour le graphique avec les dernières données disponibles (des clés données, ou toutes)."""
+        if self.page_graphique in self.pages_a_construire:
+            return  # Démarrage rapide : les données s'accumulent, elles seront tracées à la construction de la page
+        cochees = [(station, variable) for station, variables in self.checkboxes.items()
+                   for variable, action in variables.items() if action.isChecked()]
+        selection_changee = cochees != list(self.lignes)
+        if selection_changee:
+            self.reconstruire_lignes(cochees)
+        elif cles is not None and (self.vue is not None or self.lignes.keys().isdisjoint(cles)):
+            return  # Aucune courbe tracée n'a changé, ou fenêtre choisie à la souris : elle ne suit pas le direct
+
+        # Rien de nouveau depuis le dernier tracé : pas de redessin
+        compteurs = {station: self.donnees.compteur(station) for station, _ in cochees}
+        if not selection_changee and compteurs == self.compteurs_traces:
+            return
+        self.compteurs_traces = compteurs
+
+        # Fenêtre tracée, lue en mémoire et dans le journal ; la résolution suit la largeur du canevas
+        debut, fin = self.vue_courante()
+        series = self.historique.requete(self.lignes, debut, fin, max(self.canvas.width(), 100))
+        for cle, ligne in self.lignes.items():
+            temps, valeurs = series[cle]
+            # Conversion des temps en une seule opération
+            ligne.set_data(ns_vers_dates_mpl(temps), valeurs)
+
+        has_data = any(self.donnees.taille(station) > 0 for station, _ in cochees)
+        vide_change = self.texte_vide.get_visible() == has_data
+        self.texte_vide.set_visible(not has_data)
+
+        # Redessin complet seulement si les axes changent, sinon seule la zone de l'axe est redessinée
+        limites_changees = self.ajuster_limites(force=selection_changee or self.forcer_limites)
+        self.forcer_limites = False
+        if selection_changee or vide_change or limites_changees or self.fond is None:
+            self.canvas.draw()
         else:
-            self.ax.set_title("Données en Temps Réel", color="white")
-            # Formate l'axe des temps
-            self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
-            self.ax.xaxis.set_major_locator(mdates.SecondLocator(interval=10))  # Affiche une étiquette toutes les 10 secondes
-            self.ax.legend()
-        
-        self.canvas.draw()
-
-    def maj_tableau(self):
-        """Met à jour le tableau avec les dernières données disponibles, en ordre de station et variable."""
-        self.tableau.setRowCount(0)  # On commence par vider le tableau
-
-        # Tri des stations
-        stations_triees = list(self.stations.keys())  # Garde l'ordre original
-
-        for station in stations_triees:
-            # Ajout d'une ligne pour le nom de la station avec un fond plus sombre
-            row = self.tableau.rowCount()
-            self.tableau.insertRow(row)
-            station_item = QTableWidgetItem(station)
-            station_item.setBackground(Qt.darkGray)
-            station_item.setForeground(Qt.white)
-            station_item.setTextAlignment(Qt.AlignCenter)
-            self.tableau.setItem(row, 0, station_item)
-            self.tableau.setSpan(row, 0, 1, 4)  # Fusionne la ligne pour la station
-
-            # Tri des variables
-            variables_triees = self.stations[station]  # Pas de tri erroné
-            for variable in variables_triees:
-                row = self.tableau.rowCount()
-                self.tableau.insertRow(row)
-                self.tableau.setItem(row, 1, QTableWidgetItem(variable))
-                self.tableau.setItem(row, 2, QTableWidgetItem(self.unites.get(variable, "N/A")))
-
-                # Ajout de la dernière valeur disponible sans coloration conditionnelle
-                dernieres_valeurs = self.donnees[station][variable]
-                valeur = dernieres_valeurs[-1][1] if dernieres_valeurs else "N/A"  # Prend la valeur (temps, valeur)
-                valeur_item = QTableWidgetItem(str(valeur))
-                self.tableau.setItem(row, 3, valeur_item)
-
-        # Ajustement des tailles et styles
-        self.tableau.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.tableau.setStyleSheet("border: 1px solid #444; alternate-background-color: #222;")
+            self.canvas.restore_region(self.fond)
+            self.dessiner_courbes()
+            self.canvas.blit(self.ax.bbox)
+
+    def reconstruire_lignes(self, cochees):
+        """Crée les courbes des variables nouvellement cochées et retire celles qui ne le sont plus."""
+        anciennes = self.lignes
+        self.lignes = {}
+        for cle in cochees:
+            ligne = anciennes.pop(cle, None)
+            if ligne is None:
+                ligne, = self.ax.plot([], [], label=f"{cle[0]} - {cle[1]}", animated=True)
+            self.lignes[cle] = ligne
+        for ligne in anciennes.values():
+            ligne.remove()
+        if self.legende is not None:
+            self.legende.remove()
+            self.legende = None
+        if self.lignes:
+            self.legende = self.ax.legend(handles=list(self.lignes.values()))
+
+    def ajuster_limites(self, force=False):
+        """Recalcule les limites des axes si les données en sortent ; retourne True si elles ont changé."""
+        x_min = y_min = np.inf
+        x_max = y_max = -np.inf
+        for ligne in self.lignes.values():
+            temps, valeurs = ligne.get_data()
+            if len(temps) == 0 or np.isnan(valeurs).all():
+                continue
+            x_min, x_max = min(x_min, temps[0]), max(x_max, temps[-1])
+            y_min, y_max = min(y_min, np.nanmin(valeurs)), max(y_max, np.nanmax(valeurs))
+        change = False
+        if self.vue is not None:  # Fenêtre choisie à la souris : l'axe des temps la suit exactement
+            vue = tuple(ns_vers_dates_mpl(np.array(self.vue)))
+            if self.ax.get_xlim() != vue:
+                self.ax.set_xlim(vue)
+                change = True
+        if x_min > x_max:
+            return change
+
+        # Marge en avant sur le temps pour que les nouveaux points n'imposent pas un redessin à chaque fois
+        ecart_x = max(x_max - x_min, 10 / 86400)
+        x0, x1 = self.ax.get_xlim()
+        if self.vue is None and (force or x_min < x0 or x_max > x1 or (x1 - x0) > 2 * ecart_x):
+            self.ax.set_xlim(x_min, x_max + 0.2 * ecart_x)
+            change = True
+        ecart_y = max(y_max - y_min, 1e-9)
+        y0, y1 = self.ax.get_ylim()
+        if force or y_min < y0 or y_max > y1 or (y1 - y0) > 2 * ecart_y:
+            self.ax.set_ylim(y_min - 0.1 * ecart_y, y_max + 0.1 * ecart_y)
+            change = True
+        return change
+
+    def memoriser_fond(self, event):
+        """Après un redessin complet, mémorise le fond de l'axe et la légende puis dessine les courbes."""
+        self.fond = self.canvas.copy_from_bbox(self.ax.bbox)
+        # La légende fait partie du fond : ses pixels sont recollés plutôt que redessinés à chaque fois
+        self.fond_legende = self.canvas.copy_from_bbox(self.legende.get_window_extent()) if self.legende is not None else None
+        self.dessiner_courbes()
+
+    def dessiner_courbes(self):
+        """Dessine les courbes animées puis recolle la légende par-dessus."""
+        for ligne in self.lignes.values():
+            self.ax.draw_artist(ligne)
+        if self.fond_legende is not None:
+            self.canvas.restore_region(self.fond_legende)
+
+    def maj_entete(self):
+        """Signale dans l'en-tête le nombre d'alertes en cours."""
+        nombre = len(self.statistiques.alertes)
+        texte = f"Station Météo — ⚠ {nombre} alerte{'s' if nombre > 1 else ''}" if nombre else "Station Météo"
+        if texte != self.header.text():
+            self.header.setText(texte)
+
+    def maj_tableau(self, cles=None):
+        """Met à jour le tableau avec les dernières données disponibles (des clés données, ou toutes)."""
+        if self.stacked_widget.currentWidget() is not self.page_tableau:
+            return  # Page masquée : rien à faire, elle sera rafraîchie à l'affichage
+        self.modele_tableau.rafraichir(cles)
 
     def reinitialiser(self):
-        """Réinitialise toutes les sélections des variables."""
+        """Réinitialise toutes les sélections des variables et revient au suivi du direct."""
+        self.vue = None
         for station_actions in self.checkboxes.values():
             for action in station_actions.values():
                 action.setChecked(False)
@@ -487,11 +794,31 @@ class FenetrePrincipale(QMainWindow):
     def closeEvent(self, event):
         """Arrête la réception des données et ferme l'application."""
         self.reception_donnees.stop()
+        if self.rechargement is not None:
+            self.rechargement.attendre()  # Historique et trames gardées rangés avant de fermer le journal
+        if self.journal is not None:
+            self.journal.fermer()
         event.accept()
 
 
+def lire_arguments(arguments):
+    """Lit les options de la ligne de commande (les options Qt restantes sont laissées à QApplication)."""
+    parser = argparse.ArgumentParser(description="Visualisation des données météo des stations Arduino.")
+    ajouter_options_reception(parser)
+    parser.add_argument("--collecteur", nargs="?", const=SOCKET_COLLECTEUR, metavar="SOCKET",
+                        help="Affiche les données d'un collecteur_meteo.py déjà lancé au lieu de lire les ports "
+                             "(défaut : %s)" % SOCKET_COLLECTEUR)
+    parser.add_argument("--demarrage-rapide", action="store_true",
+                        help="Ouvre la fenêtre aussitôt ; graphique et tableau sont construits à leur premier affichage")
+    return parser.parse_known_args(arguments)
+
+
 # Lancement de l'application
-app = QApplication(sys.argv)
-window = FenetrePrincipale()
-window.show()
-sys.exit(app.exec())
\ No newline at end of file
+if __name__ == "__main__":
+    options, arguments_qt = lire_arguments(sys.argv[1:])
+    importer_captures(options)
+    app = QApplication(sys.argv[:1] + arguments_qt)
+    window = FenetrePrincipale(creer_source(options, STATIONS), processus=options.processus,
+                               demarrage_rapide=options.demarrage_rapide, collecteur=options.collecteur)
+    window.show()
+    sys.exit(app.exec())
\ No newline at end of file
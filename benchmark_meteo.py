@@ -0,0 +1,691 @@
+"""Benchmarks de l'application Météo, sans affichage (plateforme Qt offscreen, backend Agg).
+
+Usage :
+    python benchmark_meteo.py analyse [--capture lignes.txt] [--trames 20000]
+    python benchmark_meteo.py journal [--trames 100000]
+    python benchmark_meteo.py delestage [--duree 5] [--series 5]
+    python benchmark_meteo.py demarrage [--repetitions 5]
+    python benchmark_meteo.py navigation [--jours 7] [--series 5]
+    python benchmark_meteo.py suite [--rapide] [--sortie resultats.json]
+                                    [--reference benchmark_reference.json] [--tolerance 0.2]
+                                    [--enregistrer-reference]
+
+La suite mesure le démarrage et chaque étape isolément (analyse, stockage, journal, maj_graphique, maj_tableau)
+puis de bout en bout (octets générés -> fin du rafraîchissement), pour plusieurs nombres de
+stations, de variables cochées et de longueurs d'historique. Les résultats sont écrits en JSON
+et comparés à une référence enregistrée : toute régression au-delà de la tolérance fait
+échouer la commande (code de sortie 1).
+
+`delestage` mesure la durée des images de l'interface pendant une réception saturée (un flux TCP
+envoyé au plus vite par un autre processus), avec le décodage dans le processus de l'interface
+puis délégué à un processus séparé.
+
+`demarrage` lance l'application dans des processus neufs, avec et sans --demarrage-rapide, sur un journal de
+JOURS_RECHARGES jours écrit au préalable, et mesure la durée des imports, celle du rechargement de l'historique,
+le délai jusqu'au premier dessin de la fenêtre et jusqu'au graphique construit.
+
+`navigation` écrit plusieurs jours de journal à une trame par seconde puis mesure la requête d'une fenêtre
+(première lecture et suivantes) et la durée d'un cran de zoom ou d'un pas de déplacement dans le graphique.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from types import SimpleNamespace
+from datetime import datetime, date
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+CHEMIN_APPLICATION = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Projet Arduino Météo.py")
+REFERENCE_DEFAUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_reference.json")
+
+
+def charger_application():
+    """Importe le module de l'application (son nom de fichier contient des espaces)."""
+    if "projet_meteo" in sys.modules:
+        return sys.modules["projet_meteo"]
+    spec = importlib.util.spec_from_file_location("projet_meteo", CHEMIN_APPLICATION)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["projet_meteo"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def charger_noyau():
+    """Importe le noyau sans interface (réception, stockage, journal) ; à l'usage seulement : chargé avec le banc, il
+    sortirait de la durée des imports mesurée au démarrage de l'application."""
+    import noyau_meteo
+    return noyau_meteo
+
+
+def generer_lignes(stations, nombre, graine=0):
+    """Génère des trames au format "| num | nom | HH:MM:SS | valeurs... | & | ... |"."""
+    aleatoire = random.Random(graine)
+    lignes = []
+    for n in range(nombre):
+        seconde = n // 10  # Environ 10 trames par seconde
+        heure = f"{(seconde // 3600) % 24:02d}:{(seconde // 60) % 60:02d}:{seconde % 60:02d}"
+        blocs = []
+        for i, (station, variables) in enumerate(stations.items()):
+            valeurs = [f"{aleatoire.uniform(-50, 1500):.2f}" for _ in variables]
+            blocs.append(" | ".join([str(i + 1), station, heure] + valeurs))
+        lignes.append("| " + " | & | ".join(blocs) + " |")
+    return lignes
+
+
+def lire_capture(chemin):
+    """Lit un fichier de trames enregistrées (une trame par ligne)."""
+    with open(chemin, "rb") as fichier:
+        return [ligne.decode("utf-8", errors="replace").strip() for ligne in fichier if ligne.strip()]
+
+
+def extraction_historique(stations, chaine_carac):
+    """Copie de l'ancienne version de ReceptionDonnees.extraction_val_stations_en_dict, pour comparaison."""
+    parts = chaine_carac.split('|')[1:-1]
+    dic, station_actuel = {}, []
+    for item in parts + [' & ']:
+        if item == ' & ':
+            if station_actuel:
+                station_num = int(station_actuel[0])
+                station_nom = list(stations.keys())[station_num - 1]
+                temps_str = station_actuel[2]
+                try:
+                    temps = datetime.strptime(temps_str.strip(), "%H:%M:%S").time()
+                    temps = datetime.combine(date.today(), temps)
+                except (ValueError, AttributeError):
+                    temps = None
+                dic[station_nom] = (temps, station_actuel[3:])
+            station_actuel = []
+        else:
+            if item.strip().replace('.', '', 1).isdigit():
+                station_actuel.append(float(item))
+            else:
+                station_actuel.append(item.strip())
+    return dic
+
+
+def resultat(etape, mesure, unite, plus_haut_mieux, **parametres):
+    """Construit un résultat lisible par machine."""
+    return {"etape": etape, "parametres": parametres, "mesure": mesure, "unite": unite,
+            "sens": "haut" if plus_haut_mieux else "bas"}
+
+
+def cle_resultat(res):
+    """Identifiant d'un résultat pour la comparaison avec la référence."""
+    return res["etape"] + " " + json.dumps(res["parametres"], sort_keys=True, ensure_ascii=False)
+
+
+def afficher(resultats):
+    """Affiche les résultats sous forme de tableau."""
+    for res in resultats:
+        parametres = ", ".join(f"{cle}={valeur}" for cle, valeur in res["parametres"].items())
+        print(f"{res['etape']:<28} {parametres:<48} {res['mesure']:>14.3f} {res['unite']}")
+
+
+def debit(fonction, elements, repetitions=3):
+    """Retourne le meilleur débit (éléments/s) sur plusieurs répétitions."""
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        for element in elements:
+            fonction(element)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return len(elements) / meilleur
+
+
+def sous_stations(noyau, nombre):
+    """Les `nombre` premières stations de l'application."""
+    return dict(list(noyau.STATIONS.items())[:nombre])
+
+
+# Étapes isolées
+def mesurer_analyse(noyau, lignes):
+    """Débit de l'analyse des trames : ancienne fonction, analyseur ligne à ligne et décodage massif."""
+    stations = noyau.STATIONS
+    analyseur = noyau.AnalyseurTrames(stations)
+    decodeur = noyau.DecodeurMassif(stations)
+    tampon = "\n".join(lignes).encode("utf-8") + b"\n"
+    return [
+        resultat("analyse_ancienne", debit(lambda ligne: extraction_historique(stations, ligne), lignes), "trames/s", True),
+        resultat("analyse", debit(analyseur.analyser, lignes), "trames/s", True),
+        resultat("analyse_massive", debit(decodeur.decoder, [tampon]) * len(lignes), "trames/s", True),
+    ]
+
+
+def mesurer_stockage(noyau, nombre):
+    """Débit d'ajout d'échantillons dans le stockage en anneau (agrégats compris) et dans les statistiques glissantes."""
+    stations = noyau.STATIONS
+    analyseur = noyau.AnalyseurTrames(stations)
+    trames = [analyseur.analyser(ligne) for ligne in generer_lignes(stations, 1000)]
+    stockage = noyau.StockageAnneau(stations)
+    statistiques = noyau.StatistiquesGlissantes(stations)
+    echantillons = [(station, temps + n * 10**8, valeurs)
+                    for n in range(nombre) for station, (temps, valeurs) in trames[n % len(trames)].items()]
+    preparation = noyau.StockageAnneau(stations)  # Lignes converties (NaN), telles que les statistiques les reçoivent
+    lignes = [(station, temps, preparation.ajouter(station, temps, valeurs)) for station, temps, valeurs in echantillons]
+    return [
+        resultat("stockage", debit(lambda e: stockage.ajouter(*e), echantillons, 1), "échantillons/s", True),
+        resultat("statistiques", debit(lambda e: statistiques.ajouter(*e), lignes, 1), "échantillons/s", True),
+    ]
+
+
+def mesurer_journal(noyau, nombre):
+    """Débit d'écriture soutenu du journal binaire et temps de rechargement par projection mémoire."""
+    stations = noyau.STATIONS
+    lignes = generer_lignes(stations, min(nombre, 2000))
+    analyseur = noyau.AnalyseurTrames(stations)
+    trames = [analyseur.analyser(ligne) for ligne in lignes]
+    # Débit de la liaison série : 10 bits par octet transmis
+    trames_par_seconde = noyau.VITESSE / 10 / (sum(len(ligne) + 1 for ligne in lignes) / len(lignes))
+
+    dossier = tempfile.mkdtemp(prefix="journal_meteo_")
+    try:
+        journal = noyau.JournalBinaire(stations, dossier, politique=noyau.BLOCAGE)  # Tout est écrit : débit soutenu
+        debut = time.perf_counter()
+        for n in range(nombre):
+            for station, (temps, valeurs) in trames[n % len(trames)].items():
+                journal.ajouter(station, temps + n * 10**8, valeurs)
+        depot = time.perf_counter() - debut
+        journal.fermer()
+        total = time.perf_counter() - debut
+
+        lecteur = noyau.LecteurJournal(stations, dossier)
+        debut = time.perf_counter()
+        charges = sum(len(lecteur.charger(station, nb_jours=365)[0]) for station in stations)
+        lecture = time.perf_counter() - debut
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+    return [
+        resultat("journal_depot", depot / journal.ecrits * 1e6, "µs/échantillon", False),
+        resultat("journal_ecriture", journal.ecrits / total, "échantillons/s", True),
+        resultat("journal_liaison_115200", trames_par_seconde * len(stations), "échantillons/s", True),
+        resultat("journal_rechargement", lecture * 1000, "ms", False, echantillons=charges),
+    ]
+
+
+class SourceMuette:
+    """Source qui ne reçoit jamais rien, pour mesurer les rafraîchissements isolément."""
+    def readline(self):
+        time.sleep(0.05)
+        return b""
+
+    def close(self):
+        pass
+
+
+class SourceChronometree:
+    """Enveloppe une source et note l'instant d'émission de chaque trame."""
+    def __init__(self, source):
+        self.source = source
+        self.emissions = deque()
+
+    def readline(self):
+        ligne = self.source.readline()
+        if ligne:
+            self.emissions.append(time.perf_counter())
+        return ligne
+
+    def close(self):
+        self.source.close()
+
+
+def creer_fenetre(app, qapp, stations, source, classe=None, nb_series=0, historique=0, processus=0):
+    """Crée une fenêtre dans un dossier d'historique temporaire, avec historique préchargé et séries cochées."""
+    dossier = tempfile.mkdtemp(prefix="historique_meteo_")
+    entrees = source if isinstance(source, list) else (lambda: source)  # Liste d'adresses : moteur multi-ports
+    fenetre = (classe or app.FenetrePrincipale)(entrees, stations, dossier, processus)
+    fenetre.dossier_benchmark = dossier
+    if historique:
+        import numpy as np
+        fin = charger_noyau().datetime_vers_ns(datetime.now())
+        temps = fin - np.arange(historique, 0, -1, dtype=np.int64) * 10**9
+        for station, variables in stations.items():
+            fenetre.donnees.ajouter_bloc(station, temps, np.random.rand(historique, len(variables)) * 100)
+    fenetre.changer_duree(max(60, historique))
+    actions = [action for variables in fenetre.checkboxes.values() for action in variables.values()]
+    for action in actions[:nb_series]:
+        action.setChecked(True)
+    fenetre.show()
+    qapp.processEvents()
+    return fenetre
+
+
+def fermer_fenetre(fenetre, qapp):
+    """Ferme la fenêtre, arrête ses threads et supprime son dossier d'historique."""
+    fenetre.close()
+    fenetre.deleteLater()
+    qapp.processEvents()
+    shutil.rmtree(fenetre.dossier_benchmark, ignore_errors=True)
+
+
+def ajouter_echantillon(fenetre, decalage):
+    """Ajoute un échantillon à chaque station, `decalage` secondes après le dernier ; retourne les clés modifiées."""
+    cles = set()
+    for station, variables in fenetre.stations.items():
+        dernier = fenetre.donnees.dernier_temps(station) or fenetre.donnees.capacite
+        fenetre.donnees.ajouter(station, dernier + decalage * 10**9, [random.uniform(0, 100) for _ in variables])
+        cles.update((station, variable) for variable in variables)
+    return cles
+
+
+def percentile(valeurs, p):
+    """Percentile p (0-100) d'une liste de valeurs."""
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(round(p / 100 * (len(valeurs) - 1))))]
+
+
+def mesurer_graphique(app, qapp, nb_series, historique, ticks=40):
+    """Durée de maj_graphique (et du rendu qui suit) par rafraîchissement."""
+    noyau = charger_noyau()
+    fenetre = creer_fenetre(app, qapp, noyau.STATIONS, SourceMuette(), nb_series=nb_series, historique=historique)
+    durees = []
+    try:
+        for _ in range(ticks):
+            cles = ajouter_echantillon(fenetre, 1)
+            debut = time.perf_counter()
+            fenetre.maj_graphique(cles)
+            qapp.processEvents()
+            durees.append((time.perf_counter() - debut) * 1000)
+    finally:
+        fermer_fenetre(fenetre, qapp)
+    return [
+        resultat("maj_graphique_median", statistics.median(durees), "ms", False, series=nb_series, historique=historique),
+        resultat("maj_graphique_p95", percentile(durees, 95), "ms", False, series=nb_series, historique=historique),
+    ]
+
+
+def mesurer_tableau(app, qapp, ticks=40):
+    """Durée de maj_tableau (page affichée) par rafraîchissement."""
+    noyau = charger_noyau()
+    fenetre = creer_fenetre(app, qapp, noyau.STATIONS, SourceMuette())
+    fenetre.basculer_page()
+    durees = []
+    try:
+        for _ in range(ticks):
+            cles = ajouter_echantillon(fenetre, 1)
+            debut = time.perf_counter()
+            fenetre.maj_tableau(cles)
+            qapp.processEvents()
+            durees.append((time.perf_counter() - debut) * 1000)
+    finally:
+        fermer_fenetre(fenetre, qapp)
+    return [
+        resultat("maj_tableau_median", statistics.median(durees), "ms", False),
+        resultat("maj_tableau_p95", percentile(durees, 95), "ms", False),
+    ]
+
+
+def mesurer_navigation(app, qapp, jours, nb_series=5, crans=20):
+    """Requête d'une fenêtre dans `jours` jours de journal, et durée d'un zoom ou d'un déplacement dans le graphique."""
+    import numpy as np
+    noyau = charger_noyau()
+    fenetre = creer_fenetre(app, qapp, noyau.STATIONS, SourceMuette(), nb_series=nb_series)
+    try:
+        # Journal des seules stations tracées, une trame par seconde
+        cles = list(fenetre.lignes)
+        fin = noyau.datetime_vers_ns(datetime.now())
+        temps = fin - np.arange(jours * 86400, 0, -1, dtype=np.int64) * 10**9
+        journal = noyau.JournalBinaire(noyau.STATIONS, fenetre.dossier_benchmark, politique=noyau.BLOCAGE)
+        for station in {station for station, _ in cles}:
+            journal.ajouter_bloc(station, temps, np.random.rand(len(temps), len(noyau.STATIONS[station])) * 100)
+        journal.fermer()
+
+        largeur = fenetre.canvas.width()
+        debut = time.perf_counter()
+        fenetre.historique.requete(cles, int(temps[0]), fin, largeur)
+        premiere = (time.perf_counter() - debut) * 1000
+        requetes = []
+        for k in range(crans):
+            t0 = int(temps[0]) + k * (fin - int(temps[0])) // (2 * crans)
+            debut = time.perf_counter()
+            fenetre.historique.requete(cles, t0, t0 + (fin - t0) // (k + 1), largeur)
+            requetes.append((time.perf_counter() - debut) * 1000)
+
+        fenetre.changer_duree(jours * 86400)
+        qapp.processEvents()
+        x0, x1 = fenetre.ax.get_xlim()
+        zooms, deplacements = [], []
+        for _ in range(crans):
+            debut = time.perf_counter()
+            fenetre.zoomer(SimpleNamespace(inaxes=fenetre.ax, xdata=x0 + 0.3 * (x1 - x0), step=1))
+            qapp.processEvents()
+            zooms.append((time.perf_counter() - debut) * 1000)
+        fenetre.debut_deplacement(SimpleNamespace(inaxes=fenetre.ax, dblclick=False, button=1, x=100))
+        for k in range(crans):
+            debut = time.perf_counter()
+            fenetre.deplacer(SimpleNamespace(x=100 + 10 * k))
+            qapp.processEvents()
+            deplacements.append((time.perf_counter() - debut) * 1000)
+        fenetre.fin_deplacement(None)
+    finally:
+        fermer_fenetre(fenetre, qapp)
+    return [
+        resultat("navigation_premiere_requete", premiere, "ms", False, jours=jours, series=nb_series),
+        resultat("navigation_requete_median", statistics.median(requetes), "ms", False, jours=jours, series=nb_series),
+        resultat("navigation_zoom_median", statistics.median(zooms), "ms", False, jours=jours, series=nb_series),
+        resultat("navigation_deplacement_median", statistics.median(deplacements), "ms", False, jours=jours, series=nb_series),
+        resultat("navigation_deplacement_p95", percentile(deplacements, 95), "ms", False, jours=jours, series=nb_series),
+    ]
+
+
+def mesurer_bout_en_bout(app, qapp, nb_stations, nb_series, historique, frequence, duree):
+    """Latence entre l'émission d'une trame et la fin du rafraîchissement qui l'affiche."""
+    noyau = charger_noyau()
+    stations = sous_stations(noyau, nb_stations)
+    source = SourceChronometree(noyau.GenerateurTrames(stations, frequence, graine=0))
+    premiere = next(iter(stations))
+    latences = []
+    etat = {}
+
+    class FenetreMesuree(app.FenetrePrincipale):
+        def rafraichir(self):
+            super().rafraichir()
+            fin = time.perf_counter()
+            # Seules les trames déjà rangées dans le stockage sont comptées
+            traitees = self.donnees.compteur(premiere) - etat.get("base", 0) - etat.get("comptees", 0)
+            for _ in range(min(traitees, len(source.emissions))):
+                latences.append((fin - source.emissions.popleft()) * 1000)
+            etat["comptees"] = etat.get("comptees", 0) + traitees
+
+    fenetre = creer_fenetre(app, qapp, stations, source, FenetreMesuree, nb_series, historique)
+    try:
+        etat["base"] = fenetre.donnees.compteur(premiere) - len(source.emissions)
+        etat["comptees"] = 0
+        source.emissions.clear()
+        latences.clear()
+        debut = time.perf_counter()
+        while time.perf_counter() - debut < duree:
+            qapp.processEvents()
+            time.sleep(0.001)
+        ecoule = time.perf_counter() - debut
+    finally:
+        fermer_fenetre(fenetre, qapp)
+    parametres = dict(stations=nb_stations, series=nb_series, historique=historique, frequence=frequence)
+    if not latences:
+        return [resultat("bout_en_bout_trames", 0.0, "trames/s", True, **parametres)]
+    return [
+        resultat("bout_en_bout_trames", len(latences) / ecoule, "trames/s", True, **parametres),
+        resultat("bout_en_bout_latence_median", statistics.median(latences), "ms", False, **parametres),
+        resultat("bout_en_bout_latence_p95", percentile(latences, 95), "ms", False, **parametres),
+    ]
+
+
+def emettre_en_boucle(serveur, donnees):
+    """Corps du processus émetteur : envoie les trames en boucle, au plus vite, au premier client TCP."""
+    client, _ = serveur.accept()
+    try:
+        while True:
+            client.sendall(donnees)
+    except OSError:  # Le client s'est déconnecté
+        pass
+
+
+def mesurer_delestage(app, qapp, processus, nb_series, duree):
+    """Durée des images de l'interface pendant une réception saturée, décodage délégué ou non."""
+    noyau = charger_noyau()
+    generateur = noyau.GenerateurTrames(noyau.STATIONS, 0, graine=0)
+    donnees = b"".join(generateur.trame().encode() for _ in range(5000))
+    serveur = socket.create_server(("127.0.0.1", 0))
+    emetteur = noyau.contexte_processus().Process(target=emettre_en_boucle, args=(serveur, donnees), daemon=True)
+    emetteur.start()
+    images = []
+
+    class FenetreMesuree(app.FenetrePrincipale):
+        def rafraichir(self):
+            debut = time.perf_counter()
+            super().rafraichir()
+            images.append((time.perf_counter() - debut) * 1000)
+
+    adresse = f"tcp://127.0.0.1:{serveur.getsockname()[1]}"
+    fenetre = creer_fenetre(app, qapp, noyau.STATIONS, [adresse], FenetreMesuree, nb_series, processus=processus)
+    try:
+        premiere = next(iter(noyau.STATIONS))
+        depart = fenetre.donnees.compteur(premiere)
+        images.clear()
+        debut = time.perf_counter()
+        while time.perf_counter() - debut < duree:
+            qapp.processEvents()
+            time.sleep(0.001)
+        ecoule = time.perf_counter() - debut
+        trames = fenetre.donnees.compteur(premiere) - depart
+    finally:
+        fermer_fenetre(fenetre, qapp)
+        emetteur.terminate()
+        emetteur.join()
+        serveur.close()
+    parametres = dict(processus=processus, series=nb_series)
+    if not images:
+        return [resultat("delestage_trames", trames / ecoule, "trames/s", True, **parametres)]
+    return [
+        resultat("delestage_trames", trames / ecoule, "trames/s", True, **parametres),
+        resultat("delestage_images", len(images) / ecoule, "images/s", True, **parametres),
+        resultat("delestage_image_median", statistics.median(images), "ms", False, **parametres),
+        resultat("delestage_image_p95", percentile(images, 95), "ms", False, **parametres),
+        resultat("delestage_image_max", max(images), "ms", False, **parametres),
+    ]
+
+
+def demarrer_enfant(rapide, dossier):
+    """Corps du processus mesuré : démarre l'application sur l'historique de `dossier`, attend le graphique et la fin
+    du rechargement, puis écrit les durées du démarrage en JSON."""
+    debut = time.perf_counter()
+    app = charger_application()
+    noyau = charger_noyau()
+    from PySide6.QtWidgets import QApplication
+    qapp = QApplication([])
+    fenetre = app.FenetrePrincipale(lambda: SourceMuette(), noyau.STATIONS, dossier, 0, rapide)
+    fenetre.show()
+    while (fenetre.page_graphique in fenetre.pages_a_construire
+           or not {"affichage", "historique"} <= fenetre.instrumentation.demarrage.keys()):
+        qapp.processEvents()
+        time.sleep(0.001)
+    durees = dict(fenetre.instrumentation.demarrage, graphique=(time.perf_counter() - debut) * 1000)
+    fenetre.close()
+    print(json.dumps(durees))
+
+
+def ecrire_historique(noyau, dossier):
+    """Journal réaliste pour le démarrage : JOURS_RECHARGES jours de toutes les stations, une trame par seconde."""
+    import numpy as np
+    fin = noyau.datetime_vers_ns(datetime.now())
+    temps = fin - np.arange(noyau.JOURS_RECHARGES * 86400, 0, -1, dtype=np.int64) * 10**9
+    journal = noyau.JournalBinaire(noyau.STATIONS, dossier, politique=noyau.BLOCAGE)
+    for station, variables in noyau.STATIONS.items():
+        journal.ajouter_bloc(station, temps, np.random.rand(len(temps), len(variables)) * 100, temps)
+    journal.fermer()
+
+
+def mesurer_demarrage(rapide, repetitions=3):
+    """Durées du démarrage (médianes sur plusieurs lancements), chacun dans un processus neuf, avec l'historique
+    à recharger écrit au préalable (par ce processus : les imports de l'enfant restent mesurés en entier)."""
+    dossier = tempfile.mkdtemp(prefix="historique_meteo_")
+    try:
+        ecrire_historique(charger_noyau(), dossier)
+        commande = [sys.executable, os.path.abspath(__file__), "demarrage", "--enfant", "rapide" if rapide else "normal",
+                    "--historique", dossier]
+        mesures = []
+        for _ in range(repetitions):
+            sortie = subprocess.run(commande, capture_output=True, text=True, check=True).stdout
+            mesures.append(json.loads(sortie.strip().splitlines()[-1]))
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+    return [resultat(f"demarrage_{etape}", statistics.median(mesure[etape] for mesure in mesures), "ms", False, rapide=rapide)
+            for etape in ("imports", "historique", "affichage", "graphique")]
+
+
+def comparer(resultats, reference, tolerance):
+    """Retourne la liste des régressions par rapport à la référence."""
+    index = {cle_resultat(res): res for res in reference}
+    regressions = []
+    for res in resultats:
+        ref = index.get(cle_resultat(res))
+        if ref is None or not ref["mesure"]:
+            continue
+        rapport = res["mesure"] / ref["mesure"]
+        if (res["sens"] == "haut" and rapport < 1 - tolerance) or (res["sens"] == "bas" and rapport > 1 + tolerance):
+            regressions.append((res, ref, rapport))
+    return regressions
+
+
+# Commandes
+def bench_analyse(args):
+    """Compare l'analyseur de trames à l'ancienne fonction d'extraction."""
+    noyau = charger_noyau()
+    lignes = lire_capture(args.capture) if args.capture else generer_lignes(noyau.STATIONS, args.trames)
+    resultats = mesurer_analyse(noyau, lignes)
+    print(f"{len(lignes)} trames, {len(noyau.STATIONS)} stations")
+    afficher(resultats)
+    print(f"Gain : x{resultats[1]['mesure'] / resultats[0]['mesure']:.1f} ligne à ligne, "
+          f"x{resultats[2]['mesure'] / resultats[0]['mesure']:.1f} en bloc")
+
+
+def bench_journal(args):
+    """Débit du journal binaire comparé au débit de la liaison série."""
+    noyau = charger_noyau()
+    resultats = mesurer_journal(noyau, args.trames)
+    afficher(resultats)
+    print(f"Marge sur la liaison : x{resultats[1]['mesure'] / resultats[2]['mesure']:.0f}")
+
+
+def bench_delestage(args):
+    """Images de l'interface sous réception saturée, avec et sans décodage délégué à un processus."""
+    from PySide6.QtWidgets import QApplication
+    app = charger_application()
+    qapp = QApplication.instance() or QApplication([])
+    resultats = []
+    for processus in (0, 1):
+        resultats += mesurer_delestage(app, qapp, processus, args.series, args.duree)
+    afficher(resultats)
+
+
+def bench_demarrage(args):
+    """Durées du démarrage, avec et sans démarrage rapide."""
+    if args.enfant:
+        demarrer_enfant(args.enfant == "rapide", args.historique)
+        return
+    afficher(mesurer_demarrage(False, args.repetitions) + mesurer_demarrage(True, args.repetitions))
+
+
+def bench_navigation(args):
+    """Requêtes et navigation (zoom, déplacement) dans plusieurs jours d'historique."""
+    from PySide6.QtWidgets import QApplication
+    app = charger_application()
+    qapp = QApplication.instance() or QApplication([])
+    afficher(mesurer_navigation(app, qapp, args.jours, args.series))
+
+
+def bench_suite(args):
+    """Lance toutes les mesures, écrit les résultats et les compare à la référence."""
+    from PySide6.QtWidgets import QApplication
+    app = charger_application()
+    noyau = charger_noyau()
+    qapp = QApplication.instance() or QApplication([])
+
+    if args.rapide:
+        grille_series, grille_historique, grille_stations = (1, 23), (0, 3600), (1, 7)
+        duree, trames = 1.5, 5000
+    else:
+        grille_series, grille_historique, grille_stations = (1, 5, 23), (0, 3600, 86400), (1, 4, 7)
+        duree, trames = 3.0, 20000
+
+    resultats = []
+    for rapide in (False, True):
+        resultats += mesurer_demarrage(rapide, 3 if args.rapide else 5)
+    resultats += mesurer_analyse(noyau, generer_lignes(noyau.STATIONS, trames))
+    resultats += mesurer_stockage(noyau, trames)
+    resultats += mesurer_journal(noyau, trames * 5)
+    for nb_series in grille_series:
+        for historique in grille_historique:
+            resultats += mesurer_graphique(app, qapp, nb_series, historique)
+    resultats += mesurer_tableau(app, qapp)
+    resultats += mesurer_navigation(app, qapp, 2 if args.rapide else 7)
+    for nb_stations in grille_stations:
+        nb_variables = sum(len(v) for v in sous_stations(noyau, nb_stations).values())
+        for nb_series in sorted({min(n, nb_variables) for n in grille_series}):
+            for historique in grille_historique:
+                resultats += mesurer_bout_en_bout(app, qapp, nb_stations, nb_series, historique, args.frequence, duree)
+    afficher(resultats)
+
+    rapport = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "resultats": resultats,
+    }
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as fichier:
+            json.dump(rapport, fichier, indent=2, ensure_ascii=False)
+    if args.enregistrer_reference:
+        with open(args.reference, "w", encoding="utf-8") as fichier:
+            json.dump(rapport, fichier, indent=2, ensure_ascii=False)
+        print(f"Référence enregistrée : {args.reference}")
+        return
+    if not os.path.exists(args.reference):
+        print("Pas de référence enregistrée : comparaison ignorée (voir --enregistrer-reference)")
+        return
+    with open(args.reference, encoding="utf-8") as fichier:
+        reference = json.load(fichier)["resultats"]
+    regressions = comparer(resultats, reference, args.tolerance)
+    for res, ref, facteur in regressions:
+        print(f"RÉGRESSION {cle_resultat(res)} : {ref['mesure']:.3f} -> {res['mesure']:.3f} {res['unite']} (x{facteur:.2f})")
+    if regressions:
+        sys.exit(1)
+    print(f"Aucune régression au-delà de {args.tolerance:.0%} par rapport à la référence")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sous_commandes = parser.add_subparsers(dest="commande", required=True)
+
+    analyse = sous_commandes.add_parser("analyse", help="Débit de l'analyse des trames")
+    analyse.add_argument("--capture", help="Fichier de trames enregistrées (sinon trames générées)")
+    analyse.add_argument("--trames", type=int, default=20000, help="Nombre de trames générées")
+    analyse.set_defaults(fonction=bench_analyse)
+
+    journal = sous_commandes.add_parser("journal", help="Débit du journal binaire")
+    journal.add_argument("--trames", type=int, default=100000, help="Nombre de trames journalisées")
+    journal.set_defaults(fonction=bench_journal)
+
+    delestage = sous_commandes.add_parser("delestage", help="Images de l'interface sous réception saturée, avec et sans --processus")
+    delestage.add_argument("--duree", type=float, default=5.0, help="Durée de chaque mesure (s)")
+    delestage.add_argument("--series", type=int, default=5, help="Nombre de courbes tracées")
+    delestage.set_defaults(fonction=bench_delestage)
+
+    demarrage = sous_commandes.add_parser("demarrage", help="Durées du démarrage, avec et sans --demarrage-rapide")
+    demarrage.add_argument("--repetitions", type=int, default=5, help="Lancements par mode (la médiane est retenue)")
+    demarrage.add_argument("--enfant", choices=("normal", "rapide"), help=argparse.SUPPRESS)
+    demarrage.add_argument("--historique", help=argparse.SUPPRESS)
+    demarrage.set_defaults(fonction=bench_demarrage)
+
+    navigation = sous_commandes.add_parser("navigation", help="Requêtes, zoom et déplacement dans l'historique du journal")
+    navigation.add_argument("--jours", type=int, default=7, help="Jours de journal écrits à une trame par seconde")
+    navigation.add_argument("--series", type=int, default=5, help="Nombre de courbes tracées")
+    navigation.set_defaults(fonction=bench_navigation)
+
+    suite = sous_commandes.add_parser("suite", help="Toutes les étapes et le bout en bout, comparés à la référence")
+    suite.add_argument("--rapide", action="store_true", help="Grille de paramètres réduite")
+    suite.add_argument("--frequence", type=float, default=100.0, help="Trames/s générées pour le bout en bout")
+    suite.add_argument("--sortie", help="Fichier JSON des résultats")
+    suite.add_argument("--reference", default=REFERENCE_DEFAUT, help="Fichier JSON de référence")
+    suite.add_argument("--tolerance", type=float, default=0.2, help="Écart toléré avant de signaler une régression")
+    suite.add_argument("--enregistrer-reference", action="store_true", help="Enregistre les résultats comme référence")
+    suite.set_defaults(fonction=bench_suite)
+
+    args = parser.parse_args()
+    args.fonction(args)
+
+
+if __name__ == "__main__":
+    main()
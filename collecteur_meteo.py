@@ -0,0 +1,43 @@
+"""Collecteur sans affichage : réception, stockage, statistiques et journal, sans Qt ni matplotlib.
+
+Ses anneaux sont en mémoire partagée ; les fenêtres lancées avec --collecteur les relisent à chaque notification
+reçue sur une socket Unix. Un collecteur peut alimenter plusieurs fenêtres, qui peuvent aller et venir.
+
+Usage :
+    python collecteur_meteo.py --port /dev/ttyUSB0 --port tcp://192.168.1.20:5000 [--socket CHEMIN] [--diagnostics 60]
+    python "Projet Arduino Météo.py" --collecteur [CHEMIN]
+"""
+import argparse
+import signal
+import sys
+
+from noyau_meteo import (DOSSIER_HISTORIQUE, SOCKET_COLLECTEUR, STATIONS, Collecteur, ajouter_options_reception,
+                         creer_source, importer_captures)
+
+
+def lire_arguments(arguments):
+    """Lit les options de la ligne de commande."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ajouter_options_reception(parser)
+    parser.add_argument("--socket", default=SOCKET_COLLECTEUR, help="Socket Unix servie aux fenêtres (défaut : %(default)s)")
+    parser.add_argument("--diagnostics", type=float, metavar="SECONDES",
+                        help="Affiche compteurs, latences, horloges et statistiques à cette période")
+    return parser.parse_args(arguments)
+
+
+def main():
+    options = lire_arguments(sys.argv[1:])
+    importer_captures(options)
+    collecteur = Collecteur(STATIONS, creer_source(options, STATIONS), options.socket, DOSSIER_HISTORIQUE, options.processus)
+    signal.signal(signal.SIGTERM, lambda *_: collecteur.arreter())
+    print(f"Collecteur prêt : {options.socket}", flush=True)
+    try:
+        collecteur.executer(options.diagnostics)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collecteur.fermer()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2971 @@
+"""Noyau de l'application Météo, sans interface : réception, décodage, horodatage, stockage, statistiques et journal.
+
+Importé par la fenêtre ("Projet Arduino Météo.py") et par le collecteur sans affichage (collecteur_meteo.py) ;
+n'importe ni Qt ni matplotlib.
+"""
+import asyncio
+import json
+import mmap
+import multiprocessing
+import os
+import random
+import socket
+import tempfile
+from collections import deque
+from copy import copy
+from multiprocessing import resource_tracker, shared_memory
+from threading import Thread, Lock, Event, Condition
+from math import exp
+from time import monotonic, monotonic_ns, perf_counter, perf_counter_ns, sleep
+from datetime import datetime, date, time, timedelta
+import numpy as np
+
+# Configuration du port série
+PORT_UTILISE = '/dev/ttyUSB0'  # Port série utilisé
+VITESSE = 115200  # Vitesse de communication en bauds
+
+# Stations et variables, dans l'ordre des numéros de station envoyés par l'Arduino
+STATIONS = {
+    "Rennes": ["Luminosité ☀️"],
+    "Guingamp": ["Pression(b) 🌫️", "Oxygène 🌱"],
+    "Pouillac": ["Anémomètre 🌬️"],
+    "Wakanda": ["Température 🌡️", "Humidité 💧"],
+    "Thouars": ["Température 🌡️", "Humidité 💧", "CO2 🏭"],
+    "Saint-Leu": ["Particules fines ⚪"],
+    "Perpignan": ["Particules fines ⚪", "UV", "Anémomètre 🌬️", "Température 🌡️", "Humidité 💧", "Luminosité ☀️", "Pression 🌫️", "CO2 🏭", "Girou 🌬️", "Pluie 🌧️", "Oxygène 🌱", "COV", "ECO2"],
+}
+
+# Historique conservé en mémoire : nombre d'échantillons par station
+CAPACITE_HISTORIQUE = 6 * 3600  # 6 heures à une trame par seconde
+
+# Journal binaire de tous les échantillons reçus, un dossier par jour
+DOSSIER_HISTORIQUE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "historique")
+JOURS_RECHARGES = 2  # Jours d'historique rechargés au démarrage
+PERIODE_ECRITURE_JOURNAL = 0.5  # Secondes entre deux écritures groupées
+BLOC_INDEX_JOURNAL = 1024  # Enregistrements par bloc de l'index clairsemé (temps extrêmes de chaque bloc)
+PAS_AGREGATS_JOURNAL = 60  # Secondes : agrégats min/max tenus pour chaque fichier du journal consulté
+
+# Files bornées entre la réception et ses consommateurs : politique appliquée quand une file est pleine
+PERTE_PLUS_ANCIEN = "plus_ancien"  # Les éléments les plus anciens sont jetés
+FUSION = "fusion"  # Un élément remplace celui de même clé encore en attente ; pleine, comme PERTE_PLUS_ANCIEN
+BLOCAGE = "blocage"  # Le producteur attend que le consommateur ait fait de la place
+POLITIQUES_FILE = (PERTE_PLUS_ANCIEN, FUSION, BLOCAGE)
+CAPACITE_FILE_JOURNAL = 256 * 1024  # Échantillons en attente d'écriture
+# La réception n'attend jamais le disque : s'il ne suit plus, les plus anciens échantillons en attente sont jetés
+# (comptés dans les pertes de la file) ; BLOCAGE reste possible sur demande
+POLITIQUE_FILE_JOURNAL = PERTE_PLUS_ANCIEN
+CAPACITE_FILE_NOTIFICATIONS = 4096  # Clés (station, variable) en attente d'affichage
+
+# Moteur de réception multi-ports (série, TCP, UDP) dans une seule boucle asyncio
+TAILLE_LECTURE = 64 * 1024  # Octets demandés par lecture
+LONGUEUR_TRAME_MAX = 64 * 1024  # Au-delà, un reste sans fin de ligne est jeté
+DELAI_RECONNEXION_MIN = 0.5  # Secondes avant la première tentative de reconnexion
+DELAI_RECONNEXION_MAX = 30.0  # Plafond du délai, doublé à chaque échec
+TAILLE_DECODAGE_MASSIF = 16 * 1024  # Morceau à partir duquel (arriéré d'une carte) les trames sont décodées en bloc
+
+# Décodage délégué à des processus (option --processus) : lots en colonnes rendus par mémoire partagée
+TAILLE_ZONE_PARTAGEE = 4 * 1024 * 1024  # Octets par zone
+ZONES_PAR_PROCESSUS = 4  # Lots en vol par processus avant qu'il attende une zone libérée
+MORCEAUX_EN_VOL = 8  # Morceaux confiés à un processus et pas encore rendus avant que la lecture attende
+
+# Horodatage : horloge de réception monotone, et recalage en continu de l'horloge de chaque station sur elle
+CONSTANTE_RECALAGE = 600.0  # Constante de temps (s) de l'oubli dans l'estimation du décalage et de la dérive
+SEUIL_RETARD = 2 * 10**9  # ns : écart à l'attendu au-delà duquel un échantillon est en retard (arriéré) ou incohérent
+DUREE_RECALAGE = 10 * 10**9  # ns de réception pendant lesquels un écart stable mais incohérent est toléré avant recalage
+ETALEMENT_DERIVE = 10 * 10**9  # ns : étalement minimal des réceptions (écart type) pour estimer une dérive
+DERIVE_MAX = 1e-3  # Dérive maximale crue (1000 ppm)
+
+# Fréquence maximale de rafraîchissement de l'affichage (Hz) ; aucun rafraîchissement sans nouvelles données
+FREQUENCE_RAFRAICHISSEMENT_MAX = 30
+
+# Agrégats min/max/moyenne précalculés : durée d'un seau (s) -> nombre de seaux conservés
+RESOLUTIONS_AGREGATS = {
+    1: 6 * 3600,  # 6 heures
+    10: 24 * 360,  # 24 heures
+    60: 7 * 1440,  # 7 jours
+    600: 30 * 144,  # 30 jours
+}
+DUREE_AFFICHEE_DEFAUT = 60  # Fenêtre de temps tracée (s)
+FACTEUR_ZOOM = 1.25  # Rapport des fenêtres tracées entre deux crans de molette
+DUREE_VUE_MIN = 1  # Fenêtre tracée la plus courte (s) en zoomant
+DUREE_VUE_MAX = 366 * 86400  # Fenêtre tracée la plus longue (s) en dézoomant
+
+# Statistiques glissantes par variable (moyenne, écart type, min, max), tenues à jour à chaque échantillon
+FENETRES_STATISTIQUES = {"1 min": 60, "10 min": 600, "1 h": 3600}  # Libellé -> durée (s)
+# Seuils d'alerte (bas, haut ; None : pas de seuil) vérifiés sur chaque échantillon reçu
+SEUILS_ALERTE = {
+    ("Thouars", "CO2 🏭"): (None, 1000.0),
+    ("Perpignan", "UV"): (None, 8.0),
+}
+ALERTES_CONSERVEES = 100  # Derniers évènements d'alerte gardés pour la page de diagnostic
+SECONDES_RANGEES_EN_BLOC = 64  # Au-delà (rechargement de l'historique), fenêtres et files recalculées d'un coup
+PERIODE_STATISTIQUES_TABLEAU = 1.0  # Secondes entre deux mises à jour des colonnes de statistiques du tableau
+
+# Collecteur sans affichage : anneaux en mémoire partagée, fenêtres clientes prévenues par une socket Unix
+SOCKET_COLLECTEUR = os.path.join(tempfile.gettempdir(), "meteo_collecteur.sock")
+PERIODE_PUBLICATION = 1.0 / FREQUENCE_RAFRAICHISSEMENT_MAX  # Secondes minimales entre deux notifications aux clients
+
+# Les temps sont stockés en nanosecondes (int64) depuis cette époque, heure locale
+EPOQUE = datetime(1970, 1, 1)
+NS_PAR_JOUR = 86400 * 10**9
+
+
+def datetime_vers_ns(temps):
+    """Convertit un datetime (heure locale) en nanosecondes depuis EPOQUE."""
+    return (temps - EPOQUE) // timedelta(microseconds=1) * 1000
+
+
+def ns_vers_dates_mpl(temps):
+    """Convertit un tableau de temps en ns en dates matplotlib, en une seule opération vectorisée."""
+    import matplotlib.dates as mdates
+    return temps / NS_PAR_JOUR + mdates.date2num(EPOQUE)
+
+
+def dates_mpl_vers_ns(dates):
+    """Convertit une date matplotlib en temps en ns (inverse de ns_vers_dates_mpl)."""
+    import matplotlib.dates as mdates
+    return int(round((dates - mdates.date2num(EPOQUE)) * NS_PAR_JOUR))
+
+
+# Instrumentation permanente : compteurs et histogrammes de latence à taille fixe
+class HistogrammeLatence:
+    SOUS_SEAUX = 16  # Seaux par puissance de 2 : environ 6 % de précision
+
+    def __init__(self, unite="µs", nb_puissances=40):
+        """Histogramme log-linéaire (façon HDR) de valeurs entières positives."""
+        self.unite = unite
+        self.taille = (nb_puissances + 1) * self.SOUS_SEAUX
+        self.comptes = [0] * self.taille
+        self.total = 0
+        self.somme = 0
+        self.maximum = 0
+
+    def enregistrer(self, valeur):
+        """Ajoute une valeur en O(1), sans allocation."""
+        valeur = int(valeur)
+        if valeur < 32:  # 2 * SOUS_SEAUX premières valeurs : un seau chacune
+            index = valeur if valeur > 0 else 0
+        else:
+            decalage = valeur.bit_length() - 5
+            index = (decalage << 4) + (valeur >> decalage)
+            if index >= self.taille:
+                index = self.taille - 1
+        self.comptes[index] += 1
+        self.total += 1
+        self.somme += valeur
+        if valeur > self.maximum:
+            self.maximum = valeur
+
+    def borne(self, index):
+        """Plus petite valeur du seau `index`."""
+        if index < 2 * self.SOUS_SEAUX:
+            return index
+        decalage = index // self.SOUS_SEAUX - 1
+        return (index % self.SOUS_SEAUX + self.SOUS_SEAUX) << decalage
+
+    def percentile(self, p):
+        """Valeur sous laquelle se trouvent p % des valeurs enregistrées."""
+        if not self.total:
+            return 0
+        seuil, cumul = p / 100 * self.total, 0
+        for index, compte in enumerate(self.comptes):
+            cumul += compte
+            if compte and cumul >= seuil:
+                return min(self.borne(index + 1), self.maximum)
+        return self.maximum
+
+    def resume(self):
+        """Dictionnaire des statistiques principales."""
+        return {
+            "unite": self.unite,
+            "nombre": self.total,
+            "moyenne": self.somme / self.total if self.total else 0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.maximum,
+        }
+
+
+class Instrumentation:
+    def __init__(self, stations):
+        """Compteurs par station et histogrammes par étape, assez légers pour rester toujours actifs."""
+        self.stations = stations
+        self.compteurs = {station: {"recues": 0, "perdues": 0, "malformees": 0} for station in stations}
+        self.lignes_illisibles = 0  # Trames non décodables en UTF-8
+        self.blocs_inconnus = 0  # Blocs dont le numéro de station est inconnu
+        self.connexions = {}  # Adresse -> état, octets reçus et reconnexions (moteur multi-ports)
+        self.histogrammes = {
+            "analyse": HistogrammeLatence("µs"),
+            "file_journal": HistogrammeLatence("échantillons"),
+            "arrivee_affichage": HistogrammeLatence("µs"),
+            "maj_graphique": HistogrammeLatence("µs"),
+            "maj_tableau": HistogrammeLatence("µs"),
+        }
+        self.demarrage = {}  # Durées du démarrage (ms) : imports, fenêtre, pages... (renseignées par la fenêtre)
+        self.files = {}  # Nom -> FileBornee dont les compteurs sont rapportés (renseigné par la fenêtre ou le collecteur)
+        self.debut = monotonic()
+
+    def compter(self, station, nature, nombre=1):
+        """Incrémente un compteur d'une station ("recues", "perdues" ou "malformees")."""
+        self.compteurs[station][nature] += nombre
+
+    def connexion(self, adresse):
+        """Compteurs d'une entrée du moteur multi-ports, créés au premier appel."""
+        if adresse not in self.connexions:
+            self.connexions[adresse] = {"etat": "connexion", "octets": 0, "reconnexions": 0, "derniere_erreur": None}
+        return self.connexions[adresse]
+
+    def enregistrer(self, etape, valeur):
+        """Enregistre une mesure dans l'histogramme d'une étape."""
+        self.histogrammes[etape].enregistrer(valeur)
+
+    def rapport(self):
+        """Instantané de tous les compteurs et histogrammes."""
+        return {
+            "duree_s": monotonic() - self.debut,
+            "stations": {station: dict(compteurs) for station, compteurs in self.compteurs.items()},
+            "lignes_illisibles": self.lignes_illisibles,
+            "blocs_inconnus": self.blocs_inconnus,
+            "connexions": {adresse: dict(compteurs) for adresse, compteurs in self.connexions.items()},
+            "histogrammes": {etape: histogramme.resume() for etape, histogramme in self.histogrammes.items()},
+            "demarrage_ms": dict(self.demarrage),
+            "files": {nom: file.compteurs() for nom, file in self.files.items()},
+        }
+
+    def texte(self):
+        """Rapport mis en forme pour la page de diagnostic."""
+        rapport = self.rapport()
+        lignes = [f"Durée : {rapport['duree_s']:.0f} s    Lignes illisibles : {rapport['lignes_illisibles']}"
+                  f"    Blocs inconnus : {rapport['blocs_inconnus']}", "",
+                  f"{'Station':<12}{'reçues':>10}{'perdues':>10}{'malformées':>12}"]
+        for station, compteurs in rapport["stations"].items():
+            lignes.append(f"{station:<12}{compteurs['recues']:>10}{compteurs['perdues']:>10}{compteurs['malformees']:>12}")
+        if rapport["connexions"]:
+            lignes += ["", f"{'Entrée':<28}{'état':>12}{'octets':>12}{'reconnexions':>14}"]
+            for adresse, compteurs in rapport["connexions"].items():
+                lignes.append(f"{adresse:<28}{compteurs['etat']:>12}{compteurs['octets']:>12}{compteurs['reconnexions']:>14}")
+        if rapport["files"]:
+            lignes += ["", f"{'File':<16}{'politique':>13}{'attente':>9}{'max':>9}{'déposés':>11}{'perdus':>9}"
+                           f"{'fusionnés':>11}{'blocages':>10}"]
+            for nom, compteurs in rapport["files"].items():
+                lignes.append(f"{nom:<16}{compteurs['politique']:>13}{compteurs['en_attente']:>9}{compteurs['max']:>9}"
+                              f"{compteurs['deposes']:>11}{compteurs['perdus']:>9}{compteurs['fusionnes']:>11}"
+                              f"{compteurs['blocages']:>10}")
+        lignes += ["", f"{'Étape':<20}{'nombre':>9}{'moyenne':>10}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  unité"]
+        for etape, resume in rapport["histogrammes"].items():
+            lignes.append(f"{etape:<20}{resume['nombre']:>9}{resume['moyenne']:>10.0f}{resume['p50']:>9}"
+                          f"{resume['p90']:>9}{resume['p99']:>9}{resume['max']:>9}  {resume['unite']}")
+        lignes += ["", "Démarrage (ms) : " + "    ".join(f"{etape} {duree:.0f}" for etape, duree in rapport["demarrage_ms"].items())]
+        return "\n".join(lignes)
+
+    def exporter(self, chemin):
+        """Écrit le rapport complet (histogrammes détaillés compris) dans un fichier JSON."""
+        rapport = self.rapport()
+        for etape, histogramme in self.histogrammes.items():
+            rapport["histogrammes"][etape]["seaux"] = {histogramme.borne(i): compte for i, compte in enumerate(histogramme.comptes) if compte}
+        with open(chemin, "w", encoding="utf-8") as fichier:
+            json.dump(rapport, fichier, indent=2, ensure_ascii=False)
+
+
+# Analyse des trames reçues
+class AnalyseurTrames:
+    def __init__(self, stations, instrumentation=None):
+        """Prépare la table d'index des stations et le cache de l'heure."""
+        self.stations = stations
+        self.instrumentation = instrumentation or Instrumentation(stations)
+        # Table d'index précalculée : numéro de station (texte) -> nom de la station
+        self.index_stations = {str(i + 1): nom for i, nom in enumerate(stations)}
+        # Cache de l'heure : la plupart des trames d'une même seconde partagent le même "HH:MM:SS"
+        self.heure_texte = None
+        self.heure_ns = None
+
+    def analyser(self, ligne):
+        """Convertit une trame en dictionnaire {station: (heure en ns depuis minuit ou None, valeurs)} en une seule passe."""
+        dic, bloc = {}, []
+        for item in ligne.split('|')[1:-1]:
+            if item == ' & ':
+                if bloc:
+                    self.decoder_bloc(bloc, dic)
+                    bloc = []
+            else:
+                bloc.append(item)
+        if bloc:
+            self.decoder_bloc(bloc, dic)
+        return dic
+
+    def decoder_bloc(self, bloc, dic):
+        """Décode le bloc d'une station (numéro, nom, heure, valeurs...) et l'ajoute au dictionnaire."""
+        numero = bloc[0].strip()
+        station_nom = self.index_stations.get(numero)
+        if station_nom is None:
+            try:
+                station_nom = self.index_stations.get(str(int(float(numero))))  # Ex : "4.0"
+            except (ValueError, OverflowError):  # OverflowError : "inf", "1e400"
+                pass
+            if station_nom is None:
+                self.instrumentation.blocs_inconnus += 1
+                return
+        if len(bloc) < 3:  # Bloc incomplet : ignoré
+            self.instrumentation.compter(station_nom, "perdues")
+            return
+        heure = self.convertir_heure(bloc[2].strip())
+        malformee = heure is None
+        valeurs = []
+        for item in bloc[3:]:
+            try:
+                # float() accepte directement les négatifs, les exposants et les espaces
+                valeurs.append(float(item))
+            except ValueError:
+                valeurs.append(item.strip())  # Conserve les chaînes de caractères
+                malformee = True
+        if malformee:
+            self.instrumentation.compter(station_nom, "malformees")
+        dic[station_nom] = (heure, valeurs)
+
+    def convertir_heure(self, temps_str):
+        """Convertit "HH:MM:SS" en nanosecondes depuis minuit, en réutilisant le dernier résultat si l'heure n'a pas changé.
+
+        La date n'est pas fixée ici : c'est l'horodateur qui choisit le jour, passages de minuit compris.
+        """
+        if temps_str == self.heure_texte:
+            return self.heure_ns
+        try:
+            heures, minutes, secondes = (int(champ) for champ in temps_str.split(':'))
+            if not (0 <= heures < 24 and 0 <= minutes < 60 and 0 <= secondes < 60):
+                raise ValueError(temps_str)
+            temps = ((heures * 60 + minutes) * 60 + secondes) * 10**9
+        except ValueError:  # Format de temps invalide
+            temps = None
+        self.heure_texte, self.heure_ns = temps_str, temps
+        return temps
+
+
+TEMPS_ABSENT = np.iinfo(np.int64).min  # Heure illisible dans une trame, ou temps d'appareil inconnu
+# Octets décodés à la fois : les tableaux de travail (quelques dizaines de milliers de champs) restent dans le cache
+PAQUET_DECODAGE_MASSIF = 256 * 1024
+
+# Classes de caractères des nombres : chiffre, signe, point, possible pour float() ("e", lettres de nan/inf, "_"), autre
+CLASSES_NOMBRE = np.full(256, 4, dtype=np.int8)
+CLASSES_NOMBRE[np.frombuffer(b"0123456789", dtype=np.uint8)] = 0
+CLASSES_NOMBRE[np.frombuffer(b"+-", dtype=np.uint8)] = 1
+CLASSES_NOMBRE[ord(".")] = 2
+CLASSES_NOMBRE[np.frombuffer(b"eEiInNfFaAtTyY_", dtype=np.uint8)] = 3
+CHIFFRES_EXACTS = 15  # Mantisse exacte en float64 : entier / 10**k est alors arrondi comme float()
+LARGEUR_NOMBRE_MAX = 32  # Champs plus longs convertis un par un
+
+# Champs courts lus d'un coup : les 8 octets qui finissent un champ forment un mot de 64 bits (premier octet en poids
+# faible), traité octet par octet avec des opérations entières sur tout le tableau de mots
+MOT = np.uint64
+SEPT_BITS = MOT(0x7F7F7F7F7F7F7F7F)
+BITS_HAUTS = MOT(0x8080808080808080)
+ZEROS_ASCII = MOT(0x3030303030303030)  # "00000000"
+POINT_XOR_ZERO = MOT(0x1E)  # "." ^ "0"
+MODELE_HEURE = MOT(0x30303A30303A3030)  # "00:00:00"
+OCTETS_DEUX_POINTS = MOT(0x0000FF0000FF0000)  # Place des ":" de "HH:MM:SS"
+# Pour un champ de n octets (0 à 8) en fin de mot : ses octets, et le bit haut de son premier octet
+OCTETS_CHAMP = np.array([(2**64 - 1) << 8 * (8 - n) & (2**64 - 1) for n in range(9)], dtype=np.uint64)
+BIT_PREMIER_OCTET = np.array([0x80 << 8 * (8 - n) & (2**64 - 1) for n in range(9)], dtype=np.uint64)
+# Diviseurs 10**décimales, négatifs pour les nombres négatifs ("-0" donne -0.0 comme float())
+DIVISEURS = np.concatenate((10.0 ** np.arange(8), -10.0 ** np.arange(8)))
+
+
+def mots_avant(a, positions):
+    """Mots de 64 bits formés des 8 octets a[position - 8:position], complétés par des "0" avant le début du tampon."""
+    tampon = np.concatenate((np.full(8, 48, dtype=np.uint8), a))
+    return np.ndarray((len(a) + 1,), "<u8", tampon, 0, (1,))[positions]  # Une fenêtre de 8 octets par position
+
+
+def octets_non_chiffres(x):
+    """Bit haut de chaque octet de x qui vaut 10 ou plus (x = mot ^ ZEROS_ASCII : les chiffres y valent 0 à 9)."""
+    return (((x & SEPT_BITS) + MOT(0x7676767676767676)) | x) & BITS_HAUTS
+
+
+def valeur_8_chiffres(x):
+    """Entier écrit par les 8 chiffres de chaque mot (valeurs 0 à 9, un par octet, le plus significatif en poids faible)."""
+    x = x * MOT(10) + (x >> MOT(8))  # Nombres de deux chiffres
+    return ((x & MOT(0x000000FF000000FF)) * MOT(100 + (1000000 << 32))
+            + ((x >> MOT(16)) & MOT(0x000000FF000000FF)) * MOT(1 + (10000 << 32))) >> MOT(32)
+
+
+def nombres_courts(a, premier, longueur):
+    """Décimaux simples ("[signe] chiffres [. chiffres]") d'au plus 8 caractères, un mot par champ.
+
+    Retourne (valeurs, simples) ; les valeurs des champs qui ne sont pas simples n'ont pas de sens.
+    """
+    octets = OCTETS_CHAMP[longueur]
+    x = (mots_avant(a, premier + longueur) ^ ZEROS_ASCII) & octets  # Octets avant le champ : des zéros en tête
+    non_chiffres = octets_non_chiffres(x)
+    tete = a[premier]
+    negatif = tete == 45
+    # Hors signe en tête, un seul octet qui n'est pas un chiffre, et c'est un point
+    point = (non_chiffres & ~(BIT_PREMIER_OCTET[longueur] * (negatif | (tete == 43)))) >> MOT(7)
+    simples = ((point & (point - MOT(1))) == 0) & ((x & point * MOT(0xFF)) == point * POINT_XOR_ZERO) \
+        & ((octets & ~non_chiffres & BITS_HAUTS) != 0)  # Au moins un chiffre
+    x &= ~((non_chiffres >> MOT(7)) * MOT(0xFF))  # Signe et point comptés comme des zéros...
+    avant_point = point - (point != 0)
+    x = ((x & avant_point) << MOT(8)) | (x & ~avant_point)  # ... puis la partie entière décalée sur la place du point
+    decimales = ((point * MOT(0x0706050403020100)) >> MOT(56) & MOT(7)).astype(np.intp)  # Octets après le point (0 à 7)
+    return valeur_8_chiffres(x).view(np.int64) / DIVISEURS[decimales + 8 * negatif], simples
+
+
+def dater_heures(heures, jour):
+    """Date des heures (ns depuis minuit, dans l'ordre des trames) à partir de `jour`, en comptant les passages de minuit.
+
+    Sert aux captures, sans horloge de réception : une heure illisible prend celle de l'échantillon précédent.
+    """
+    if not len(heures):
+        return heures.copy()
+    indices = np.where(heures != TEMPS_ABSENT, np.arange(len(heures)), -1)
+    np.maximum.accumulate(indices, out=indices)
+    heures = np.where(indices >= 0, heures[np.maximum(indices, 0)], 0)
+    # Minuit est passé quand l'heure recule de plus de 12 h d'une trame à la suivante
+    passages = np.cumsum(np.r_[0, np.diff(heures) < -NS_PAR_JOUR // 2])
+    return datetime_vers_ns(datetime.combine(jour, time())) + passages * NS_PAR_JOUR + heures
+
+
+class DecodeurMassif:
+    def __init__(self, stations):
+        """Décode d'un coup un grand tampon de trames (capture, arriéré d'une carte) en colonnes NumPy."""
+        self.stations = stations
+        self.noms = list(stations)
+        self.nb_variables = np.array([len(variables) for variables in stations.values()])
+        self.largeur = int(self.nb_variables.max()) if len(self.nb_variables) else 0
+        self.analyseur = AnalyseurTrames(stations)  # Pour les rares heures hors du format "HH:MM:SS"
+
+    def decoder(self, tampon, jour=None, horodateur=None, reception=None):
+        """Décode toutes les trames (une par ligne) d'un tampon d'octets (bytes, memoryview, mmap...).
+
+        Retourne (colonnes, erreurs) : colonnes = {station: (temps int64 (n,), valeurs float64 (n, nb_variables),
+        temps de l'appareil int64 (n,))}, dans l'ordre des trames, avec les mêmes règles que AnalyseurTrames ;
+        erreurs = numéros de ligne (à partir de 0) des trames "illisibles" et des blocs "inconnus", et par station
+        des blocs "incomplets" et "malformes".
+        Avec un horodateur, les trames sont considérées reçues à l'instant `reception` (maintenant par défaut) ;
+        sans horodateur (capture importée), les heures sont datées à partir du `jour` donné (aujourd'hui par défaut)
+        et le temps retenu est celui de l'appareil.
+        """
+        octets = np.frombuffer(tampon, dtype=np.uint8)
+        # Découpage en paquets de lignes entières : les tableaux de travail restent petits
+        fins = np.flatnonzero(octets == 10)
+        paquets, debut, ligne0 = [], 0, 0
+        while debut < len(octets):
+            fin = len(octets)
+            if fin - debut > PAQUET_DECODAGE_MASSIF:
+                k = np.searchsorted(fins, debut + PAQUET_DECODAGE_MASSIF)
+                if k < len(fins):
+                    fin = int(fins[k]) + 1
+            paquets.append(self.decoder_paquet(octets[debut:fin], ligne0))
+            ligne0 += int(np.searchsorted(fins, fin) - np.searchsorted(fins, debut))
+            debut = fin
+        # Assemblage : blocs retenus dans l'ordre des trames
+        lignes = np.concatenate([p["ligne"] for p in paquets]) if paquets else np.empty(0, np.int64)
+        numeros = np.concatenate([p["station"] for p in paquets]) if paquets else np.empty(0, np.int64)
+        heures = np.concatenate([p["heures"] for p in paquets]) if paquets else np.empty(0, np.int64)
+        valeurs = np.concatenate([p["valeurs"] for p in paquets]) if paquets else np.empty((0, self.largeur))
+        if horodateur is None:
+            dates = dater_heures(heures, jour or date.today())
+            appareils = np.where(heures != TEMPS_ABSENT, dates, TEMPS_ABSENT)
+        elif reception is None:
+            reception = horodateur.horloge.maintenant()
+        colonnes = {}
+        for numero, station in enumerate(self.noms):
+            garder = np.flatnonzero(numeros == numero)
+            if len(garder):
+                if horodateur is None:
+                    temps, appareil = dates[garder], appareils[garder]
+                else:
+                    temps, appareil = horodateur.horodater_lot(station, heures[garder], reception)
+                colonnes[station] = (temps, valeurs[garder, :self.nb_variables[numero]], appareil)
+        erreurs = {
+            "illisibles": np.concatenate([p["illisibles"] for p in paquets]) if paquets else np.empty(0, np.int64),
+            "inconnus": np.concatenate([p["inconnus"] for p in paquets]) if paquets else np.empty(0, np.int64),
+        }
+        for nature in ("incomplets", "malformes"):
+            erreurs[nature] = {}
+            for numero, station in enumerate(self.noms):
+                indices = [p[nature][1][p[nature][0] == numero] for p in paquets]
+                indices = np.concatenate(indices) if indices else np.empty(0, np.int64)
+                if len(indices):
+                    erreurs[nature][station] = indices
+        return colonnes, erreurs
+
+    def decoder_paquet(self, a, ligne0):
+        """Décode un paquet de lignes entières ; les numéros de ligne commencent à ligne0."""
+        # Lignes : fins (exclues) et lignes illisibles (UTF-8 invalide, vérifié seulement si un octet >= 0x80)
+        fins = np.flatnonzero(a == 10)
+        if not len(fins) or fins[-1] != len(a) - 1:
+            fins = np.append(fins, len(a))
+        debuts = np.concatenate(([0], fins[:-1] + 1))
+        illisibles = []
+        for ligne in np.unique(np.searchsorted(fins, np.flatnonzero(a >= 0x80))):
+            try:
+                a[debuts[ligne]:fins[ligne]].tobytes().decode('utf-8')
+            except UnicodeDecodeError:
+                illisibles.append(ligne)
+        illisibles = np.array(illisibles, dtype=np.int64)
+
+        # Champs : entre deux "|" consécutifs d'une même ligne (ligne.split('|')[1:-1])
+        barres = np.flatnonzero(a == 124)
+        ligne_barre = np.repeat(np.arange(len(fins)), np.diff(np.searchsorted(barres, fins), prepend=0))  # Ligne de chaque "|"
+        champs = np.flatnonzero(ligne_barre[:-1] == ligne_barre[1:])
+        if len(illisibles):
+            champs = champs[~np.isin(ligne_barre[champs], illisibles)]
+        debut_champ, fin_champ, ligne_champ = barres[champs] + 1, barres[champs + 1], ligne_barre[champs]
+        # Séparateur de stations : champ exactement égal à " & "
+        separateur = np.zeros(len(champs), dtype=bool)
+        trois = np.flatnonzero(fin_champ - debut_champ == 3)
+        d = debut_champ[trois]
+        separateur[trois[(a[d] == 32) & (a[d + 1] == 38) & (a[d + 2] == 32)]] = True
+        # Blocs : un nouveau bloc au premier champ de chaque ligne et après chaque séparateur
+        nouveau = np.ones(len(champs), dtype=bool)
+        nouveau[1:] = (ligne_champ[1:] != ligne_champ[:-1]) | separateur[:-1]
+        elements = np.flatnonzero(~separateur)
+        debut_bloc = np.flatnonzero(nouveau[elements])
+        taille_bloc = np.diff(np.append(debut_bloc, len(elements)))
+        ligne_bloc = ligne_champ[elements[debut_bloc]]
+
+        # Bornes des champs une fois les espaces retirés (str.strip) : quelques passes, sur les seuls champs concernés
+        espace = (a - 9 < 5) | (a - 28 < 5)  # Blancs ASCII de str.strip() : 9 à 13 et 28 à 32 (soustraction modulo 256)
+        premier, fin = debut_champ[elements], fin_champ[elements]
+        premier += espace[premier] & (premier < fin)  # Cas courant : un espace de chaque côté
+        fin -= espace[fin - 1] & (premier < fin)
+        actifs = np.flatnonzero(espace[premier] & (premier < fin))
+        while len(actifs):
+            premier[actifs] += 1
+            actifs = actifs[(premier[actifs] < fin[actifs]) & espace[premier[actifs]]]
+        actifs = np.flatnonzero(espace[fin - 1] & (premier < fin))
+        while len(actifs):
+            fin[actifs] -= 1
+            actifs = actifs[(premier[actifs] < fin[actifs]) & espace[fin[actifs] - 1]]
+        longueur = fin - premier
+
+        # Numéro de station (premier champ) : un chiffre le plus souvent, sinon nombre tronqué comme int(float(numero))
+        p, n = premier[debut_bloc], longueur[debut_bloc]
+        c = a[p].astype(np.int64)
+        numero = np.where((n == 1) & (c >= 48) & (c <= 57), c - 49, -1)
+        autres = np.flatnonzero(n != 1)
+        nombres, valides = self.nombres(a, p[autres], n[autres])
+        connus = np.flatnonzero(valides & (nombres >= 1) & (nombres < len(self.noms) + 1))
+        numero[autres[connus]] = nombres[connus].astype(np.int64) - 1
+        numero[numero >= len(self.noms)] = -1
+        inconnus = ligne_bloc[numero < 0]
+        incomplet = (numero >= 0) & (taille_bloc < 3)
+        retenu = (numero >= 0) & (taille_bloc >= 3)
+        retenus = np.flatnonzero(retenu)
+
+        # Heure (troisième champ, ns depuis minuit) : "HH:MM:SS" lue d'un mot, les autres formes comme
+        # AnalyseurTrames.convertir_heure
+        temps = np.full(len(debut_bloc), TEMPS_ABSENT, dtype=np.int64)
+        p, n = premier[debut_bloc[retenus] + 2], longueur[debut_bloc[retenus] + 2]
+        x = mots_avant(a, p + n) ^ MODELE_HEURE
+        forme = (n == 8) & (octets_non_chiffres(x) == 0) & ((x & OCTETS_DEUX_POINTS) == 0)
+        chiffres = valeur_8_chiffres(x).view(np.int64)  # HH0MM0SS
+        heures, minutes, secondes = chiffres // 1000000, chiffres // 1000 % 100, chiffres % 100
+        correct = np.flatnonzero(forme & (heures < 24) & (minutes < 60) & (secondes < 60))
+        temps[retenus[correct]] = (heures * 3600 + minutes * 60 + secondes)[correct] * 10**9
+        for k in np.flatnonzero(~forme):  # Rare : conversion classique
+            texte = a[p[k]:p[k] + n[k]].tobytes().decode('utf-8', 'replace')
+            heure = self.analyseur.convertir_heure(texte.strip())  # Espaces Unicode compris
+            if heure is not None:
+                temps[retenus[k]] = heure
+        malforme = retenu & (temps == TEMPS_ABSENT)
+
+        # Valeurs (quatrième champ et suivants) : NaN si non numériques ; celles au-delà des variables sont ignorées
+        position = np.arange(len(elements)) - np.repeat(debut_bloc, taille_bloc)
+        bloc_element = np.repeat(np.arange(len(debut_bloc)), taille_bloc)
+        est_valeur = np.flatnonzero((position >= 3) & retenu[bloc_element])
+        b, k = bloc_element[est_valeur], position[est_valeur] - 3
+        nombres, valides = self.nombres(a, premier[est_valeur], longueur[est_valeur])
+        malforme[b[np.flatnonzero(~valides)]] = True
+        valeurs = np.full((len(debut_bloc), self.largeur), np.nan)
+        dans = np.flatnonzero(k < self.largeur)  # Au-delà des variables de sa station, une valeur est écartée à l'assemblage
+        valeurs.reshape(-1)[b[dans] * self.largeur + k[dans]] = nombres[dans]
+
+        # Une station présente deux fois dans une trame : comme dans le dictionnaire, le dernier bloc l'emporte
+        # mais garde la place du premier
+        cle = ligne_bloc[retenus] * len(self.noms) + numero[retenus]
+        if (np.diff(cle) <= 0).any():  # Sinon (cas courant) : stations dans l'ordre, chacune une fois
+            _, premiers = np.unique(cle, return_index=True)
+            _, derniers = np.unique(cle[::-1], return_index=True)
+            retenus = retenus[(len(retenus) - 1 - derniers)[np.argsort(premiers)]]
+        return {
+            "ligne": ligne_bloc[retenus] + ligne0,
+            "station": numero[retenus],
+            "heures": temps[retenus],
+            "valeurs": valeurs[retenus],
+            "illisibles": illisibles + ligne0,
+            "inconnus": inconnus + ligne0,
+            "incomplets": (numero[incomplet], ligne_bloc[incomplet] + ligne0),
+            "malformes": (numero[malforme], ligne_bloc[malforme] + ligne0),
+        }
+
+    @staticmethod
+    def nombres(a, premier, longueur):
+        """Convertit les champs (premier octet, longueur) en float64 ; retourne aussi où float() aurait réussi.
+
+        Les décimaux simples ("[signe] chiffres [. chiffres]") d'au plus 8 caractères sont lus d'un mot chacun ;
+        les plus longs (au plus CHIFFRES_EXACTS chiffres) sont calculés à partir de leurs chiffres, groupés par
+        longueur ; les autres passent par float(), un par un.
+        """
+        nombres = np.full(len(premier), np.nan)
+        valides = np.zeros(len(premier), dtype=bool)
+        courts = np.flatnonzero((longueur >= 1) & (longueur <= 8))
+        valeurs, simples = nombres_courts(a, premier[courts], longueur[courts])
+        simples = np.flatnonzero(simples)
+        nombres[courts[simples]] = valeurs[simples]
+        valides[courts[simples]] = True
+        restants = np.flatnonzero(~valides & (longueur > 0))
+        a_convertir = []
+        for largeur in np.unique(longueur[restants])[::-1]:
+            groupe = restants[longueur[restants] == largeur]
+            if largeur > LARGEUR_NOMBRE_MAX:
+                a_convertir.append(groupe)
+                continue
+            # Une passe par position de caractère, sur tous les champs du groupe à la fois
+            debut = premier[groupe]
+            mantisse = np.zeros(len(groupe), dtype=np.int64)  # Schéma de Horner sur les chiffres
+            chiffres = np.zeros(len(groupe), dtype=np.int8)
+            points = np.zeros(len(groupe), dtype=np.int8)
+            point = np.full(len(groupe), largeur - 1, dtype=np.int8)
+            complexe = np.zeros(len(groupe), dtype=bool)  # Exposant, lettres, signe hors de la tête...
+            impossible = np.zeros(len(groupe), dtype=bool)  # Caractère refusé par float() dans tous les cas...
+            unicode = np.zeros(len(groupe), dtype=bool)  # ... sauf à côté de chiffres ou d'espaces Unicode
+            for j in range(largeur):
+                caractere = a[debut + j]
+                classe = CLASSES_NOMBRE[caractere]
+                est_chiffre = classe == 0
+                mantisse = np.where(est_chiffre, mantisse * 10 + (caractere - 48), mantisse)
+                chiffres += est_chiffre
+                est_point = classe == 2
+                points += est_point
+                point[est_point] = j
+                complexe |= (classe >= 3) | (classe == 1) if j else classe >= 3
+                impossible |= classe == 4
+                unicode |= caractere >= 0x80
+            simple = ~complexe & (points <= 1) & (chiffres >= 1) & (chiffres <= CHIFFRES_EXACTS)
+            # Mantisse divisée par 10**décimales : arrondie une seule fois, comme par float()
+            valeurs = mantisse / 10.0 ** (largeur - 1 - point)
+            valeurs[a[debut] == 45] *= -1
+            nombres[groupe[simple]] = valeurs[simple]
+            valides[groupe[simple]] = True
+            a_convertir.append(groupe[~simple & (~impossible | unicode)])  # "1e5", "nan", "1.2.3", "٣"... : float() tranche
+        for k in np.concatenate(a_convertir) if a_convertir else ():
+            try:
+                nombres[k] = float(a[premier[k]:premier[k] + longueur[k]].tobytes().decode('utf-8'))
+                valides[k] = True
+            except ValueError:
+                pass
+        return nombres, valides
+
+
+# Stockage des échantillons
+class AnneauColonnes:
+    def __init__(self, capacite, nb_colonnes, temps=None, colonnes=None):
+        """Préalloue un tampon circulaire : temps int64 et une colonne float64 par variable (ou utilise ceux fournis)."""
+        self.capacite = capacite
+        # Chaque échantillon est écrit deux fois (en i et en i + capacité) :
+        # les n derniers échantillons forment toujours une tranche contiguë, lisible sans copie
+        self.temps = np.zeros(2 * capacite, dtype=np.int64) if temps is None else temps
+        self.colonnes = np.full((nb_colonnes, 2 * capacite), np.nan) if colonnes is None else colonnes
+        self.position = 0  # Prochain indice d'écriture
+        self.taille = 0
+        self.compteur = 0  # Nombre total d'échantillons écrits
+        self.sequence = 0  # Impaire pendant une écriture : une lecture qui l'a vue changer recommence
+
+    def ajouter(self, temps, valeurs):
+        """Écrit un échantillon (temps, une valeur par colonne) à la place du plus ancien."""
+        i, j = self.position, self.position + self.capacite
+        self.temps[i] = self.temps[j] = temps
+        self.colonnes[:, i] = self.colonnes[:, j] = valeurs
+        self.position = (i + 1) % self.capacite
+        self.taille = min(self.taille + 1, self.capacite)
+        self.compteur += 1
+
+    def ajouter_bloc(self, temps, colonnes):
+        """Écrit d'un coup n échantillons (temps de forme (n,), colonnes de forme (nb_colonnes, n))."""
+        n = len(temps)
+        if n > self.capacite:  # Seuls les plus récents tiennent dans l'anneau
+            temps, colonnes = temps[-self.capacite:], colonnes[:, -self.capacite:]
+        indices = (self.position + np.arange(len(temps))) % self.capacite
+        self.temps[indices] = self.temps[indices + self.capacite] = temps
+        self.colonnes[:, indices] = self.colonnes[:, indices + self.capacite] = colonnes
+        self.position = (self.position + len(temps)) % self.capacite
+        self.taille = min(self.taille + len(temps), self.capacite)
+        self.compteur += n
+
+    def tranche(self, n=None):
+        """Retourne la tranche des n derniers échantillons (tous par défaut)."""
+        n = self.taille if n is None else min(n, self.taille)
+        fin = self.position + self.capacite
+        return slice(fin - n, fin)
+
+    def vider(self):
+        """Oublie tous les échantillons."""
+        self.position = self.taille = 0
+        self.compteur += 1
+
+
+class NiveauAgregats:
+    def __init__(self, duree, capacite, nb_variables):
+        """Prépare un niveau d'agrégats : seaux de `duree` secondes, minimum, maximum et moyenne par variable."""
+        self.duree = duree * 10**9
+        self.nb_variables = nb_variables
+        # Colonnes de l'anneau : minimums, puis maximums, puis moyennes ; temps = début du seau
+        self.anneau = AnneauColonnes(capacite, 3 * nb_variables)
+        # Seau en cours de remplissage
+        self.seau = None
+        self.mins = self.maxs = self.sommes = self.comptes = None
+
+    def ajouter(self, temps, mins, maxs, sommes, comptes):
+        """Intègre un échantillon ou un agrégat ; retourne le seau qui vient de se terminer, ou None."""
+        seau = temps // self.duree
+        if self.seau is None:
+            self.seau, self.mins, self.maxs, self.sommes, self.comptes = seau, mins, maxs, sommes, comptes
+            return None
+        if seau <= self.seau:  # Même seau (ou échantillon en retard, rattaché au seau en cours)
+            self.mins = np.fmin(self.mins, mins)
+            self.maxs = np.fmax(self.maxs, maxs)
+            self.sommes = self.sommes + sommes
+            self.comptes = self.comptes + comptes
+            return None
+        termine = self.terminer()
+        self.seau, self.mins, self.maxs, self.sommes, self.comptes = seau, mins, maxs, sommes, comptes
+        return termine
+
+    def terminer(self):
+        """Range le seau en cours dans l'anneau et le retourne sous forme d'agrégat."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            moyennes = self.sommes / self.comptes
+        debut = self.seau * self.duree
+        self.anneau.ajouter(debut, np.concatenate((self.mins, self.maxs, moyennes)))
+        return debut, self.mins, self.maxs, self.sommes, self.comptes
+
+    def ajouter_bloc(self, temps, mins, maxs, sommes, comptes):
+        """Intègre d'un coup des échantillons ou agrégats triés par temps ; retourne les seaux terminés."""
+        if self.seau is not None:  # Le seau en cours est repris comme premier élément du bloc
+            temps = np.r_[self.seau * self.duree, temps]
+            mins, maxs = np.vstack((self.mins, mins)), np.vstack((self.maxs, maxs))
+            sommes, comptes = np.vstack((self.sommes, sommes)), np.vstack((self.comptes, comptes))
+        seaux = temps // self.duree
+        debuts = np.flatnonzero(np.r_[True, seaux[1:] != seaux[:-1]])
+        debuts_seaux = seaux[debuts] * self.duree
+        mins = np.fmin.reduceat(mins, debuts, axis=0)
+        maxs = np.fmax.reduceat(maxs, debuts, axis=0)
+        sommes = np.add.reduceat(sommes, debuts, axis=0)
+        comptes = np.add.reduceat(comptes, debuts, axis=0)
+        # Le dernier groupe devient le seau en cours, les autres sont terminés
+        self.seau, self.mins, self.maxs, self.sommes, self.comptes = seaux[-1], mins[-1], maxs[-1], sommes[-1], comptes[-1]
+        termines = debuts_seaux[:-1], mins[:-1], maxs[:-1], sommes[:-1], comptes[:-1]
+        if len(termines[0]):
+            with np.errstate(invalid="ignore", divide="ignore"):
+                moyennes = termines[3] / termines[4]
+            self.anneau.ajouter_bloc(termines[0], np.hstack((termines[1], termines[2], moyennes)).T)
+        return termines
+
+    def enveloppe(self, k, t0, t1):
+        """Retourne (temps, minimums, maximums) de la variable k entre t0 et t1, seau en cours compris."""
+        tranche = self.anneau.tranche()
+        temps = self.anneau.temps[tranche]
+        debut, fin = np.searchsorted(temps, [t0 - self.duree, t1 + 1])
+        temps = temps[debut:fin]
+        mins = self.anneau.colonnes[k, tranche][debut:fin]
+        maxs = self.anneau.colonnes[self.nb_variables + k, tranche][debut:fin]
+        if self.seau is not None and self.seau * self.duree <= t1:
+            temps = np.append(temps, self.seau * self.duree)
+            mins = np.append(mins, self.mins[k])
+            maxs = np.append(maxs, self.maxs[k])
+        return temps, mins, maxs
+
+    def vider(self):
+        """Oublie tous les agrégats."""
+        self.anneau.vider()
+        self.seau = None
+
+
+class PyramideResolutions:
+    def __init__(self, nb_variables, resolutions=RESOLUTIONS_AGREGATS):
+        """Crée un niveau d'agrégats par résolution, du plus fin au plus grossier."""
+        self.niveaux = [NiveauAgregats(duree, capacite, nb_variables) for duree, capacite in sorted(resolutions.items())]
+
+    def ajouter(self, temps, ligne):
+        """Met à jour les agrégats avec un échantillon : chaque seau terminé alimente le niveau suivant."""
+        valeurs = np.asarray(ligne, dtype=float)
+        valides = ~np.isnan(valeurs)
+        agregat = (temps, valeurs, valeurs, np.where(valides, valeurs, 0.0), valides.astype(float))
+        for niveau in self.niveaux:
+            agregat = niveau.ajouter(*agregat)
+            if agregat is None:
+                break
+
+    def ajouter_bloc(self, temps, valeurs):
+        """Met à jour les agrégats avec un bloc d'échantillons triés, en cascade comme pour un échantillon seul."""
+        valides = ~np.isnan(valeurs)
+        agregat = (temps, valeurs, valeurs, np.where(valides, valeurs, 0.0), valides.astype(float))
+        for niveau in self.niveaux:
+            agregat = niveau.ajouter_bloc(*agregat)
+            if len(agregat[0]) == 0:
+                break
+
+    def vider(self):
+        """Oublie tous les agrégats."""
+        for niveau in self.niveaux:
+            niveau.vider()
+
+
+class StockageAnneau:
+    def __init__(self, stations, capacite=CAPACITE_HISTORIQUE):
+        """Crée un bloc préalloué par station pour conserver l'historique des échantillons."""
+        self.stations = stations
+        self.capacite = capacite
+        self.index_variables = {station: {variable: k for k, variable in enumerate(variables)} for station, variables in stations.items()}
+        # Temps indiqués par les stations elles-mêmes (TEMPS_ABSENT si illisibles) dans self.appareils, à côté des temps
+        # alignés de self.anneaux
+        self.anneaux, self.appareils = {}, {}
+        for station, variables in stations.items():
+            self.anneaux[station], self.appareils[station] = self.creer_anneaux(station, len(variables))
+        self.pyramides = {station: PyramideResolutions(len(variables)) for station, variables in stations.items()}
+        # Dernière valeur reçue pour chaque variable (None tant que rien n'est arrivé)
+        self.dernieres = {station: [None] * len(variables) for station, variables in stations.items()}
+
+    def creer_anneaux(self, station, nb_variables):
+        """Anneaux des échantillons et des temps de l'appareil d'une station."""
+        return AnneauColonnes(self.capacite, nb_variables), AnneauColonnes(self.capacite, 0)
+
+    def ajouter(self, station, temps, valeurs, temps_appareil=TEMPS_ABSENT):
+        """Ajoute un échantillon d'une station et retourne la ligne rangée (valeurs manquantes ou non numériques : NaN)."""
+        dernieres = self.dernieres[station]
+        ligne = [np.nan] * len(dernieres)
+        for k, valeur in enumerate(valeurs[:len(ligne)]):
+            if isinstance(valeur, float):
+                ligne[k] = dernieres[k] = valeur
+        anneau = self.anneaux[station]
+        anneau.sequence += 1  # Impaire : écriture en cours
+        try:
+            anneau.ajouter(temps, ligne)
+            self.appareils[station].ajouter(temps_appareil, ())
+            self.pyramides[station].ajouter(temps, ligne)
+        finally:
+            anneau.sequence += 1
+        return ligne
+
+    def ajouter_bloc(self, station, temps, valeurs, temps_appareil=None):
+        """Ajoute d'un coup n échantillons d'une station (valeurs de forme (n, nb_variables))."""
+        if len(temps) == 0:
+            return
+        valeurs = np.asarray(valeurs)
+        colonnes = valeurs.T
+        if temps_appareil is None:
+            temps_appareil = np.full(len(temps), TEMPS_ABSENT, dtype=np.int64)
+        anneau = self.anneaux[station]
+        anneau.sequence += 1
+        try:
+            anneau.ajouter_bloc(temps, colonnes)
+            self.appareils[station].ajouter_bloc(temps_appareil, np.empty((0, len(temps))))
+            self.pyramides[station].ajouter_bloc(np.asarray(temps), valeurs)
+        finally:
+            anneau.sequence += 1
+        dernieres = self.dernieres[station]
+        for k, colonne in enumerate(colonnes):
+            valides = np.flatnonzero(~np.isnan(colonne))
+            if len(valides):
+                dernieres[k] = float(colonne[valides[-1]])
+
+    def lire_coherent(self, station, lecture):
+        """Retourne lecture() une fois qu'aucune écriture dans les anneaux de la station ne l'a traversée.
+
+        Le thread de réception écrit pendant que l'interface lit : la lecture est recommencée si la séquence de
+        l'anneau était impaire ou a changé entre-temps. lecture() doit rendre des copies, pas des vues.
+        """
+        anneau = self.anneaux[station]
+        while True:
+            sequence = anneau.sequence
+            if sequence % 2:  # Écriture en cours
+                sleep(0)
+                continue
+            resultat = lecture()
+            if anneau.sequence == sequence:
+                return resultat
+
+    def temps(self, station, n=None):
+        """Vue (sans copie) sur les temps en ns des n derniers échantillons d'une station (thread qui écrit)."""
+        anneau = self.anneaux[station]
+        return anneau.temps[anneau.tranche(n)]
+
+    def temps_appareil(self, station, n=None):
+        """Vue (sans copie) sur les temps indiqués par la station pour ses n derniers échantillons."""
+        anneau = self.appareils[station]
+        return anneau.temps[anneau.tranche(n)]
+
+    def valeurs(self, station, variable, n=None):
+        """Vue (sans copie) sur les n dernières valeurs d'une variable (thread qui écrit)."""
+        anneau = self.anneaux[station]
+        return anneau.colonnes[self.index_variables[station][variable], anneau.tranche(n)]
+
+    def serie(self, station, variable, t0, t1, largeur):
+        """Retourne (temps, valeurs) d'une variable entre t0 et t1 avec au plus ~largeur points.
+
+        Les échantillons bruts sont utilisés s'ils tiennent dans la largeur, sinon le niveau d'agrégats
+        le plus fin qui y tient, tracé en enveloppe (minimum puis maximum de chaque seau). Lecture cohérente,
+        possible pendant que la réception écrit ; les tableaux rendus sont des copies.
+        """
+        return self.lire_coherent(station, lambda: self.lire_serie(station, variable, t0, t1, largeur))
+
+    def lire_serie(self, station, variable, t0, t1, largeur):
+        """Corps de serie, sans protection contre une écriture concurrente."""
+        temps = self.temps(station)
+        debut, fin = np.searchsorted(temps, [t0, t1 + 1])
+        couvre = self.taille(station) < self.capacite or (len(temps) and temps[0] <= t0)
+        if fin - debut <= largeur and couvre:
+            return temps[debut:fin].copy(), self.valeurs(station, variable)[debut:fin].copy()
+        niveaux = self.pyramides[station].niveaux
+        niveau = next((n for n in niveaux if (t1 - t0) / n.duree <= largeur / 2), niveaux[-1])
+        seaux, mins, maxs = niveau.enveloppe(self.index_variables[station][variable], t0, t1)
+        return np.repeat(seaux + niveau.duree // 2, 2), np.column_stack((mins, maxs)).ravel()
+
+    def dernier_temps(self, station):
+        """Temps (ns) du dernier échantillon d'une station, ou None."""
+        anneau = self.anneaux[station]
+        return self.lire_coherent(station, lambda: int(anneau.temps[anneau.tranche(1)][0]) if anneau.taille else None)
+
+    def premier_temps(self, station):
+        """Temps (ns) du plus ancien échantillon conservé d'une station, ou None."""
+        anneau = self.anneaux[station]
+        return self.lire_coherent(station, lambda: int(anneau.temps[anneau.tranche()][0]) if anneau.taille else None)
+
+    def derniere_valeur(self, station, variable):
+        """Retourne la dernière valeur reçue pour une variable, ou None."""
+        return self.dernieres[station][self.index_variables[station][variable]]
+
+    def taille(self, station):
+        """Nombre d'échantillons conservés pour une station."""
+        return self.anneaux[station].taille
+
+    def compteur(self, station):
+        """Nombre total d'échantillons écrits pour une station (change à chaque ajout)."""
+        return self.anneaux[station].compteur
+
+    def vider(self):
+        """Oublie tout l'historique."""
+        for anneau in self.anneaux.values():
+            anneau.sequence += 1
+        for anneau in list(self.anneaux.values()) + list(self.appareils.values()):
+            anneau.vider()
+        for pyramide in self.pyramides.values():
+            pyramide.vider()
+        for dernieres in self.dernieres.values():
+            dernieres[:] = [None] * len(dernieres)
+        for anneau in self.anneaux.values():
+            anneau.sequence += 1
+
+
+# Statistiques glissantes : les échantillons sont regroupés par seconde ; chaque seconde terminée entre
+# dans les fenêtres (fusion de Welford) puis en ressort quand elle devient trop ancienne (fusion inverse)
+def resumer_secondes(valeurs, debuts):
+    """Compte, moyenne, M2 (somme des carrés des écarts), minimum et maximum de chaque groupe de lignes, NaN ignorés."""
+    valides = ~np.isnan(valeurs)
+    comptes = np.add.reduceat(valides.astype(float), debuts, axis=0)
+    sommes = np.add.reduceat(np.where(valides, valeurs, 0.0), debuts, axis=0)
+    moyennes = np.divide(sommes, comptes, out=np.zeros_like(sommes), where=comptes > 0)
+    longueurs = np.diff(np.r_[debuts, len(valeurs)])
+    ecarts = np.where(valides, valeurs - np.repeat(moyennes, longueurs, axis=0), 0.0)
+    m2 = np.add.reduceat(ecarts * ecarts, debuts, axis=0)
+    return comptes, moyennes, m2, np.fmin.reduceat(valeurs, debuts, axis=0), np.fmax.reduceat(valeurs, debuts, axis=0)
+
+
+def fusionner(na, ma, m2a, nb, mb, m2b):
+    """Combine deux agrégats (compte, moyenne, M2) variable par variable (formule de Chan)."""
+    n = na + nb
+    part = np.divide(nb, n, out=np.zeros_like(n), where=n > 0)
+    delta = mb - ma
+    return n, ma + delta * part, m2a + m2b + delta * delta * na * part
+
+
+def retrancher(n, m, m2, nb, mb, m2b):
+    """Retire d'un agrégat (compte, moyenne, M2) un agrégat qu'il contient : inverse de fusionner."""
+    na = n - nb
+    ma = np.divide(n * m - nb * mb, na, out=np.zeros_like(m), where=na > 0)
+    delta = mb - ma
+    m2a = m2 - m2b - delta * delta * na * np.divide(nb, n, out=np.zeros_like(n), where=n > 0)
+    return na, ma, np.where(na > 0, np.maximum(m2a, 0.0), 0.0)
+
+
+class StatistiquesStation:
+    def __init__(self, nb_variables, durees):
+        """Statistiques glissantes d'une station sur plusieurs durées (s), en O(1) amorti par échantillon.
+
+        Les agrégats (compte, moyenne, M2) des fenêtres forment des tableaux (fenêtre, variable), mis à jour
+        ensemble ; minimum et maximum viennent de files monotones de numéros de secondes terminées.
+        """
+        self.durees = list(durees)
+        self.capacite = max(self.durees) + 1  # Secondes terminées conservées : de quoi couvrir la plus longue fenêtre
+        self.secondes = np.zeros(self.capacite, dtype=np.int64)
+        self.comptes = np.zeros((self.capacite, nb_variables))
+        self.moyennes = np.zeros((self.capacite, nb_variables))
+        self.m2 = np.zeros((self.capacite, nb_variables))
+        self.mins = [None] * self.capacite  # Listes Python : comparées une à une par les files monotones
+        self.maxs = [None] * self.capacite
+        self.nb_secondes = 0  # Secondes terminées depuis le début, soit le numéro de la prochaine
+        # Agrégat de chaque fenêtre et numéro de sa plus ancienne seconde terminée
+        self.agregat = tuple(np.zeros((len(self.durees), nb_variables)) for _ in range(3))
+        self.debuts = [0] * len(self.durees)
+        self.fusions = [0] * len(self.durees)  # Secondes fusionnées depuis le dernier recalcul exact
+        # Candidates au minimum (maximum) par fenêtre et variable : valeurs croissantes (décroissantes) du début à la fin
+        self.files_min = [[deque() for _ in range(nb_variables)] for _ in self.durees]
+        self.files_max = [[deque() for _ in range(nb_variables)] for _ in self.durees]
+        self.seconde = None  # Seconde en cours de remplissage
+        self.lignes = []  # Échantillons de la seconde en cours (lignes ou blocs de lignes)
+
+    def ajouter(self, temps, ligne):
+        """Intègre un échantillon (une valeur par variable, NaN si absente)."""
+        seconde = temps // 10**9
+        if self.seconde is None or seconde > self.seconde:  # Un échantillon en retard rejoint la seconde en cours
+            if self.lignes:
+                self.terminer()
+            self.seconde = seconde
+            self.expirer(seconde)
+        self.lignes.append(ligne)
+
+    def ajouter_bloc(self, temps, valeurs):
+        """Intègre d'un coup n échantillons triés par temps (valeurs de forme (n, nb_variables))."""
+        if len(temps) == 0:
+            return
+        secondes = np.asarray(temps) // 10**9
+        if self.lignes:  # La seconde en cours est reprise en tête du bloc
+            valeurs = np.vstack(self.lignes + [valeurs])
+            secondes = np.r_[np.full(len(valeurs) - len(secondes), self.seconde), secondes]
+        secondes = np.maximum.accumulate(secondes)
+        debuts = np.flatnonzero(np.r_[True, secondes[1:] != secondes[:-1]])
+        derniere = secondes[-1]
+        # Seules les secondes terminées encore couvertes par la plus longue fenêtre sont rangées
+        premier = np.searchsorted(secondes[debuts[:-1]], derniere - self.capacite + 1, side="right")
+        termines = debuts[premier:]
+        if len(termines) > 1:
+            resumes = resumer_secondes(valeurs[termines[0]:termines[-1]], termines[:-1] - termines[0])
+        if len(termines) > SECONDES_RANGEES_EN_BLOC:
+            self.ranger_bloc(secondes[termines[:-1]], *resumes)
+        elif len(termines) > 1:
+            for g, debut in enumerate(termines[:-1]):
+                self.ranger(secondes[debut], *(resume[g] for resume in resumes))
+        self.seconde = derniere
+        self.lignes = [valeurs[debuts[-1]:].copy()]  # Le bloc peut être une zone partagée recyclée ou le journal projeté
+        self.expirer(derniere)
+
+    def resumer_courante(self):
+        """Compte, moyenne, M2, minimum et maximum de la seconde en cours."""
+        if len(self.lignes) == 1 and isinstance(self.lignes[0], list):  # Cas courant : un seul échantillon
+            valeurs = np.array(self.lignes[0])
+            valides = ~np.isnan(valeurs)
+            return valides.astype(float), np.where(valides, valeurs, 0.0), np.zeros(len(valeurs)), valeurs, valeurs
+        valeurs = np.vstack(self.lignes) if isinstance(self.lignes[0], np.ndarray) else np.array(self.lignes)
+        return tuple(resume[0] for resume in resumer_secondes(valeurs, [0]))
+
+    def terminer(self):
+        """Range la seconde en cours dans l'anneau des secondes terminées et dans chaque fenêtre."""
+        self.ranger(self.seconde, *self.resumer_courante())
+        self.lignes = []
+
+    def ranger(self, seconde, comptes, moyennes, m2, mins, maxs):
+        """Ajoute une seconde terminée ; les files ne gardent que les candidates au minimum (maximum)."""
+        self.expirer(seconde)
+        numero, i = self.nb_secondes, self.nb_secondes % self.capacite
+        self.secondes[i] = seconde
+        self.comptes[i], self.moyennes[i], self.m2[i] = comptes, moyennes, m2
+        mins, maxs = mins.tolist(), maxs.tolist()
+        self.mins[i], self.maxs[i] = mins, maxs
+        self.nb_secondes += 1
+        self.agregat = fusionner(*self.agregat, comptes, moyennes, m2)
+        presentes = np.flatnonzero(comptes).tolist()
+        anneau_mins, anneau_maxs, capacite = self.mins, self.maxs, self.capacite
+        for f, duree in enumerate(self.durees):
+            files_min, files_max = self.files_min[f], self.files_max[f]
+            for k in presentes:
+                file, valeur = files_min[k], mins[k]
+                while file and anneau_mins[file[-1] % capacite][k] >= valeur:
+                    file.pop()
+                file.append(numero)
+                file, valeur = files_max[k], maxs[k]
+                while file and anneau_maxs[file[-1] % capacite][k] <= valeur:
+                    file.pop()
+                file.append(numero)
+            self.fusions[f] += 1
+            if self.fusions[f] >= duree:  # Recalcul exact, amorti sur la durée : efface la dérive des fusions inverses
+                self.recalculer(f)
+
+    def ranger_bloc(self, secondes, comptes, moyennes, m2, mins, maxs):
+        """Ajoute d'un coup des secondes terminées, croissantes, au plus `capacite` (tableaux de forme (seconde, variable)).
+
+        Même état qu'après autant d'appels à ranger : l'anneau est rempli en une fois, puis chaque fenêtre est
+        recalculée exactement et ses files rebâties à partir de l'anneau.
+        """
+        numeros = np.arange(self.nb_secondes, self.nb_secondes + len(secondes))
+        indices = numeros % self.capacite
+        self.secondes[indices] = secondes
+        self.comptes[indices], self.moyennes[indices], self.m2[indices] = comptes, moyennes, m2
+        for i, mins_seconde, maxs_seconde in zip(indices.tolist(), mins.tolist(), maxs.tolist()):
+            self.mins[i], self.maxs[i] = mins_seconde, maxs_seconde
+        self.nb_secondes += len(secondes)
+        # Secondes encore dans l'anneau, de la plus ancienne à la dernière rangée
+        numeros = np.arange(max(0, self.nb_secondes - self.capacite), self.nb_secondes)
+        indices = numeros % self.capacite
+        for f, duree in enumerate(self.durees):
+            debut = numeros[0] + np.searchsorted(self.secondes[indices], secondes[-1] - duree, side="right")
+            self.debuts[f] = max(self.debuts[f], int(debut))
+            self.recalculer(f)
+        # Candidates d'une file : secondes où la variable est présente et strictement plus basse (haute) que dans
+        # toutes les suivantes de la fenêtre
+        depart = min(self.debuts) - numeros[0]
+        numeros, indices = numeros[depart:], indices[depart:]
+        presentes = self.comptes[indices] > 0
+        anneau_mins = np.where(presentes, np.array([self.mins[i] for i in indices.tolist()], dtype=float), np.inf)
+        anneau_maxs = np.where(presentes, np.array([self.maxs[i] for i in indices.tolist()], dtype=float), -np.inf)
+        for f, debut in enumerate(self.debuts):
+            fenetre = slice(debut - numeros[0], None)
+            for anneau, files, extremum, meilleure, neutre in ((anneau_mins, self.files_min[f], np.minimum, np.less, np.inf),
+                                                              (anneau_maxs, self.files_max[f], np.maximum, np.greater, -np.inf)):
+                valeurs = anneau[fenetre]
+                suivantes = np.full_like(valeurs, neutre)  # Extremum des secondes suivantes de la fenêtre
+                suivantes[:-1] = extremum.accumulate(valeurs[:0:-1], axis=0)[::-1]
+                candidates = presentes[fenetre] & meilleure(valeurs, suivantes)
+                for k, file in enumerate(files):
+                    file.clear()
+                    file.extend(numeros[fenetre][candidates[:, k]].tolist())
+
+    def expirer(self, seconde):
+        """Retire de chaque fenêtre les secondes terminées plus anciennes que sa durée, comptée jusqu'à `seconde`."""
+        if not self.nb_secondes:
+            return
+        derniere = self.secondes[(self.nb_secondes - 1) % self.capacite]
+        deplacees = False
+        while True:
+            # Une seconde retirée par tour à chaque fenêtre concernée, toutes fenêtres ensemble
+            sortantes = [f for f, duree in enumerate(self.durees)
+                         if self.debuts[f] < self.nb_secondes and self.secondes[self.debuts[f] % self.capacite] <= seconde - duree]
+            if not sortantes:
+                break
+            deplacees = True
+            for f in sortantes:
+                if derniere <= seconde - self.durees[f]:  # Toute la fenêtre est sortie : agrégat remis à zéro
+                    self.debuts[f] = self.nb_secondes
+                    for tableau in self.agregat:
+                        tableau[f] = 0.0
+            sortantes = [f for f in sortantes if self.debuts[f] < self.nb_secondes]
+            if not sortantes:
+                continue
+            indices = [self.debuts[f] % self.capacite for f in sortantes]
+            comptes, moyennes, m2 = retrancher(*(tableau[sortantes] for tableau in self.agregat),
+                                               self.comptes[indices], self.moyennes[indices], self.m2[indices])
+            self.agregat[0][sortantes], self.agregat[1][sortantes], self.agregat[2][sortantes] = comptes, moyennes, m2
+            for f in sortantes:
+                self.debuts[f] += 1
+        if deplacees:
+            for f, debut in enumerate(self.debuts):
+                for file in self.files_min[f] + self.files_max[f]:
+                    while file and file[0] < debut:
+                        file.popleft()
+
+    def recalculer(self, f):
+        """Recalcule exactement l'agrégat d'une fenêtre à partir de ses secondes terminées."""
+        indices = np.arange(self.debuts[f], self.nb_secondes) % self.capacite
+        comptes, moyennes = self.comptes[indices], self.moyennes[indices]
+        total = comptes.sum(axis=0)
+        moyenne = np.divide((comptes * moyennes).sum(axis=0), total, out=np.zeros_like(total), where=total > 0)
+        ecarts = moyennes - moyenne
+        self.agregat[0][f], self.agregat[1][f] = total, moyenne
+        self.agregat[2][f] = self.m2[indices].sum(axis=0) + (comptes * ecarts * ecarts).sum(axis=0)
+        self.fusions[f] = 0
+
+    def resume(self):
+        """Comptes, moyennes, écarts types, minimums et maximums, de forme (fenêtre, variable), seconde en cours comprise."""
+        comptes, moyennes, m2 = self.agregat
+        mins = np.array([[self.mins[file[0] % self.capacite][k] if file else np.nan for k, file in enumerate(files)]
+                         for files in self.files_min])
+        maxs = np.array([[self.maxs[file[0] % self.capacite][k] if file else np.nan for k, file in enumerate(files)]
+                         for files in self.files_max])
+        if self.lignes:
+            courante = self.resumer_courante()
+            comptes, moyennes, m2 = fusionner(comptes, moyennes, m2, *courante[:3])
+            mins, maxs = np.fmin(mins, courante[3]), np.fmax(maxs, courante[4])
+        ecarts_types = np.sqrt(np.divide(m2, comptes - 1, out=np.zeros_like(m2), where=comptes > 1))
+        return comptes, moyennes, ecarts_types, mins, maxs
+
+
+def ns_vers_heure(temps):
+    """Heure locale "JJ/MM HH:MM:SS" d'un temps en ns."""
+    return (EPOQUE + timedelta(microseconds=temps // 1000)).strftime("%d/%m %H:%M:%S")
+
+
+def decrire_seuil(bas, haut):
+    """Texte d'un seuil d'alerte, par exemple "> 1000"."""
+    return " et ".join(texte for texte in (bas is not None and f"< {bas:g}", haut is not None and f"> {haut:g}") if texte)
+
+
+class StatistiquesGlissantes:
+    def __init__(self, stations, fenetres=FENETRES_STATISTIQUES, seuils=SEUILS_ALERTE):
+        """Statistiques glissantes et alertes de seuil de toutes les stations, alimentées par la réception."""
+        self.libelles = list(fenetres)
+        self.index_variables = {station: {variable: k for k, variable in enumerate(variables)} for station, variables in stations.items()}
+        self.stations = {station: StatistiquesStation(len(variables), list(fenetres.values())) for station, variables in stations.items()}
+        # Seuils par station (indice, variable, bas, haut), limités aux variables existantes
+        self.seuils = {cle: seuil for cle, seuil in seuils.items() if cle[1] in self.index_variables.get(cle[0], {})}
+        self.seuils_station = {}
+        for (station, variable), (bas, haut) in self.seuils.items():
+            self.seuils_station.setdefault(station, []).append((self.index_variables[station][variable], variable, bas, haut))
+        self.alertes = {}  # (station, variable) -> (temps, valeur) du début de chaque alerte en cours
+        self.evenements = deque(maxlen=ALERTES_CONSERVEES)  # (temps, station, variable, valeur, en alerte)
+        self.verrou = Lock()  # Écritures par le thread de réception, lectures par l'interface
+
+    def ajouter(self, station, temps, ligne):
+        """Intègre un échantillon (une valeur par variable, NaN si absente) et vérifie les seuils de la station."""
+        with self.verrou:
+            self.stations[station].ajouter(temps, ligne)
+            for k, variable, bas, haut in self.seuils_station.get(station, ()):
+                self.verifier(station, variable, bas, haut, temps, ligne[k])
+
+    def ajouter_bloc(self, station, temps, valeurs):
+        """Intègre d'un coup n échantillons triés ; seuls les franchissements de seuil sont examinés un par un."""
+        if len(temps) == 0:
+            return
+        valeurs = np.asarray(valeurs)
+        with self.verrou:
+            self.stations[station].ajouter_bloc(temps, valeurs)
+            for k, variable, bas, haut in self.seuils_station.get(station, ()):
+                colonne = valeurs[:, k]
+                valides = np.flatnonzero(~np.isnan(colonne))
+                hors = np.zeros(len(valides), dtype=bool)
+                if bas is not None:
+                    hors |= colonne[valides] < bas
+                if haut is not None:
+                    hors |= colonne[valides] > haut
+                changements = np.flatnonzero(hors != np.r_[(station, variable) in self.alertes, hors[:-1]])
+                for i in changements[-ALERTES_CONSERVEES:]:
+                    self.verifier(station, variable, bas, haut, int(temps[valides[i]]), float(colonne[valides[i]]))
+
+    def verifier(self, station, variable, bas, haut, temps, valeur):
+        """Déclenche ou lève l'alerte d'une variable selon sa nouvelle valeur."""
+        if valeur != valeur:  # NaN : valeur absente, l'état ne change pas
+            return
+        hors = (bas is not None and valeur < bas) or (haut is not None and valeur > haut)
+        cle = (station, variable)
+        if hors != (cle in self.alertes):
+            if hors:
+                self.alertes[cle] = (temps, valeur)
+            else:
+                del self.alertes[cle]
+            self.evenements.append((temps, station, variable, valeur, hors))
+
+    def resume(self, station):
+        """Statistiques de chaque fenêtre pour une station (voir StatistiquesStation.resume)."""
+        with self.verrou:
+            return self.stations[station].resume()
+
+    def alerte(self, station, variable):
+        """(temps, valeur) du début de l'alerte en cours sur une variable, ou None."""
+        return self.alertes.get((station, variable))
+
+    def texte(self):
+        """Alertes en cours et derniers évènements, mis en forme pour la page de diagnostic."""
+        with self.verrou:
+            alertes, evenements = dict(self.alertes), list(self.evenements)
+        lignes = [f"Alertes en cours : {len(alertes)}"]
+        for (station, variable), (temps, valeur) in alertes.items():
+            lignes.append(f"  {station:<12}{variable:<24}{valeur:>10g}  depuis {ns_vers_heure(temps)}"
+                          f"  (seuil {decrire_seuil(*self.seuils[station, variable])})")
+        if evenements:
+            lignes += ["", "Derniers évènements :"]
+            for temps, station, variable, valeur, hors in reversed(evenements[-20:]):
+                lignes.append(f"  {ns_vers_heure(temps)}  {station:<12}{variable:<24}{valeur:>10g}  {'alerte' if hors else 'fin'}")
+        return "\n".join(lignes)
+
+
+# Journal binaire : enregistrements de taille fixe (temps aligné int64, temps de l'appareil int64, une valeur float64 par variable)
+ENTETE_JOURNAL = b"METEOLG2"  # Suivi du nombre de variables (int64) : 16 octets d'en-tête
+ENTETE_JOURNAL_V1 = b"METEOLOG"  # Version précédente, sans temps de l'appareil : lue telle quelle, convertie avant tout ajout
+VERSIONS_JOURNAL = {ENTETE_JOURNAL: 2, ENTETE_JOURNAL_V1: 1}
+
+
+def type_enregistrement(nb_variables, version=2):
+    """Type numpy d'un enregistrement du journal pour une station à nb_variables variables."""
+    if version == 1:
+        return np.dtype([("temps", "<i8"), ("valeurs", "<f8", (nb_variables,))])
+    return np.dtype([("temps", "<i8"), ("appareil", "<i8"), ("valeurs", "<f8", (nb_variables,))])
+
+
+def chemin_journal(dossier, jour, station):
+    """Chemin du fichier d'une station pour un jour (nombre de jours depuis EPOQUE)."""
+    return os.path.join(dossier, (EPOQUE + timedelta(days=int(jour))).strftime("%Y-%m-%d"), f"{station}.bin")
+
+
+class JournalBinaire:
+    def __init__(self, stations, dossier=DOSSIER_HISTORIQUE, periode=PERIODE_ECRITURE_JOURNAL,
+                 capacite=CAPACITE_FILE_JOURNAL, politique=POLITIQUE_FILE_JOURNAL):
+        """Démarre le thread d'écriture du journal ; les ajouts ne font que déposer dans une file bornée."""
+        self.stations = stations
+        self.dossier = dossier
+        self.periode = periode
+        self.types = {station: type_enregistrement(len(variables)) for station, variables in stations.items()}
+        self.file = FileBornee(capacite, politique)
+        self.arret = Event()
+        self.ecrits = 0  # Nombre d'enregistrements écrits sur le disque
+        self.verifies = set()  # Fichiers dont le format a été vérifié depuis le démarrage
+        self.thread = Thread(target=self.ecriture, daemon=True)
+        self.thread.start()
+
+    def ajouter(self, station, temps, valeurs, temps_appareil=TEMPS_ABSENT):
+        """Dépose un échantillon décodé ; ne bloque pas le thread de réception (sauf politique BLOCAGE choisie)."""
+        self.file.deposer((station, temps, valeurs, temps_appareil))
+
+    def ajouter_bloc(self, station, temps, valeurs, temps_appareil=None):
+        """Dépose n échantillons en colonnes (temps (n,), valeurs (n, nb_variables), temps de l'appareil (n,)), copiés."""
+        if len(temps):
+            appareil = np.full(len(temps), TEMPS_ABSENT, dtype=np.int64) if temps_appareil is None else np.array(temps_appareil, dtype=np.int64)
+            self.file.deposer((station, np.array(temps, dtype=np.int64), np.array(valeurs, dtype=np.float64), appareil), len(temps))
+
+    def ecriture(self):
+        """Écrit périodiquement (plus tôt si la file est pleine), par lots groupés par jour et par station, les
+        échantillons en attente."""
+        while not self.arret.is_set():
+            self.file.attendre(self.periode)
+            self.vider_file()
+        self.vider_file()
+
+    def vider_file(self):
+        """Écrit tous les échantillons en attente."""
+        lots = {}
+        elements, _ = self.file.retirer_lot()
+        for station, temps, valeurs, appareil in elements:
+            if isinstance(temps, np.ndarray):  # Bloc en colonnes, découpé par jour
+                jours = temps // NS_PAR_JOUR
+                for jour in np.unique(jours):
+                    garder = jours == jour
+                    lots.setdefault((int(jour), station), []).append((temps[garder], valeurs[garder], appareil[garder]))
+            else:
+                lots.setdefault((temps // NS_PAR_JOUR, station), []).append((temps, valeurs, appareil))
+        for (jour, station), elements in lots.items():
+            type_enr = self.types[station]
+            nb_variables = type_enr["valeurs"].shape[0]
+            # Les échantillons isolés consécutifs sont mis en colonnes ensemble ; l'ordre d'arrivée est conservé
+            morceaux, serie = [], []
+            for element in elements + [None]:
+                if element is not None and not isinstance(element[0], np.ndarray):
+                    serie.append(element)
+                    continue
+                if serie:
+                    lignes = np.full((len(serie), nb_variables), np.nan)
+                    for i, (_, valeurs, _) in enumerate(serie):
+                        for k, valeur in enumerate(valeurs[:nb_variables]):
+                            if isinstance(valeur, float):
+                                lignes[i, k] = valeur
+                    morceaux.append((np.array([temps for temps, _, _ in serie], dtype=np.int64), lignes,
+                                     np.array([appareil for _, _, appareil in serie], dtype=np.int64)))
+                    serie = []
+                if element is not None:
+                    morceaux.append(element)
+            enregistrements = np.empty(sum(len(temps) for temps, _, _ in morceaux), dtype=type_enr)
+            enregistrements["temps"] = np.concatenate([temps for temps, _, _ in morceaux])
+            enregistrements["appareil"] = np.concatenate([appareil for _, _, appareil in morceaux])
+            enregistrements["valeurs"] = np.concatenate([lignes for _, lignes, _ in morceaux])
+            chemin = chemin_journal(self.dossier, jour, station)
+            try:
+                os.makedirs(os.path.dirname(chemin), exist_ok=True)
+                self.convertir_ancien(chemin, nb_variables)
+                with open(chemin, "ab") as fichier:
+                    if fichier.tell() == 0:
+                        fichier.write(ENTETE_JOURNAL + np.int64(nb_variables).tobytes())
+                    fichier.write(enregistrements.tobytes())
+                self.ecrits += len(enregistrements)
+            except OSError as e:
+                print(f"Erreur d'écriture du journal : {e}")
+
+    def convertir_ancien(self, chemin, nb_variables):
+        """Réécrit au format actuel un fichier écrit par la version précédente, avant d'y ajouter des enregistrements."""
+        if chemin in self.verifies:
+            return
+        self.verifies.add(chemin)
+        try:
+            with open(chemin, "rb") as fichier:
+                entete, contenu = fichier.read(16), fichier.read()
+        except FileNotFoundError:
+            return
+        if entete[:8] != ENTETE_JOURNAL_V1 or int(np.frombuffer(entete[8:], "<i8")[0]) != nb_variables:
+            return
+        type_ancien = type_enregistrement(nb_variables, 1)
+        anciens = np.frombuffer(contenu, dtype=type_ancien, count=len(contenu) // type_ancien.itemsize)
+        nouveaux = np.empty(len(anciens), dtype=type_enregistrement(nb_variables))
+        nouveaux["temps"], nouveaux["appareil"], nouveaux["valeurs"] = anciens["temps"], TEMPS_ABSENT, anciens["valeurs"]
+        with open(chemin + ".tmp", "wb") as fichier:
+            fichier.write(ENTETE_JOURNAL + np.int64(nb_variables).tobytes())
+            fichier.write(nouveaux.tobytes())
+        os.replace(chemin + ".tmp", chemin)
+
+    def fermer(self):
+        """Écrit les derniers échantillons et arrête le thread d'écriture ; les dépôts suivants sont refusés."""
+        self.arret.set()
+        self.file.fermer()
+        if self.thread.is_alive():
+            self.thread.join()
+
+
+class LecteurJournal:
+    def __init__(self, stations, dossier=DOSSIER_HISTORIQUE):
+        """Lit le journal binaire par projection en mémoire, sans analyse de texte."""
+        self.stations = stations
+        self.dossier = dossier
+
+    def jours(self):
+        """Liste triée des jours présents dans le journal (nombre de jours depuis EPOQUE)."""
+        if not os.path.isdir(self.dossier):
+            return []
+        jours = []
+        for nom in os.listdir(self.dossier):
+            try:
+                jours.append((datetime.strptime(nom, "%Y-%m-%d") - EPOQUE).days)
+            except ValueError:
+                continue
+        return sorted(jours)
+
+    def projeter(self, station, jour):
+        """Projette en mémoire le fichier d'une station pour un jour ; None s'il est absent ou invalide."""
+        chemin = chemin_journal(self.dossier, jour, station)
+        try:
+            with open(chemin, "rb") as fichier:
+                entete = fichier.read(16)
+            taille = os.path.getsize(chemin) - 16
+        except OSError:
+            return None
+        version = VERSIONS_JOURNAL.get(entete[:8])
+        if version is None or int(np.frombuffer(entete[8:], "<i8")[0]) != len(self.stations[station]):
+            print(f"Journal ignoré (en-tête invalide) : {chemin}")
+            return None
+        type_enr = type_enregistrement(len(self.stations[station]), version)
+        nombre = taille // type_enr.itemsize  # Un dernier enregistrement incomplet est ignoré
+        if nombre <= 0:
+            return None
+        return np.memmap(chemin, dtype=type_enr, mode="r", offset=16, shape=(nombre,))
+
+    def charger(self, station, nb_jours=JOURS_RECHARGES):
+        """Retourne (temps, valeurs, temps de l'appareil) des nb_jours derniers jours d'une station."""
+        blocs = [bloc for bloc in (self.projeter(station, jour) for jour in self.jours()[-nb_jours:]) if bloc is not None]
+        if not blocs:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(self.stations[station]))), np.empty(0, dtype=np.int64)
+        appareils = [b["appareil"] if "appareil" in b.dtype.names else np.full(len(b), TEMPS_ABSENT, dtype=np.int64) for b in blocs]
+        if len(blocs) == 1:
+            temps, valeurs, appareil = blocs[0]["temps"], blocs[0]["valeurs"], appareils[0]  # Vues directes sur la projection
+        else:
+            temps, valeurs = np.concatenate([b["temps"] for b in blocs]), np.concatenate([b["valeurs"] for b in blocs])
+            appareil = np.concatenate(appareils)
+        if len(temps) > 1 and (np.diff(temps) < 0).any():  # Capture importée après coup : remise dans l'ordre
+            ordre = np.argsort(temps, kind="stable")
+            temps, valeurs, appareil = temps[ordre], valeurs[ordre], appareil[ordre]
+        return temps, valeurs, appareil
+
+
+class RechargementHistorique:
+    def __init__(self, stations, donnees, statistiques=None, dossier=DOSSIER_HISTORIQUE, notificateur=None,
+                 instrumentation=None):
+        """Recharge les derniers jours du journal dans le stockage et les statistiques, dans son propre thread.
+
+        La réception démarre sans attendre : ses traitements passent par ranger(), qui les garde pendant le
+        rechargement puis les fait dans ce thread, dans leur ordre d'arrivée, à la suite de l'historique.
+        """
+        self.stations = stations
+        self.donnees = donnees
+        self.statistiques = statistiques
+        self.lecteur = LecteurJournal(stations, dossier)
+        self.notificateur = notificateur
+        self.instrumentation = instrumentation
+        self.verrou = Lock()
+        self.differes = []  # (traitement, arguments) arrivés pendant le rechargement ; None une fois terminé
+        self.termine = Event()
+        self.thread = Thread(target=self.recharger, daemon=True)
+        self.thread.start()
+
+    def ranger(self, traitement, *arguments):
+        """Fait un traitement qui range des échantillons, ou le garde pour la fin du rechargement."""
+        if self.differes is not None:
+            with self.verrou:
+                if self.differes is not None:
+                    self.differes.append((traitement, arguments))
+                    return
+        traitement(*arguments)
+
+    def recharger(self):
+        """Corps du thread : historique de chaque station, puis traitements gardés entre-temps."""
+        debut = perf_counter()
+        modifiees = []
+        try:
+            for station in self.stations:
+                temps, valeurs, appareil = self.lecteur.charger(station)
+                if len(temps) == 0:
+                    continue
+                self.donnees.ajouter_bloc(station, temps, valeurs, appareil)
+                if self.statistiques is not None:
+                    self.statistiques.ajouter_bloc(station, temps, valeurs)
+                modifiees.extend((station, variable) for variable in self.stations[station])
+        finally:
+            if self.instrumentation is not None:
+                self.instrumentation.demarrage["historique"] = (perf_counter() - debut) * 1000
+            if modifiees and self.notificateur is not None:
+                self.notificateur.signaler(modifiees)
+            while True:  # Les traitements arrivés pendant qu'on vide la liste passent au tour suivant
+                with self.verrou:
+                    differes = self.differes
+                    self.differes = [] if differes else None
+                if not differes:
+                    break
+                for traitement, arguments in differes:
+                    traitement(*arguments)
+            self.termine.set()
+
+    def attendre(self, delai=None):
+        """Attend la fin du rechargement et des traitements gardés ; retourne True s'ils sont finis."""
+        return self.termine.wait(delai)
+
+
+class IndexJournal:
+    def __init__(self, bloc=BLOC_INDEX_JOURNAL, pas=PAS_AGREGATS_JOURNAL):
+        """Index d'un fichier du journal : temps extrêmes de chaque bloc d'enregistrements et agrégats min/max par pas."""
+        self.bloc = bloc
+        self.pas = pas * 10**9
+        self.enregistrements = None  # Projection du fichier
+        self.taille_fichier = -1  # Taille lors de la dernière indexation
+        self.nombre = 0  # Enregistrements déjà indexés
+        self.debuts_blocs = self.fins_blocs = np.empty(0, dtype=np.int64)
+        self.seaux = np.empty(0, dtype=np.int64)  # Début de chaque seau, croissant
+        self.mins = self.maxs = None
+
+    def actualiser(self, enregistrements, taille_fichier):
+        """Indexe les enregistrements ajoutés depuis la dernière fois (tous, si le fichier a été réécrit)."""
+        self.taille_fichier = taille_fichier
+        if enregistrements is None or len(enregistrements) < self.nombre:  # Fichier disparu ou réécrit
+            self.nombre = 0
+            self.debuts_blocs = self.fins_blocs = np.empty(0, dtype=np.int64)
+            self.seaux = np.empty(0, dtype=np.int64)
+            self.mins = self.maxs = None
+        self.enregistrements = enregistrements
+        if enregistrements is None:
+            return
+        temps = enregistrements["temps"]
+        if len(temps) == self.nombre:
+            return
+        # Blocs : le dernier, incomplet, est recalculé avec les nouveaux enregistrements
+        premier = self.nombre // self.bloc
+        nouveaux = temps[premier * self.bloc:]
+        debuts = np.arange(0, len(nouveaux), self.bloc)
+        self.debuts_blocs = np.concatenate((self.debuts_blocs[:premier], np.minimum.reduceat(nouveaux, debuts)))
+        self.fins_blocs = np.concatenate((self.fins_blocs[:premier], np.maximum.reduceat(nouveaux, debuts)))
+        # Agrégats : les seaux déjà calculés sont fusionnés avec les nouveaux enregistrements
+        seaux = temps[self.nombre:] // self.pas * self.pas
+        mins = maxs = enregistrements["valeurs"][self.nombre:]
+        if self.mins is not None:
+            seaux = np.concatenate((self.seaux, seaux))
+            mins, maxs = np.vstack((self.mins, mins)), np.vstack((self.maxs, maxs))
+        if (np.diff(seaux) < 0).any():  # Capture importée après coup
+            ordre = np.argsort(seaux, kind="stable")
+            seaux, mins, maxs = seaux[ordre], mins[ordre], maxs[ordre]
+        debuts = np.flatnonzero(np.r_[True, seaux[1:] != seaux[:-1]])
+        self.seaux = seaux[debuts]
+        self.mins = np.fmin.reduceat(mins, debuts, axis=0)
+        self.maxs = np.fmax.reduceat(maxs, debuts, axis=0)
+        self.nombre = len(temps)
+
+    def lire(self, t0, t1):
+        """Retourne (temps, valeurs) des enregistrements entre t0 et t1, triés ; seuls les blocs qui chevauchent sont lus."""
+        blocs = np.flatnonzero((self.fins_blocs >= t0) & (self.debuts_blocs <= t1))
+        if len(blocs) == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, self.enregistrements["valeurs"].shape[1]))
+        # Blocs candidats consécutifs lus d'un seul tenant
+        groupes = np.split(blocs, np.flatnonzero(np.diff(blocs) > 1) + 1)
+        morceaux = [self.enregistrements[groupe[0] * self.bloc:(groupe[-1] + 1) * self.bloc] for groupe in groupes]
+        enregistrements = morceaux[0] if len(morceaux) == 1 else np.concatenate(morceaux)
+        temps = enregistrements["temps"]
+        garder = (temps >= t0) & (temps <= t1)
+        temps, valeurs = temps[garder], enregistrements["valeurs"][garder]
+        if len(temps) > 1 and (np.diff(temps) < 0).any():
+            ordre = np.argsort(temps, kind="stable")
+            temps, valeurs = temps[ordre], valeurs[ordre]
+        return temps, valeurs
+
+    def agregats(self, t0, t1):
+        """Retourne (débuts des seaux, minimums, maximums) des seaux qui chevauchent [t0, t1]."""
+        debut, fin = np.searchsorted(self.seaux, [t0 - self.pas + 1, t1 + 1])
+        return self.seaux[debut:fin], self.mins[debut:fin], self.maxs[debut:fin]
+
+
+class RequeteHistorique:
+    def __init__(self, donnees, dossier=DOSSIER_HISTORIQUE, pas_agregats=PAS_AGREGATS_JOURNAL):
+        """Répond aux requêtes de l'affichage : anneaux en mémoire pour le récent, journal indexé pour le plus ancien."""
+        self.donnees = donnees
+        self.lecteur = LecteurJournal(donnees.stations, dossier)
+        self.pas_agregats = pas_agregats
+        self.index = {}  # (station, jour) -> IndexJournal des fichiers déjà consultés
+
+    def requete(self, cles, t0, t1, max_points):
+        """Retourne {(station, variable): (temps, valeurs)} entre t0 et t1 (ns), avec au plus ~max_points points par série.
+
+        La partie couverte par l'anneau d'une station vient de StockageAnneau.serie ; la partie plus ancienne est lue
+        dans le journal, par ses agrégats si la résolution demandée le permet, sinon par les seuls blocs qui
+        chevauchent la fenêtre. Au-delà de max_points, une série est tracée en enveloppe (minimum puis maximum).
+        """
+        variables_stations = {}
+        for station, variable in cles:
+            variables_stations.setdefault(station, []).append(variable)
+        duree = max(t1 - t0, 1)
+        resultat = {}
+        for station, variables in variables_stations.items():
+            # Avant le plus ancien échantillon en mémoire, seul le journal a les données
+            premier = self.donnees.premier_temps(station)
+            separation = premier if premier is not None else t1 + 1
+            journal = None
+            if separation > t0:
+                indices = [self.donnees.index_variables[station][variable] for variable in variables]
+                points = max(2, int(max_points * (min(separation, t1 + 1) - t0) / duree))
+                journal = self.lire_journal(station, indices, t0, min(separation - 1, t1), points)
+            for i, variable in enumerate(variables):
+                if separation <= t1:
+                    points = max(2, int(max_points * (t1 - max(separation, t0)) / duree))
+                    temps, valeurs = self.donnees.serie(station, variable, max(separation, t0), t1, points)
+                else:
+                    temps, valeurs = np.empty(0, dtype=np.int64), np.empty(0)
+                if journal is not None and len(journal[0]):
+                    temps, valeurs = np.concatenate((journal[0], temps)), np.concatenate((journal[1][:, i], valeurs))
+                resultat[station, variable] = temps, valeurs
+        return resultat
+
+    def lire_journal(self, station, indices, t0, t1, max_points):
+        """Retourne (temps, valeurs de forme (n, len(indices))) du journal d'une station entre t0 et t1."""
+        pas = max((t1 - t0) // max(max_points // 2, 1), 1)
+        agregats = pas >= self.pas_agregats * 10**9
+        morceaux = []
+        for jour in range(t0 // NS_PAR_JOUR, t1 // NS_PAR_JOUR + 1):
+            index = self.indexer(station, jour)
+            if index is None:
+                continue
+            if agregats:
+                morceaux.append(index.agregats(t0, t1))
+            else:
+                temps, valeurs = index.lire(t0, t1)
+                morceaux.append((temps, valeurs, valeurs))
+        if not morceaux:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(indices)))
+        temps = np.concatenate([temps for temps, _, _ in morceaux])
+        mins = np.concatenate([mins for _, mins, _ in morceaux])[:, indices]
+        if len(temps) == 0 or (not agregats and len(temps) <= max_points):  # Aucun seau dans la fenêtre, ou peu de points
+            return temps, mins
+        maxs = np.concatenate([maxs for _, _, maxs in morceaux])[:, indices]
+        # Enveloppe : minimum puis maximum de chaque seau de `pas` ns
+        seaux = (temps - t0) // pas
+        debuts = np.flatnonzero(np.r_[True, seaux[1:] != seaux[:-1]])
+        mins, maxs = np.fmin.reduceat(mins, debuts, axis=0), np.fmax.reduceat(maxs, debuts, axis=0)
+        centres = t0 + seaux[debuts] * pas + pas // 2
+        return np.repeat(centres, 2), np.stack((mins, maxs), axis=1).reshape(-1, len(indices))
+
+    def indexer(self, station, jour):
+        """Index du fichier d'une station pour un jour, mis à jour s'il a grandi ; None s'il est absent ou invalide."""
+        chemin = chemin_journal(self.lecteur.dossier, jour, station)
+        try:
+            taille = os.path.getsize(chemin)
+        except OSError:
+            self.index.pop((station, jour), None)
+            return None
+        index = self.index.get((station, jour))
+        if index is None:
+            index = self.index[station, jour] = IndexJournal(pas=self.pas_agregats)
+        if index.taille_fichier != taille:
+            index.actualiser(self.lecteur.projeter(station, jour), taille)
+        return index if index.enregistrements is not None else None
+
+
+class FileBornee:
+    def __init__(self, capacite, politique=PERTE_PLUS_ANCIEN, rappel=None):
+        """File bornée entre des producteurs (threads de réception) et un consommateur ; la capacité se compte en
+        échantillons, chaque élément déposé en représentant un ou plusieurs."""
+        if politique not in POLITIQUES_FILE:
+            raise ValueError(f"Politique de file inconnue : {politique}")
+        self.capacite = capacite
+        self.politique = politique
+        self.rappel = rappel  # Appelé (depuis le producteur) quand un dépôt trouve la file vide
+        self.verrou = Lock()
+        self.non_vide = Condition(self.verrou)  # Consommateur : éléments déposés, producteur bloqué ou file fermée
+        self.non_pleine = Condition(self.verrou)  # Producteurs bloqués : place libérée ou file fermée
+        # Éléments en attente (clé, élément, nombre, instant de dépôt) dans l'ordre de dépôt ; avec FUSION, un par clé
+        self.elements = {} if politique == FUSION else deque()
+        self.nombre = 0  # Échantillons en attente
+        self.bloques = 0  # Producteurs en attente de place
+        self.fermee = False
+        self.deposes = self.retires = self.perdus = self.fusionnes = self.blocages = 0
+        self.nombre_max = 0
+
+    def __len__(self):
+        """Nombre d'échantillons en attente."""
+        return self.nombre
+
+    def deposer(self, element, nombre=1, cle=None, delai=None):
+        """Dépose un élément de `nombre` échantillons ; voir deposer_lot."""
+        if self.politique == FUSION or self.fermee or self.nombre + nombre > self.capacite:
+            return self.deposer_lot(((cle, element, nombre),), delai)
+        # Cas courant, sans fusion ni débordement possibles : ce que fait deposer_lot, sans ses vérifications
+        instant = perf_counter()
+        with self.verrou:
+            if self.fermee or self.nombre + nombre > self.capacite:  # Changé entre-temps : cas général
+                nouveau_lot = None
+            else:
+                nouveau_lot = not self.nombre
+                if nouveau_lot:
+                    self.non_vide.notify_all()
+                self.elements.append((cle, element, nombre, instant))
+                self.nombre += nombre
+                self.deposes += nombre
+                if self.nombre > self.nombre_max:
+                    self.nombre_max = self.nombre
+                if 2 * self.nombre >= self.capacite > 2 * (self.nombre - nombre):  # Vient de passer la moitié
+                    self.non_vide.notify_all()
+        if nouveau_lot is None:
+            return self.deposer_lot(((cle, element, nombre),), delai)
+        if nouveau_lot and self.rappel is not None:
+            self.rappel()
+        return True
+
+    def deposer_lot(self, entrees, delai=None):
+        """Dépose des (clé, élément, nombre) sous un seul verrou, selon la politique de la file.
+
+        Retourne False si le lot a été refusé (file fermée, ou place toujours insuffisante après `delai` secondes
+        avec BLOCAGE) ; ses échantillons sont alors comptés perdus. Un lot plus grand que la capacité entre dans
+        une file vide.
+        """
+        instant = perf_counter()
+        entrees = [(cle, element, nombre, instant) for cle, element, nombre in entrees]
+        total = sum(nombre for _, _, nombre, _ in entrees)
+        with self.verrou:
+            if self.politique == BLOCAGE and self.nombre and self.nombre + total > self.capacite and not self.fermee:
+                self.blocages += 1
+                self.bloques += 1
+                self.non_vide.notify_all()  # Le consommateur peut vider sans attendre sa prochaine échéance
+                self.non_pleine.wait_for(lambda: self.fermee or not self.nombre or self.nombre + total <= self.capacite, delai)
+                self.bloques -= 1
+            if self.fermee or (self.politique == BLOCAGE and self.nombre and self.nombre + total > self.capacite):
+                self.perdus += total
+                return False
+            nouveau_lot = not self.nombre
+            if self.politique == FUSION:
+                for cle, element, nombre, _ in entrees:
+                    ancien = self.elements.get(cle)
+                    if ancien is not None:  # Remplace l'élément en attente, à sa place et avec son instant de dépôt
+                        self.fusionnes += ancien[2]
+                        self.nombre -= ancien[2]
+                        instant = ancien[3]
+                    self.elements[cle] = (cle, element, nombre, instant)
+                    self.nombre += nombre
+            else:
+                self.elements.extend(entrees)
+                self.nombre += total
+            self.deposes += total
+            # Au-delà de la capacité (PERTE_PLUS_ANCIEN, FUSION) : les plus anciens sont jetés, jamais le dernier déposé
+            while self.nombre > self.capacite and len(self.elements) > 1:
+                if self.politique == FUSION:
+                    _, _, nombre, _ = self.elements.pop(next(iter(self.elements)))
+                else:
+                    _, _, nombre, _ = self.elements.popleft()
+                self.nombre -= nombre
+                self.perdus += nombre
+            self.nombre_max = max(self.nombre_max, self.nombre)
+            if nouveau_lot or 2 * self.nombre >= self.capacite:
+                self.non_vide.notify_all()
+        if nouveau_lot and self.rappel is not None:
+            self.rappel()
+        return True
+
+    def retirer_lot(self, maximum=None, attente=None):
+        """Retire d'un coup les éléments en attente (au moins un, puis jusqu'à `maximum` échantillons) ; retourne
+        (éléments, instant de dépôt du plus ancien d'entre eux, ou None). Avec `attente`, attend au plus autant de
+        secondes un premier élément."""
+        with self.verrou:
+            if attente and not self.nombre:
+                self.non_vide.wait_for(lambda: self.nombre or self.fermee, attente)
+            if maximum is None or maximum >= self.nombre:
+                entrees = list(self.elements.values()) if self.politique == FUSION else list(self.elements)
+                self.elements.clear()
+            else:
+                entrees, retires = [], 0
+                while self.elements and (not entrees or retires + self.prochain()[2] <= maximum):
+                    entree = self.elements.pop(next(iter(self.elements))) if self.politique == FUSION else self.elements.popleft()
+                    entrees.append(entree)
+                    retires += entree[2]
+            nombre = sum(nombre for _, _, nombre, _ in entrees)
+            self.nombre -= nombre
+            self.retires += nombre
+            if self.bloques:
+                self.non_pleine.notify_all()
+        # Les éléments laissés dans la file gardent leur propre instant de dépôt pour le lot suivant
+        return [element for _, element, _, _ in entrees], entrees[0][3] if entrees else None
+
+    def prochain(self):
+        """Plus ancienne entrée en attente (verrou tenu)."""
+        return next(iter(self.elements.values())) if self.politique == FUSION else self.elements[0]
+
+    def attendre(self, delai):
+        """Attend au plus `delai` secondes ; rend la main plus tôt si la file est à moitié pleine, si un producteur
+        attend de la place ou si la file est fermée."""
+        with self.verrou:
+            self.non_vide.wait_for(lambda: self.fermee or self.bloques or 2 * self.nombre >= self.capacite, delai)
+
+    def fermer(self):
+        """Refuse les dépôts suivants et libère les producteurs bloqués ; les éléments en attente restent à retirer."""
+        with self.verrou:
+            self.fermee = True
+            self.non_vide.notify_all()
+            self.non_pleine.notify_all()
+
+    def compteurs(self):
+        """Instantané des compteurs de la file (en échantillons)."""
+        with self.verrou:
+            return {"politique": self.politique, "capacite": self.capacite, "en_attente": self.nombre,
+                    "max": self.nombre_max, "deposes": self.deposes, "retires": self.retires, "perdus": self.perdus,
+                    "fusionnes": self.fusionnes, "blocages": self.blocages}
+
+
+class NotificateurDonnees:
+    def __init__(self, rappel=None, capacite=CAPACITE_FILE_NOTIFICATIONS):
+        """Transmet au consommateur les clés (station, variable) modifiées par la réception, fusionnées par clé."""
+        self.file = FileBornee(capacite, FUSION, rappel)  # Le rappel n'est appelé que si aucun lot n'était en attente
+
+    def signaler(self, cles):
+        """Ajoute des clés modifiées ; prévient le consommateur seulement si aucun lot n'était en attente."""
+        self.file.deposer_lot([(cle, cle, 1) for cle in cles])
+
+    def recuperer(self):
+        """Retourne et vide l'ensemble des clés modifiées depuis le dernier appel, avec l'instant de début du lot."""
+        cles, debut = self.file.retirer_lot()
+        return set(cles), debut
+
+
+# Sources d'octets : tout objet avec readline() (b"" si rien n'est arrivé) et close(), comme serial.Serial
+def ouvrir_port_serie(port=PORT_UTILISE, vitesse=VITESSE):
+    """Ouvre le port série de l'Arduino."""
+    import serial
+    return serial.Serial(port, baudrate=vitesse, timeout=1)
+
+
+class GenerateurTrames:
+    def __init__(self, stations, frequence=10.0, graine=None):
+        """Produit des trames valides pour toutes les stations, à `frequence` trames/s (0 : au plus vite)."""
+        self.stations = stations
+        self.periode = 1.0 / frequence if frequence else 0.0
+        self.aleatoire = random.Random(graine)
+        # Marche aléatoire par variable, pour des courbes plausibles
+        self.valeurs = {station: [self.aleatoire.uniform(0, 100) for _ in variables] for station, variables in stations.items()}
+        self.prochaine = perf_counter()
+        self.heure_seconde = None
+        self.heure_texte = ""
+
+    def trame(self):
+        """Construit la prochaine trame "| num | nom | HH:MM:SS | valeurs... | & | ... |"."""
+        maintenant = datetime.now()
+        if maintenant.second != self.heure_seconde:
+            self.heure_seconde, self.heure_texte = maintenant.second, maintenant.strftime("%H:%M:%S")
+        blocs = []
+        for numero, (station, valeurs) in enumerate(self.valeurs.items(), start=1):
+            for k in range(len(valeurs)):
+                valeurs[k] += self.aleatoire.gauss(0, 0.5)
+            blocs.append(f"{numero} | {station} | {self.heure_texte} | " + " | ".join(f"{v:.2f}" for v in valeurs))
+        return "| " + " | & | ".join(blocs) + " |\n"
+
+    def readline(self):
+        """Attend l'instant de la prochaine trame puis la retourne en octets."""
+        if self.periode:
+            attente = self.prochaine - perf_counter()
+            if attente > 0:
+                sleep(attente)
+            self.prochaine = max(self.prochaine + self.periode, perf_counter() - 1.0)  # Pas de rafale après un retard
+        return self.trame().encode('utf-8')
+
+    def close(self):
+        pass
+
+
+class RejeuCapture:
+    def __init__(self, chemin, vitesse=1.0, boucle=False):
+        """Rejoue un fichier de trames enregistrées, à `vitesse` fois le rythme d'origine (0 : au plus vite)."""
+        with open(chemin, "rb") as fichier:
+            self.lignes = [ligne.rstrip(b"\r\n") + b"\n" for ligne in fichier if ligne.strip()]
+        self.vitesse = vitesse
+        self.boucle = boucle
+        self.index = 0
+        self.origine = None  # (heure de la capture en s, instant de rejeu)
+
+    @staticmethod
+    def heure_trame(ligne):
+        """Heure (en secondes) du premier bloc d'une trame, ou None."""
+        champs = ligne.split(b"|")
+        try:
+            heures, minutes, secondes = champs[3].strip().split(b":")
+            return int(heures) * 3600 + int(minutes) * 60 + int(secondes)
+        except (IndexError, ValueError):
+            return None
+
+    def readline(self):
+        """Retourne la trame suivante, au rythme de la capture ; b"" à la fin du fichier."""
+        if self.index >= len(self.lignes):
+            if not self.boucle or not self.lignes:
+                sleep(0.1)
+                return b""
+            self.index, self.origine = 0, None
+        ligne = self.lignes[self.index]
+        self.index += 1
+        heure = self.heure_trame(ligne)
+        if self.vitesse and heure is not None:
+            if self.origine is None or heure < self.origine[0]:  # Début ou passage de minuit
+                self.origine = (heure, perf_counter())
+            attente = self.origine[1] + (heure - self.origine[0]) / self.vitesse - perf_counter()
+            if attente > 0:
+                sleep(attente)
+        return ligne
+
+    def close(self):
+        pass
+
+
+class PortVirtuel:
+    def __init__(self, source):
+        """Fait passer une source par un pseudo-terminal relu avec pyserial, comme le vrai port."""
+        import tty  # Unix seulement, comme les pseudo-terminaux : le module reste importable sous Windows
+        self.source = source
+        self.maitre, self.esclave = os.openpty()
+        tty.setraw(self.esclave)  # Pas d'écho ni de conversion de fin de ligne
+        self.chemin = os.ttyname(self.esclave)
+        self.ser = ouvrir_port_serie(self.chemin)
+        self.running = True
+        self.thread = Thread(target=self.alimenter, daemon=True)
+        self.thread.start()
+
+    def alimenter(self):
+        """Recopie les trames de la source dans le côté maître du pseudo-terminal."""
+        try:
+            while self.running:
+                ligne = self.source.readline()
+                if ligne:
+                    os.write(self.maitre, ligne)
+        except OSError as e:
+            if self.running:
+                print(f"Arrêt du port virtuel : {e}")
+
+    def readline(self):
+        return self.ser.readline()
+
+    def close(self):
+        """Arrête l'alimentation et ferme le pseudo-terminal."""
+        self.running = False
+        self.ser.close()
+        self.source.close()
+        os.close(self.maitre)
+        os.close(self.esclave)
+
+class HorlogeReception:
+    def __init__(self, ancre=None):
+        """Horloge de réception monotone en ns depuis EPOQUE : l'heure murale n'est lue qu'une fois, à la création.
+
+        `ancre` = (temps mural en ns, monotonic_ns() au même instant) ; la transmettre à un autre processus lui donne
+        la même horloge (l'horloge monotone est commune à tout le système).
+        """
+        self.ancre = ancre or (datetime_vers_ns(datetime.now()), monotonic_ns())
+
+    def maintenant(self):
+        """Instant présent sur l'horloge de réception."""
+        return self.ancre[0] + monotonic_ns() - self.ancre[1]
+
+
+DEMI_SECONDE = 5 * 10**8  # Les heures des stations sont à la seconde près
+
+
+class RecalageHorloge:
+    def __init__(self, constante=CONSTANTE_RECALAGE):
+        """Estime en continu l'écart (appareil - réception) d'une station et sa dérive, par moindres carrés à oubli exponentiel."""
+        self.constante = constante * 10**9
+        self.poids = 0.0  # Somme des poids (décroissants avec l'ancienneté) des échantillons retenus
+        self.moyenne_reception = self.moyenne_ecart = 0.0  # ns
+        self.variance = self.covariance = 0.0  # Sommes pondérées des produits d'écarts aux moyennes (façon Welford)
+        self.pente = 0.0  # Dérive estimée, recalculée à chaque échantillon retenu
+        self.derniere = 0  # Réception du dernier échantillon retenu
+        self.dernier_temps = 0  # Dernier temps aligné attribué : les temps alignés ne reviennent jamais en arrière
+        self.ancrage = 0  # Réception de l'échantillon qui a ancré l'estimation
+        self.depuis_ancrage = 0  # Échantillons retenus depuis l'ancrage
+        self.incoherence = None  # (réception, écart) du début d'une série d'échantillons incohérents
+        self.en_retard = 0  # Échantillons écartés de l'estimation : arriéré, ou horloge de la station changée
+        self.recalages = 0
+
+    def derive(self):
+        """Dérive estimée de l'horloge de la station (s/s), nulle tant que les réceptions sont trop groupées."""
+        return self.pente
+
+    def attendu(self, reception):
+        """Écart (appareil - réception) attendu à l'instant `reception`, dérive comprise (0 avant le premier échantillon)."""
+        if not self.poids:
+            return 0
+        return int(self.moyenne_ecart + self.pente * (reception - self.moyenne_reception))
+
+    def retenir(self, reception, ecart, nombre=1):
+        """Intègre `nombre` échantillons reçus au même instant, d'écart moyen `ecart`."""
+        oubli = exp(-max(reception - self.derniere, 0) / self.constante) if self.poids else 0.0
+        ancien = self.poids * oubli
+        self.poids = ancien + nombre
+        part = nombre / self.poids
+        dx, dy = reception - self.moyenne_reception, ecart - self.moyenne_ecart
+        self.moyenne_reception += dx * part
+        self.moyenne_ecart += dy * part
+        self.variance = self.variance * oubli + dx * dx * ancien * part
+        self.covariance = self.covariance * oubli + dx * dy * ancien * part
+        self.derniere = reception
+        self.depuis_ancrage += nombre
+        if self.variance < self.poids * ETALEMENT_DERIVE**2:
+            self.pente = 0.0
+        else:
+            self.pente = min(max(self.covariance / self.variance, -DERIVE_MAX), DERIVE_MAX)
+
+    def ancrer(self, reception, ecart):
+        """Repart d'un seul échantillon, le plus récent ; ceux retenus depuis l'ancrage précédent, plus anciens que
+        lui (arriéré), sont écartés de l'estimation."""
+        self.en_retard += self.depuis_ancrage
+        self.depuis_ancrage = 0
+        self.poids = 0.0
+        self.pente = 0.0
+        self.incoherence = None
+        self.ancrage = reception
+        self.retenir(reception, ecart)
+
+    def provisoire(self, reception, ecart, attendu):
+        """Vrai si l'échantillon doit ancrer l'estimation : premier échantillon, ou plus récent que l'attendu peu après
+        l'ancrage (l'ancre était une trame d'un arriéré, reçu ligne à ligne ou par lots)."""
+        return not self.poids or (ecart > attendu + DEMI_SECONDE and reception - self.ancrage < DUREE_RECALAGE)
+
+    def incoherent(self, reception, ecart):
+        """Suit une série d'échantillons incohérents ; si leur écart reste stable DUREE_RECALAGE durant, l'estimation repart de zéro."""
+        if self.incoherence is None or abs(ecart - self.incoherence[1]) > SEUIL_RETARD:
+            self.incoherence = (reception, ecart)  # Nouvelle série, ou arriéré en train d'être rattrapé
+        elif reception - self.incoherence[0] >= DUREE_RECALAGE:  # L'horloge de la station a changé
+            self.depuis_ancrage = 0  # L'ancienne estimation était juste : ses échantillons n'étaient pas en retard
+            self.ancrer(reception, ecart)
+            self.recalages += 1
+
+    @staticmethod
+    def dater(reception, attendu, heures):
+        """Temps de l'appareil : le jour est celui qui place l'heure au plus près de l'attendu (passages de minuit compris)."""
+        jours = (reception + attendu - heures + NS_PAR_JOUR // 2) // NS_PAR_JOUR
+        return jours * NS_PAR_JOUR + heures
+
+    def horodater(self, reception, heure):
+        """(temps aligné, temps de l'appareil) d'un échantillon reçu à `reception` et daté `heure` (ns depuis minuit, ou None).
+
+        Le temps aligné est l'instant de réception ramené dans la seconde indiquée par la station (convertie sur
+        l'horloge de réception) : précis pour un échantillon reçu aussitôt, fidèle à l'appareil pour un arriéré.
+        Il ne revient jamais en arrière (le stockage en dépend) : un échantillon plus ancien que le précédent prend
+        le temps aligné de celui-ci et ne garde son instant d'origine que dans le temps de l'appareil.
+        """
+        if heure is None:
+            self.dernier_temps = max(reception, self.dernier_temps)
+            return self.dernier_temps, TEMPS_ABSENT
+        attendu = self.attendu(reception)
+        appareil = self.dater(reception, attendu, heure)
+        ecart = appareil - reception
+        if self.provisoire(reception, ecart, attendu):  # Le plus récent ancre l'estimation
+            self.ancrer(reception, ecart)
+            attendu = ecart
+        elif abs(ecart - attendu) <= SEUIL_RETARD:
+            self.incoherence = None
+            self.retenir(reception, ecart)
+        else:
+            self.en_retard += 1
+            self.incoherent(reception, ecart)
+        if ecart > attendu + SEUIL_RETARD:  # En avance : l'heure de la station n'est pas crédible, la réception fait foi
+            temps = reception
+        else:  # Réception ramenée dans la seconde de la station : son instant d'origine pour un arriéré
+            centre = appareil - attendu
+            temps = min(max(reception, centre - DEMI_SECONDE), centre + DEMI_SECONDE)
+        self.dernier_temps = max(temps, self.dernier_temps)
+        return self.dernier_temps, appareil
+
+    def horodater_lot(self, reception, heures):
+        """Équivalent vectorisé de horodater pour des échantillons reçus ensemble (heure illisible : TEMPS_ABSENT),
+        avec la même règle d'ancrage : la trame la plus récente du lot ancre l'estimation, seule."""
+        temps = np.full(len(heures), reception, dtype=np.int64)
+        appareils = np.full(len(heures), TEMPS_ABSENT, dtype=np.int64)
+        lues = np.flatnonzero(heures != TEMPS_ABSENT)
+        if len(lues):
+            heures = heures[lues]
+            attendu = self.attendu(reception)
+            appareil = self.dater(reception, attendu, heures)
+            ecarts = appareil - reception
+            ancre = int(np.argmax(ecarts))
+            ancree = self.provisoire(reception, int(ecarts[ancre]), attendu)
+            if ancree:
+                self.ancrer(reception, int(ecarts[ancre]))
+                attendu = int(ecarts[ancre])
+                appareil = self.dater(reception, attendu, heures)
+                ecarts = appareil - reception
+            coherents = np.abs(ecarts - attendu) <= SEUIL_RETARD
+            centres = appareil - attendu
+            temps[lues] = np.where(ecarts > attendu + SEUIL_RETARD, reception,
+                                   np.clip(reception, centres - DEMI_SECONDE, centres + DEMI_SECONDE))
+            appareils[lues] = appareil
+            if ancree:  # Les autres trames du lot sont plus anciennes que l'ancre : écartées de l'estimation
+                nombre = 1
+            else:
+                nombre = int(np.count_nonzero(coherents))
+                if nombre:
+                    self.retenir(reception, float(ecarts[coherents].mean()), nombre)
+            self.en_retard += len(lues) - nombre
+            if coherents[-1]:
+                self.incoherence = None
+            else:
+                self.incoherent(reception, int(ecarts[-1]))
+        temps = np.maximum.accumulate(np.maximum(temps, self.dernier_temps))
+        self.dernier_temps = int(temps[-1]) if len(temps) else self.dernier_temps
+        return temps, appareils
+
+
+class Horodateur:
+    def __init__(self, horloge=None):
+        """Attribue à chaque échantillon son temps d'appareil (daté) et son temps aligné sur l'horloge de réception."""
+        self.horloge = horloge or HorlogeReception()
+        self.recalages = {}  # Station -> RecalageHorloge, créé à sa première trame
+
+    def recalage(self, station):
+        """Estimation de l'horloge d'une station."""
+        recalage = self.recalages.get(station)
+        if recalage is None:
+            recalage = self.recalages[station] = RecalageHorloge()
+        return recalage
+
+    def horodater(self, station, heure, reception):
+        """(temps aligné, temps de l'appareil) en ns d'un échantillon (heure en ns depuis minuit, ou None)."""
+        return self.recalage(station).horodater(reception, heure)
+
+    def horodater_lot(self, station, heures, reception):
+        """Équivalent vectorisé de horodater pour des échantillons d'une station reçus ensemble."""
+        return self.recalage(station).horodater_lot(reception, heures)
+
+    def etats(self, stations):
+        """Copies des estimations de quelques stations, pour les transmettre à un autre processus."""
+        return {station: copy(self.recalages[station]) for station in stations if station in self.recalages}
+
+    def reprendre(self, etats):
+        """Remplace des estimations par celles tenues ailleurs (processus de décodage), pour la page de diagnostic."""
+        self.recalages.update(etats)
+
+    def texte(self):
+        """Estimations par station, mises en forme pour la page de diagnostic."""
+        lignes = [f"{'Horloge':<12}{'décalage (s)':>14}{'dérive (ppm)':>14}{'en retard':>11}{'recalages':>11}"]
+        maintenant = self.horloge.maintenant()
+        for station, recalage in list(self.recalages.items()):
+            lignes.append(f"{station:<12}{recalage.attendu(maintenant) / 1e9:>14.3f}{recalage.derive() * 1e6:>14.1f}"
+                          f"{recalage.en_retard:>11}{recalage.recalages:>11}")
+        return "\n".join(lignes)
+
+
+# Classe de réception de données
+class ReceptionDonnees:
+    def __init__(self, stations, donnees, notificateur=None, journal=None, source=ouvrir_port_serie, instrumentation=None,
+                 statistiques=None, rechargement=None):
+        """Initialise la réception des données depuis le port série (ou toute autre source d'octets).
+
+        Avec `rechargement` (RechargementHistorique en cours), la source est lue tout de suite mais les trames ne sont
+        rangées qu'à la suite de l'historique rechargé.
+        """
+        self.stations = stations
+        self.ouvrir_source = source  # Fonction sans argument qui ouvre la source
+        self.donnees = donnees
+        self.notificateur = notificateur
+        self.journal = journal
+        self.statistiques = statistiques  # Statistiques glissantes et alertes, tenues à jour à chaque échantillon
+        self.rechargement = rechargement
+        self.instrumentation = instrumentation or Instrumentation(stations)
+        self.analyseur = AnalyseurTrames(stations, self.instrumentation)
+        # Clés (station, variable) précalculées pour les notifications
+        self.cles = {station: [(station, variable) for variable in variables] for station, variables in stations.items()}
+        self.ser = None
+        self.running = True
+        self.horodateur = Horodateur()
+        self.thread = Thread(target=self.reception, daemon=True)
+        self.thread.start()
+
+    def reception(self):
+        """Lit les données du port série et les stocke dans une structure de données."""
+        try:
+            self.ser = self.ouvrir_source()
+            while self.running:
+                data = self.ser.readline()
+                if data:  # Si réception de données :
+                    self.ranger(self.traiter_lignes, [data], self.horodateur.horloge.maintenant())
+        except OSError as e:  # serial.SerialException en dérive
+            print(f"Erreur de connexion au port série: {e}")
+        finally:
+            if self.ser:
+                self.ser.close()
+
+    def ranger(self, traitement, *arguments):
+        """Fait un traitement qui range des échantillons, ou le confie au rechargement en cours qui le fera après."""
+        if self.rechargement is None:
+            traitement(*arguments)
+        else:
+            self.rechargement.ranger(traitement, *arguments)
+
+    def traiter_lignes(self, lignes, reception):
+        """Traite des trames reçues à l'instant `reception` et notifie les clés modifiées."""
+        modifiees = []
+        for ligne in lignes:
+            self.traiter_ligne(ligne, modifiees, reception)
+        if modifiees and self.notificateur is not None:
+            self.notificateur.signaler(modifiees)
+
+    def traiter_ligne(self, data, modifiees, reception):
+        """Décode une trame reçue à l'instant `reception`, range ses échantillons (stockage, statistiques, journal)
+        et ajoute les clés modifiées."""
+        try:
+            decoded_data = data.decode('utf-8').strip()
+        except UnicodeDecodeError:  # Les données ne peuvent pas être décodées
+            self.instrumentation.lignes_illisibles += 1
+            return
+        debut = perf_counter_ns()
+        dic = self.extraction_val_stations_en_dict(decoded_data)
+        self.instrumentation.enregistrer("analyse", (perf_counter_ns() - debut) // 1000)
+        for station, (heure, valeurs) in dic.items():
+            if station in self.stations:
+                temps, appareil = self.horodateur.horodater(station, heure, reception)
+                ligne = self.donnees.ajouter(station, temps, valeurs, appareil)
+                if self.statistiques is not None:
+                    self.statistiques.ajouter(station, temps, ligne)
+                if self.journal is not None:
+                    self.journal.ajouter(station, temps, valeurs, appareil)
+                modifiees.extend(self.cles[station][:len(valeurs)])
+                self.instrumentation.compter(station, "recues")
+
+    def extraction_val_stations_en_dict(self, chaine_carac):
+        """Convertit les données reçues en un dictionnaire organisé par station."""
+        return self.analyseur.analyser(chaine_carac)
+
+    def stop(self):
+        """Arrête le thread de réception des données."""
+        self.running = False
+        if self.thread.is_alive():
+            self.thread.join()
+
+
+class DecoupeurTrames:
+    def __init__(self, longueur_max=LONGUEUR_TRAME_MAX):
+        """Reconstitue les trames (terminées par "\\n") à partir de morceaux d'octets de taille quelconque."""
+        self.reste = b""
+        self.longueur_max = longueur_max
+        self.jetes = 0  # Octets jetés faute de fin de ligne
+
+    def ajouter(self, morceau):
+        """Retourne la liste des trames complètes ; garde le début de la trame suivante pour le prochain morceau."""
+        lignes = (self.reste + morceau).split(b"\n")
+        self.reste = lignes.pop()
+        if len(self.reste) > self.longueur_max:  # Flux sans fin de ligne : on resynchronise au prochain "\n"
+            self.jetes += len(self.reste)
+            self.reste = b""
+        return lignes
+
+    def completes(self, morceau):
+        """Comme ajouter, mais retourne d'un seul tenant les octets des trames complètes (pour le décodage massif)."""
+        tampon = self.reste + morceau
+        fin = tampon.rfind(b"\n") + 1
+        self.reste = tampon[fin:]
+        if len(self.reste) > self.longueur_max:
+            self.jetes += len(self.reste)
+            self.reste = b""
+        return tampon[:fin]
+
+    def vider(self):
+        """Oublie la trame incomplète (après une déconnexion)."""
+        self.reste = b""
+
+
+def analyser_adresse(adresse):
+    """Décompose "tcp://hôte:port", "udp://hôte:port" ou un chemin de port série en (type, cible)."""
+    for schema in ("tcp", "udp"):
+        if adresse.startswith(schema + "://"):
+            hote, _, port = adresse[len(schema) + 3:].rpartition(":")
+            return schema, (hote or "127.0.0.1", int(port))
+    return "serie", adresse
+
+
+async def morceaux_serie(port, vitesse=VITESSE):
+    """Lit un port série non bloquant, réveillé par la boucle quand des octets sont disponibles."""
+    import serial
+    ser = serial.Serial(port, baudrate=vitesse, timeout=0)
+    boucle = asyncio.get_running_loop()
+    pret = asyncio.Event()
+    descripteur = ser.fileno()
+    boucle.add_reader(descripteur, pret.set)
+    try:
+        while True:
+            await pret.wait()
+            pret.clear()
+            morceau = ser.read(TAILLE_LECTURE)  # SerialException si le port a disparu
+            if morceau:
+                yield morceau
+    finally:
+        boucle.remove_reader(descripteur)
+        ser.close()
+
+
+async def morceaux_tcp(hote, port):
+    """Se connecte à une passerelle TCP et lit son flux par gros morceaux, jusqu'à la fermeture."""
+    lecteur, ecrivain = await asyncio.open_connection(hote, port)
+    try:
+        while True:
+            morceau = await lecteur.read(TAILLE_LECTURE)
+            if not morceau:  # Fermeture par la passerelle : reconnexion
+                return
+            yield morceau
+    finally:
+        ecrivain.close()
+
+
+class ProtocoleUDP(asyncio.DatagramProtocol):
+    """Dépose chaque datagramme reçu dans une file asyncio."""
+    def __init__(self, file):
+        self.file = file
+
+    def datagram_received(self, data, adresse):
+        self.file.put_nowait(data)
+
+    def error_received(self, exc):
+        self.file.put_nowait(exc)
+
+
+async def morceaux_udp(hote, port):
+    """Écoute des datagrammes ; chacun contient une ou plusieurs trames complètes."""
+    file = asyncio.Queue()
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: ProtocoleUDP(file), local_addr=(hote, port))
+    try:
+        while True:
+            morceau = await file.get()
+            if isinstance(morceau, Exception):
+                raise morceau
+            yield morceau if morceau.endswith(b"\n") else morceau + b"\n"
+    finally:
+        transport.close()
+
+
+async def morceaux_source(ouvrir):
+    """Adapte une source bloquante (readline/close : simulateur, rejeu...) en la lisant dans un thread auxiliaire."""
+    source = await asyncio.to_thread(ouvrir)
+    try:
+        while True:
+            ligne = await asyncio.to_thread(source.readline)
+            if ligne:
+                yield ligne if ligne.endswith(b"\n") else ligne + b"\n"
+    finally:
+        source.close()
+
+
+def decoder_lot(decodeur, horodateur, tampon, reception):
+    """Décode en bloc des trames complètes reçues à l'instant `reception` ; retourne le lot
+    {station: (temps, valeurs, temps de l'appareil)} et son bilan d'erreurs."""
+    debut = perf_counter_ns()
+    colonnes, erreurs = decodeur.decoder(tampon, horodateur=horodateur, reception=reception)
+    incomplets, malformes = erreurs["incomplets"], erreurs["malformes"]
+    bilan = {
+        "lignes": tampon.count(b"\n"),
+        "analyse_us": (perf_counter_ns() - debut) // 1000,
+        "illisibles": len(erreurs["illisibles"]),
+        "inconnus": len(erreurs["inconnus"]),
+        "erreurs": {station: (len(incomplets.get(station, ())), len(malformes.get(station, ())))
+                    for station in set(incomplets) | set(malformes)},
+    }
+    return colonnes, bilan
+
+
+def ecrire_lot(zone, colonnes):
+    """Copie un lot en colonnes dans une zone partagée ; retourne [(station, n, décalage)] ou None s'il n'y tient pas."""
+    descripteur, decalage = [], 0
+    for station, (temps, valeurs, appareil) in colonnes.items():
+        fin = decalage + temps.nbytes + valeurs.nbytes + appareil.nbytes
+        if fin > zone.size:
+            return None
+        np.ndarray(temps.shape, np.int64, zone.buf, decalage)[:] = temps
+        np.ndarray(valeurs.shape, np.float64, zone.buf, decalage + temps.nbytes)[:] = valeurs
+        np.ndarray(appareil.shape, np.int64, zone.buf, decalage + temps.nbytes + valeurs.nbytes)[:] = appareil
+        descripteur.append((station, len(temps), decalage))
+        decalage = fin
+    return descripteur
+
+
+def contexte_processus():
+    """Contexte multiprocessing sans fork : le processus parent a des threads et peut-être une QApplication,
+    qu'un fork copierait dans un état incohérent. Le serveur "forkserver" ne précharge que ce module, sans Qt."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        contexte = multiprocessing.get_context("forkserver")
+        contexte.set_forkserver_preload([__name__])
+        return contexte
+    return multiprocessing.get_context("spawn")
+
+
+def processus_decodage(stations, numero, entree, sortie, noms_zones, ancre):
+    """Corps d'un processus de décodage : morceaux d'octets reçus -> lots en colonnes déposés en mémoire partagée.
+
+    `ancre` est celle de l'horloge de réception du processus principal : les temps restent sur la même horloge.
+    """
+    zones = [shared_memory.SharedMemory(name=nom) for nom in noms_zones]
+    decodeur = DecodeurMassif(stations)
+    horodateur = Horodateur(HorlogeReception(ancre))
+    decoupeurs = {}  # Un découpeur par entrée : les trames peuvent chevaucher deux morceaux
+    libres = list(range(len(zones)))
+    en_attente = deque()  # Morceaux reçus pendant l'attente d'une zone libre
+    try:
+        while True:
+            message = entree.get()
+            if message is None:
+                break
+            genre, cle, contenu = message
+            if genre == "libre":
+                libres.append(cle)
+            elif genre == "coupure":  # L'entrée a été perdue : la trame incomplète est oubliée
+                decoupeurs.pop(cle, None)
+            else:
+                en_attente.append((cle, contenu))
+            while en_attente and libres:
+                cle, (morceau, reception) = en_attente.popleft()
+                tampon = decoupeurs.setdefault(cle, DecoupeurTrames()).completes(morceau)
+                colonnes, bilan = decoder_lot(decodeur, horodateur, tampon, reception)
+                bilan["horloges"] = horodateur.etats(colonnes)  # Les estimations vivent ici : copiées pour le diagnostic
+                if not colonnes:
+                    sortie.put((numero, None, None, None, bilan))
+                    continue
+                zone = libres.pop()
+                descripteur = ecrire_lot(zones[zone], colonnes)
+                if descripteur is None:  # Lot trop gros pour une zone : envoyé directement, exceptionnellement
+                    libres.append(zone)
+                    sortie.put((numero, None, None, colonnes, bilan))
+                else:
+                    sortie.put((numero, zone, descripteur, None, bilan))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for zone in zones:
+            zone.close()
+
+
+class DecodageDelegue:
+    def __init__(self, stations, nb_processus, traiter_lot, horloge):
+        """Démarre les processus de décodage et le thread qui récupère leurs lots pour `traiter_lot(lot, bilan)`.
+
+        À créer depuis la boucle asyncio de réception : la lecture des entrées y attend quand un processus
+        a déjà MORCEAUX_EN_VOL morceaux en cours, ce qui repousse la contre-pression jusqu'à la source.
+        """
+        self.stations = stations
+        self.traiter_lot = traiter_lot
+        self.boucle = asyncio.get_running_loop()
+        self.places = [asyncio.Semaphore(MORCEAUX_EN_VOL) for _ in range(nb_processus)]
+        contexte = contexte_processus()
+        self.sortie = contexte.Queue()
+        self.entrees, self.zones, self.processus = [], [], []
+        for numero in range(nb_processus):
+            zones = [shared_memory.SharedMemory(create=True, size=TAILLE_ZONE_PARTAGEE) for _ in range(ZONES_PAR_PROCESSUS)]
+            entree = contexte.Queue()
+            processus = contexte.Process(target=processus_decodage, daemon=True,
+                                         args=(stations, numero, entree, self.sortie, [zone.name for zone in zones], horloge.ancre))
+            processus.start()
+            self.entrees.append(entree)
+            self.zones.append(zones)
+            self.processus.append(processus)
+        self.thread = Thread(target=self.recuperation, daemon=True)
+        self.thread.start()
+
+    async def envoyer(self, cle, morceau, reception):
+        """Confie un morceau d'octets de l'entrée n° `cle`, reçu à l'instant `reception`, à son processus
+        (toujours le même, pour garder l'ordre)."""
+        numero = cle % len(self.entrees)
+        await self.places[numero].acquire()
+        self.entrees[numero].put(("morceau", cle, (morceau, reception)))
+
+    def couper(self, cle):
+        """Signale la perte de l'entrée n° `cle`."""
+        self.entrees[cle % len(self.entrees)].put(("coupure", cle, None))
+
+    def recuperation(self):
+        """Lit les lots rendus par les processus, les traite puis libère leur zone partagée."""
+        while True:
+            message = self.sortie.get()
+            if message is None:
+                break
+            numero, zone, descripteur, lot, bilan = message
+            if zone is not None:
+                tampon = self.zones[numero][zone].buf
+                lot = {}
+                for station, n, decalage in descripteur:
+                    nb_variables = len(self.stations[station])
+                    lot[station] = (np.ndarray((n,), np.int64, tampon, decalage),
+                                    np.ndarray((n, nb_variables), np.float64, tampon, decalage + 8 * n),
+                                    np.ndarray((n,), np.int64, tampon, decalage + 8 * n * (1 + nb_variables)))
+            self.traiter_lot(lot or {}, bilan)
+            lot = tampon = None  # Plus aucune vue sur la zone avant de la rendre
+            if zone is not None:
+                self.entrees[numero].put(("libre", zone, None))
+            self.boucle.call_soon_threadsafe(self.places[numero].release)  # Un message rendu par morceau confié
+
+    def fermer(self):
+        """Arrête les processus et le thread, puis libère la mémoire partagée."""
+        for entree in self.entrees:
+            entree.put(None)
+        for processus in self.processus:
+            processus.join(timeout=2)
+            if processus.is_alive():
+                processus.terminate()
+        self.sortie.put(None)
+        self.thread.join()
+        for zones in self.zones:
+            for zone in zones:
+                zone.close()
+                zone.unlink()
+
+
+class ReceptionMultiPorts(ReceptionDonnees):
+    def __init__(self, stations, donnees, notificateur=None, journal=None, entrees=(PORT_UTILISE,), instrumentation=None, processus=0,
+                 statistiques=None, rechargement=None):
+        """Réception depuis plusieurs entrées (ports série, "tcp://hôte:port", "udp://hôte:port" ou sources) dans une seule boucle asyncio.
+
+        Avec `processus` > 0, le décodage est confié à autant de processus (au plus un par entrée) :
+        ce processus ne fait plus que ranger les lots déjà en colonnes.
+        """
+        self.entrees = list(entrees)
+        self.nb_processus = min(processus, len(self.entrees))
+        self.delegue = None
+        self.decodeur = DecodeurMassif(stations)
+        self.boucle = None
+        self.arret = None
+        super().__init__(stations, donnees, notificateur, journal, None, instrumentation, statistiques, rechargement)
+
+    def reception(self):
+        """Corps du thread de réception : fait tourner la boucle asyncio jusqu'à l'arrêt."""
+        asyncio.run(self.executer())
+
+    async def executer(self):
+        """Lance une tâche par entrée et attend la demande d'arrêt."""
+        self.boucle = asyncio.get_running_loop()
+        self.arret = asyncio.Event()
+        if not self.running:  # stop() appelé avant le démarrage de la boucle
+            return
+        if self.nb_processus:
+            self.delegue = DecodageDelegue(self.stations, self.nb_processus, self.ranger_delegue, self.horodateur.horloge)
+        taches = [asyncio.create_task(self.suivre_entree(numero, entree)) for numero, entree in enumerate(self.entrees)]
+        await self.arret.wait()
+        for tache in taches:
+            tache.cancel()
+        await asyncio.gather(*taches, return_exceptions=True)
+        if self.delegue is not None:
+            self.delegue.fermer()
+
+    def ouvrir_entree(self, entree):
+        """Générateur asynchrone de morceaux d'octets pour une entrée."""
+        if callable(entree):
+            return morceaux_source(entree)
+        schema, cible = analyser_adresse(entree)
+        if schema == "tcp":
+            return morceaux_tcp(*cible)
+        if schema == "udp":
+            return morceaux_udp(*cible)
+        return morceaux_serie(cible)
+
+    async def suivre_entree(self, numero, entree):
+        """Lit une entrée en continu ; en cas de perte, retente avec un délai doublé à chaque échec."""
+        nom = entree if isinstance(entree, str) else getattr(entree, "__name__", repr(entree))
+        compteurs = self.instrumentation.connexion(nom)
+        decoupeur = DecoupeurTrames()
+        delai = DELAI_RECONNEXION_MIN
+        while self.running:
+            try:
+                async for morceau in self.ouvrir_entree(entree):
+                    reception = self.horodateur.horloge.maintenant()
+                    compteurs["etat"] = "connecté"
+                    compteurs["octets"] += len(morceau)
+                    delai = DELAI_RECONNEXION_MIN  # Des données sont arrivées : la connexion est saine
+                    if self.delegue is not None:
+                        await self.delegue.envoyer(numero, morceau, reception)
+                        continue
+                    if len(morceau) >= TAILLE_DECODAGE_MASSIF:  # Arriéré : décodage en bloc, rangé en colonnes
+                        self.ranger(self.decoder_lot, decoupeur.completes(morceau), reception)
+                        continue
+                    lignes = [ligne for ligne in decoupeur.ajouter(morceau) if ligne.strip()]
+                    if lignes:
+                        self.ranger(self.traiter_lignes, lignes, reception)
+                compteurs["derniere_erreur"] = "fin du flux"
+            except (OSError, ValueError) as e:  # serial.SerialException dérive de OSError
+                compteurs["derniere_erreur"] = str(e)
+                print(f"Erreur de connexion sur {nom}: {e} (nouvelle tentative dans {delai:g} s)")
+            decoupeur.vider()
+            if self.delegue is not None:
+                self.delegue.couper(numero)
+            compteurs["etat"] = "attente"
+            await asyncio.sleep(delai)
+            delai = min(delai * 2, DELAI_RECONNEXION_MAX)
+            compteurs["reconnexions"] += 1
+
+    def decoder_lot(self, tampon, reception):
+        """Décode en bloc des trames complètes reçues à l'instant `reception` et range le lot."""
+        self.ranger_lot(*decoder_lot(self.decodeur, self.horodateur, tampon, reception))
+
+    def ranger_delegue(self, lot, bilan):
+        """Range un lot rendu par un processus ; gardé pendant le rechargement, il est copié hors de sa zone
+        partagée, rendue au processus dès le retour."""
+        if self.rechargement is not None and not self.rechargement.termine.is_set():
+            lot = {station: tuple(colonne.copy() for colonne in colonnes) for station, colonnes in lot.items()}
+        self.ranger(self.ranger_lot, lot, bilan)
+
+    def ranger_lot(self, lot, bilan):
+        """Range un lot décodé en colonnes (ici ou par un processus, depuis le thread de récupération des lots)."""
+        modifiees = []
+        for station, (temps, valeurs, appareil) in lot.items():
+            self.donnees.ajouter_bloc(station, temps, valeurs, appareil)
+            if self.journal is not None:
+                self.journal.ajouter_bloc(station, temps, valeurs, appareil)
+            if self.statistiques is not None:
+                self.statistiques.ajouter_bloc(station, temps, valeurs)
+            modifiees.extend(self.cles[station])
+            self.instrumentation.compter(station, "recues", len(temps))
+        for station, (perdues, malformees) in bilan["erreurs"].items():
+            self.instrumentation.compter(station, "perdues", perdues)
+            self.instrumentation.compter(station, "malformees", malformees)
+        self.horodateur.reprendre(bilan.get("horloges", {}))  # Décodage délégué : estimations tenues par les processus
+        self.instrumentation.lignes_illisibles += bilan["illisibles"]
+        self.instrumentation.blocs_inconnus += bilan["inconnus"]
+        if bilan["lignes"]:  # Temps moyen par trame, mesuré dans le processus de décodage
+            self.instrumentation.enregistrer("analyse", bilan["analyse_us"] // bilan["lignes"])
+        if modifiees and self.notificateur is not None:
+            self.notificateur.signaler(modifiees)
+
+    def stop(self):
+        """Arrête la boucle asyncio et attend la fin du thread."""
+        self.running = False
+        if self.boucle is not None and self.arret is not None:
+            self.boucle.call_soon_threadsafe(self.arret.set)
+        if self.thread.is_alive():
+            self.thread.join()
+
+
+# Collecteur sans affichage : une zone de mémoire partagée par station, écrite par le collecteur seul et relue par
+# les fenêtres clientes. En-tête int64 : séquence (impaire pendant une écriture), position, taille, compteur de l'anneau
+ENTETE_ZONE = 4
+
+
+def taille_zone(capacite, nb_variables):
+    """Octets d'une zone : en-tête, temps alignés, temps de l'appareil, puis une colonne par variable (anneaux doublés)."""
+    return 8 * (ENTETE_ZONE + 2 * capacite * (2 + nb_variables))
+
+
+def vues_zone(tampon, capacite, nb_variables):
+    """(en-tête, temps, temps de l'appareil, colonnes) : tableaux numpy posés sur le tampon d'une zone, sans copie."""
+    entete = np.ndarray(ENTETE_ZONE, dtype=np.int64, buffer=tampon)
+    temps = np.ndarray(2 * capacite, dtype=np.int64, buffer=tampon, offset=8 * ENTETE_ZONE)
+    appareils = np.ndarray(2 * capacite, dtype=np.int64, buffer=tampon, offset=8 * (ENTETE_ZONE + 2 * capacite))
+    colonnes = np.ndarray((nb_variables, 2 * capacite), dtype=np.float64, buffer=tampon,
+                          offset=8 * (ENTETE_ZONE + 4 * capacite))
+    return entete, temps, appareils, colonnes
+
+
+def champ_entete(indice):
+    """Attribut d'anneau rangé dans l'en-tête de sa zone partagée plutôt que dans l'objet."""
+    return property(lambda self: int(self.entete[indice]), lambda self, valeur: self.entete.__setitem__(indice, valeur))
+
+
+class AnneauPartage(AnneauColonnes):
+    sequence = champ_entete(0)
+    position = champ_entete(1)
+    taille = champ_entete(2)
+    compteur = champ_entete(3)
+
+    def __init__(self, capacite, nb_colonnes, entete, temps, colonnes):
+        """Anneau dont les tableaux et les indices sont en mémoire partagée, lisibles par d'autres processus."""
+        self.entete = entete
+        super().__init__(capacite, nb_colonnes, temps, colonnes)
+
+
+class StockagePartage(StockageAnneau):
+    def __init__(self, stations, capacite=CAPACITE_HISTORIQUE):
+        """StockageAnneau dont les anneaux sont en mémoire partagée ; la séquence qui encadre chaque écriture est celle
+        de l'en-tête, pour que les lecteurs des autres processus détectent aussi une lecture concurrente."""
+        self.zones = {}
+        super().__init__(stations, capacite)
+
+    def creer_anneaux(self, station, nb_variables):
+        """Crée la zone partagée d'une station et y pose ses deux anneaux."""
+        zone = self.zones[station] = shared_memory.SharedMemory(create=True, size=taille_zone(self.capacite, nb_variables))
+        entete, temps, appareils, colonnes = vues_zone(zone.buf, self.capacite, nb_variables)
+        entete[:] = 0
+        colonnes[:] = np.nan
+        return AnneauPartage(self.capacite, nb_variables, entete, temps, colonnes), AnneauColonnes(self.capacite, 0, appareils)
+
+    def description(self):
+        """Ce qu'un client doit savoir pour relire les anneaux : stations, capacité et noms des zones."""
+        return {"stations": self.stations, "capacite": self.capacite,
+                "zones": {station: zone.name for station, zone in self.zones.items()}}
+
+    def fermer(self):
+        """Libère les zones partagées (les clients encore attachés gardent leur projection jusqu'à leur fermeture)."""
+        anneaux = list(self.anneaux.values()) + list(self.appareils.values())
+        self.anneaux, self.appareils = {}, {}
+        del anneaux  # Les vues numpy doivent disparaître avant la fermeture des zones
+        for zone in self.zones.values():
+            zone.close()
+            zone.unlink()
+
+
+class ServeurCollecte:
+    def __init__(self, stockage, chemin=SOCKET_COLLECTEUR):
+        """Accepte les fenêtres clientes sur une socket Unix : description des zones à la connexion, puis un octet par
+        lot de nouvelles données. Un client en retard n'est jamais attendu : il relira tout ce qui manque dans les anneaux."""
+        self.chemin = chemin
+        self.description = (json.dumps(stockage.description(), ensure_ascii=False) + "\n").encode()
+        self.clients = []
+        self.verrou = Lock()
+        if os.path.exists(chemin):  # Socket laissée par un collecteur arrêté brutalement
+            os.unlink(chemin)
+        self.serveur = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.serveur.bind(chemin)
+        self.serveur.listen()
+        self.thread = Thread(target=self.accepter, daemon=True)
+        self.thread.start()
+
+    def accepter(self):
+        """Enregistre les clients au fil de leurs connexions."""
+        while True:
+            try:
+                client, _ = self.serveur.accept()
+            except OSError:  # Serveur fermé
+                return
+            try:
+                client.sendall(self.description)
+                client.setblocking(False)
+            except OSError:
+                client.close()
+                continue
+            with self.verrou:
+                self.clients.append(client)
+
+    def publier(self):
+        """Prévient tous les clients de l'arrivée de nouvelles données ; les clients partis sont oubliés."""
+        with self.verrou:
+            for client in list(self.clients):
+                try:
+                    client.send(b".")
+                except BlockingIOError:  # Notifications précédentes pas encore lues : celle-ci est superflue
+                    pass
+                except OSError:
+                    self.clients.remove(client)
+                    client.close()
+
+    def fermer(self):
+        """Ferme la socket d'écoute et les connexions des clients."""
+        self.serveur.close()
+        with self.verrou:
+            for client in self.clients:
+                client.close()
+            self.clients = []
+        if os.path.exists(self.chemin):
+            os.unlink(self.chemin)
+
+
+class Collecteur:
+    def __init__(self, stations=STATIONS, source=ouvrir_port_serie, chemin=SOCKET_COLLECTEUR,
+                 dossier_historique=DOSSIER_HISTORIQUE, processus=0):
+        """Réception, stockage, statistiques et journal sans interface ; les anneaux sont servis aux fenêtres clientes."""
+        self.stations = {station: list(variables) for station, variables in stations.items()}
+        self.donnees = StockagePartage(self.stations)
+        self.instrumentation = Instrumentation(self.stations)
+        self.statistiques = StatistiquesGlissantes(self.stations)
+        self.nouvelles = Event()
+        self.arret = Event()
+        self.notificateur = NotificateurDonnees(self.nouvelles.set)
+        self.instrumentation.files["notifications"] = self.notificateur.file
+
+        # Historique rechargé en tâche de fond : la réception démarre aussitôt et range ses trames à la suite
+        self.rechargement = RechargementHistorique(self.stations, self.donnees, self.statistiques, dossier_historique,
+                                                   self.notificateur, self.instrumentation)
+        self.journal = JournalBinaire(self.stations, dossier_historique)
+        self.instrumentation.files["journal"] = self.journal.file
+        self.serveur = ServeurCollecte(self.donnees, chemin)
+
+        if processus and not isinstance(source, (list, tuple)):
+            source = [source]
+        if isinstance(source, (list, tuple)):
+            self.reception_donnees = ReceptionMultiPorts(self.stations, self.donnees, self.notificateur, self.journal, source,
+                                                         self.instrumentation, processus, self.statistiques,
+                                                         self.rechargement)
+        else:
+            self.reception_donnees = ReceptionDonnees(self.stations, self.donnees, self.notificateur, self.journal, source,
+                                                      self.instrumentation, self.statistiques, self.rechargement)
+
+    def executer(self, periode_diagnostics=None):
+        """Prévient les clients à chaque lot de données (au plus PERIODE_PUBLICATION) jusqu'à arreter() ;
+        affiche les diagnostics toutes les `periode_diagnostics` secondes si demandé."""
+        prochains_diagnostics = monotonic() + (periode_diagnostics or 0)
+        while not self.arret.is_set():
+            if self.nouvelles.wait(1.0):
+                self.nouvelles.clear()
+                self.notificateur.recuperer()
+                self.serveur.publier()
+                self.arret.wait(PERIODE_PUBLICATION)  # Les données arrivées entre-temps partent avec la notification suivante
+            if periode_diagnostics and monotonic() >= prochains_diagnostics:
+                prochains_diagnostics += periode_diagnostics
+                self.instrumentation.enregistrer("file_journal", len(self.journal.file))
+                print("\n\n".join((self.instrumentation.texte(), self.reception_donnees.horodateur.texte(),
+                                   self.statistiques.texte())), flush=True)
+
+    def arreter(self):
+        """Demande la fin de executer() (utilisable depuis un gestionnaire de signal)."""
+        self.arret.set()
+
+    def fermer(self):
+        """Arrête la réception, écrit le journal et libère la socket et les zones partagées."""
+        self.reception_donnees.stop()
+        self.rechargement.attendre()  # Historique et trames gardées rangés avant de fermer journal et zones
+        self.serveur.publier()  # Derniers échantillons : les clients les relisent avant de voir la connexion fermée
+        self.journal.fermer()
+        self.serveur.fermer()
+        self.donnees.fermer()
+
+
+class ReceptionCollecteur(ReceptionDonnees):
+    def __init__(self, stations, donnees, notificateur=None, chemin=SOCKET_COLLECTEUR, instrumentation=None,
+                 statistiques=None):
+        """Reçoit les données d'un collecteur : à chaque notification, les nouveaux échantillons sont relus dans ses
+        anneaux partagés et rangés d'un bloc (stockage et statistiques locaux ; le journal reste au collecteur)."""
+        self.chemin = chemin
+        self.zones = []
+        self.vues = {}  # Station -> (en-tête, temps, temps de l'appareil, colonnes) de sa zone partagée
+        self.lus = {}  # Station -> compteur de l'anneau partagé déjà relu
+        super().__init__(stations, donnees, notificateur, None, None, instrumentation, statistiques)
+
+    def reception(self):
+        """Se connecte au collecteur, rattrape le contenu de ses anneaux puis suit ses notifications."""
+        try:
+            self.ser = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.ser.connect(self.chemin)
+            self.ser.settimeout(1.0)  # Pour revoir self.running
+            tampon = b""
+            while b"\n" not in tampon:
+                morceau = self.ser.recv(TAILLE_LECTURE)
+                if not morceau:
+                    raise ConnectionError("collecteur arrêté")
+                tampon += morceau
+            self.attacher(json.loads(tampon.split(b"\n", 1)[0]))
+            self.relire()
+            while self.running:
+                try:
+                    if not self.ser.recv(TAILLE_LECTURE):
+                        print("Collecteur arrêté")
+                        return
+                except TimeoutError:
+                    continue
+                self.relire()
+        except (OSError, ValueError) as e:
+            print(f"Erreur de connexion au collecteur {self.chemin}: {e}")
+        finally:
+            if self.ser:
+                self.ser.close()
+
+    def attacher(self, description):
+        """Projette les zones partagées des stations connues des deux côtés."""
+        capacite = description["capacite"]
+        for station, nom in description["zones"].items():
+            if station not in self.stations or len(description["stations"][station]) != len(self.stations[station]):
+                continue
+            zone = shared_memory.SharedMemory(name=nom)
+            # La zone appartient au collecteur : elle ne doit pas être détruite à la sortie de ce processus
+            resource_tracker.unregister(zone._name, "shared_memory")
+            self.zones.append(zone)
+            self.vues[station] = vues_zone(zone.buf, capacite, len(self.stations[station]))
+            self.lus[station] = 0
+
+    def relire(self):
+        """Range les échantillons écrits depuis la dernière lecture, pour toutes les stations, et notifie."""
+        modifiees = []
+        for station, (entete, temps, appareils, colonnes) in self.vues.items():
+            capacite = len(temps) // 2
+            while True:
+                sequence = int(entete[0])
+                if sequence % 2:  # Écriture en cours
+                    sleep(0)
+                    continue
+                position, taille, compteur = (int(valeur) for valeur in entete[1:])
+                nouveaux = compteur - self.lus[station]
+                n = min(nouveaux, taille)
+                fin = position + capacite
+                bloc = temps[fin - n:fin].copy(), colonnes[:, fin - n:fin].T.copy(), appareils[fin - n:fin].copy()
+                if int(entete[0]) == sequence:
+                    break
+            if self.lus[station] and nouveaux > n:  # Client trop lent : les plus anciens ont été écrasés entre-temps
+                self.instrumentation.compter(station, "perdues", nouveaux - n)
+            self.lus[station] = compteur
+            if n <= 0:
+                continue
+            self.donnees.ajouter_bloc(station, *bloc)
+            if self.statistiques is not None:
+                self.statistiques.ajouter_bloc(station, bloc[0], bloc[1])
+            self.instrumentation.compter(station, "recues", n)
+            modifiees.extend(self.cles[station])
+        if modifiees and self.notificateur is not None:
+            self.notificateur.signaler(modifiees)
+
+    def stop(self):
+        """Arrête le thread de réception et détache les zones partagées."""
+        super().stop()
+        self.vues = {}
+        for zone in self.zones:
+            zone.close()
+        self.zones = []
+
+
+def importer_capture(chemin, stations=STATIONS, dossier=DOSSIER_HISTORIQUE, jour=None):
+    """Décode d'un bloc un fichier de trames enregistrées et l'ajoute au journal ; retourne (colonnes, erreurs)."""
+    if os.path.getsize(chemin) == 0:
+        return {}, DecodeurMassif(stations).decoder(b"")[1]
+    with open(chemin, "rb") as fichier, mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as tampon:
+        colonnes, erreurs = DecodeurMassif(stations).decoder(tampon, jour)  # Sans horloge de réception : datée par l'appareil
+    journal = JournalBinaire(stations, dossier, politique=BLOCAGE)  # Import hors réception : tout est écrit, rien n'est jeté
+    for station, (temps, valeurs, appareil) in colonnes.items():
+        journal.ajouter_bloc(station, temps, valeurs, appareil)
+    journal.fermer()
+    return colonnes, erreurs
+
+
+def ajouter_options_reception(parser):
+    """Options communes à la fenêtre et au collecteur : sources, import de captures et décodage délégué."""
+    parser.add_argument("--port", action="append", metavar="ADRESSE",
+                        help="Port série, tcp://hôte:port ou udp://hôte:port ; répétable (défaut : %s)" % PORT_UTILISE)
+    parser.add_argument("--simulateur", type=float, metavar="TRAMES_PAR_S",
+                        help="Génère des trames au lieu de lire le port série (0 : au plus vite)")
+    parser.add_argument("--rejeu", metavar="FICHIER", help="Rejoue un fichier de trames enregistrées")
+    parser.add_argument("--vitesse", type=float, default=1.0, help="Vitesse du rejeu (1, 10... ; 0 : au plus vite)")
+    parser.add_argument("--pty", action="store_true", help="Fait passer la source simulée par un port série virtuel")
+    parser.add_argument("--importer", action="append", default=[], metavar="FICHIER",
+                        help="Ajoute une capture de trames au journal avant le démarrage ; répétable")
+    parser.add_argument("--jour", type=date.fromisoformat, metavar="AAAA-MM-JJ",
+                        help="Jour des trames importées (défaut : aujourd'hui)")
+    parser.add_argument("--processus", type=int, default=0, metavar="N",
+                        help="Décode les trames dans N processus séparés (au plus un par entrée) pour libérer l'interface")
+
+
+def importer_captures(options, stations=STATIONS, dossier=DOSSIER_HISTORIQUE):
+    """Ajoute au journal les captures de --importer et affiche le bilan de chacune."""
+    for capture in options.importer:
+        colonnes, erreurs = importer_capture(capture, stations, dossier, options.jour)
+        en_erreur = np.unique(np.concatenate([erreurs["illisibles"], erreurs["inconnus"], *erreurs["malformes"].values(),
+                                              *erreurs["incomplets"].values()]))
+        detail = ", ".join(str(ligne + 1) for ligne in en_erreur[:10]) + ("..." if len(en_erreur) > 10 else "")
+        print(f"{capture} : {sum(len(t) for t, _, _ in colonnes.values())} échantillons importés, "
+              f"{len(en_erreur)} trames en erreur" + (f" (lignes {detail})" if len(en_erreur) else ""))
+
+
+def creer_source(options, stations):
+    """Retourne la liste des adresses à écouter, ou la fonction qui ouvre la source simulée."""
+    if options.simulateur is None and options.rejeu is None:
+        return options.port or [PORT_UTILISE]
+    if options.rejeu is not None:
+        simulee = lambda: RejeuCapture(options.rejeu, options.vitesse)
+    else:
+        simulee = lambda: GenerateurTrames(stations, options.simulateur)
+    if options.pty:
+        return lambda: PortVirtuel(simulee())
+    return simulee
@@ -0,0 +1,114 @@
+import random
+from datetime import date
+
+import numpy as np
+import pytest
+
+import noyau_meteo
+from noyau_meteo import TEMPS_ABSENT, AnalyseurTrames, DecodeurMassif, dater_heures
+
+STATIONS = {"Rennes": ["a"], "Brest": ["a", "b"], "Vannes": ["a", "b", "c", "d", "e"]}
+JOUR = date(2024, 3, 1)
+
+# Champs plausibles et pièges pour float(), int() et str.strip()
+NUMEROS = ["1", "2", "3", " 1 ", "01", "2.0", "3.9", "+2", "1e0", "0", "4", "-1", "x", "", "nan", "inf", "1_0", "\t3\x0b",
+           "\xa02", "٣", "1e400"]
+HEURES = ["12:34:56", "00:00:00", "23:59:59", "24:00:00", "12:60:00", "1:2:3", " 12:00:01 ", "+1:02:03", "12:00",
+          "12:00:00:00", "ab:cd:ef", "", "١٢:00:00", "12: 00:00", "-0:00:00", "12:34:5६"]
+VALEURS = ["0", "-0", "1.5", "-12.25", "+3.", ".5", "-.5", "1234567", "12345678", "123456789", "0.1", "0.30000000000000004",
+           "1e3", "-2.5E-3", "1_000", "1__0", "_1", "nan", "-inf", "Infinity", "1.2.3", "--1", "+-1", "1-", ".", "-", "",
+           "abc", "0x10", " 7 ", "\t8\x0c", "١٢٫٥", "\xa09", "1" * 16, "9" * 15 + ".5", "0." + "0" * 20 + "1",
+           "123456789012345678901234567890123456789", "3.14159265358979323846", "00000000000000012"]
+ALPHABET = "0123456789 .|&-+e_:nfix\t\xa0é٣"
+
+
+def valeur_aleatoire(aleatoire):
+    """Une valeur : décimal ordinaire le plus souvent, sinon un champ piège."""
+    if aleatoire.random() < 0.7:
+        return f"{aleatoire.uniform(-2000, 2000):.{aleatoire.randint(0, 6)}f}"
+    return aleatoire.choice(VALEURS)
+
+
+def trame_aleatoire(aleatoire):
+    """Une trame d'octets : blocs de stations plus ou moins valides, puis quelques mutations au hasard."""
+    blocs = []
+    for _ in range(aleatoire.choice([0, 1, 2, 3, 3, 4, 6])):
+        numero = aleatoire.choice(NUMEROS) if aleatoire.random() < 0.3 else str(aleatoire.randint(1, len(STATIONS)))
+        heure = aleatoire.choice(HEURES) if aleatoire.random() < 0.3 else \
+            f"{aleatoire.randrange(24):02d}:{aleatoire.randrange(60):02d}:{aleatoire.randrange(60):02d}"
+        champs = [numero, "Nom", heure] + [valeur_aleatoire(aleatoire) for _ in range(aleatoire.randint(0, 7))]
+        if aleatoire.random() < 0.05:  # Bloc incomplet
+            del champs[aleatoire.randint(1, 3):]
+        blocs.append(" | ".join(champs) if aleatoire.random() < 0.9 else "|".join(champs))
+    ligne = "| " + " | & | ".join(blocs) + " |" if aleatoire.random() < 0.95 else " & ".join(blocs)
+    for _ in range(aleatoire.choice([0, 0, 0, 1, 2, 5])):
+        position = aleatoire.randrange(len(ligne) + 1)
+        ligne = ligne[:position] + aleatoire.choice(ALPHABET) + ligne[position + aleatoire.randint(0, 1):]
+    octets = ligne.encode("utf-8")
+    if aleatoire.random() < 0.01:
+        octets = octets[:len(octets) // 2] + b"\xff" + octets[len(octets) // 2:]  # UTF-8 invalide
+    return octets + aleatoire.choice([b"\n", b"\n", b"\n", b"\r\n", b" \n"])
+
+
+def reference(lignes):
+    """Ce que la réception ligne à ligne (AnalyseurTrames) retient de chaque trame, dans le format de DecodeurMassif."""
+    analyseur = AnalyseurTrames(STATIONS)
+    compteurs = analyseur.instrumentation.compteurs
+    echantillons = []
+    erreurs = {"illisibles": [], "inconnus": [], "incomplets": {}, "malformes": {}}
+    for numero_ligne, octets in enumerate(lignes):
+        try:
+            texte = octets.decode("utf-8").strip()
+        except UnicodeDecodeError:
+            erreurs["illisibles"].append(numero_ligne)
+            continue
+        avant = analyseur.instrumentation.blocs_inconnus, {s: dict(c) for s, c in compteurs.items()}
+        for station, (heure, valeurs) in analyseur.analyser(texte).items():
+            valeurs = [v if isinstance(v, float) else np.nan for v in valeurs][:len(STATIONS[station])]
+            valeurs += [np.nan] * (len(STATIONS[station]) - len(valeurs))
+            echantillons.append((station, TEMPS_ABSENT if heure is None else heure, valeurs))
+        erreurs["inconnus"] += [numero_ligne] * (analyseur.instrumentation.blocs_inconnus - avant[0])
+        for station, compteur in compteurs.items():
+            for nature, cle in (("incomplets", "perdues"), ("malformes", "malformees")):
+                nouveaux = compteur[cle] - avant[1][station][cle]
+                erreurs[nature].setdefault(station, []).extend([numero_ligne] * nouveaux)
+    heures = np.array([heure for _, heure, _ in echantillons], dtype=np.int64)
+    dates = dater_heures(heures, JOUR)
+    colonnes = {}
+    for station in STATIONS:
+        garder = np.array([s == station for s, _, _ in echantillons], dtype=bool)
+        if garder.any():
+            valeurs = np.array([v for s, _, v in echantillons if s == station], dtype=np.float64)
+            colonnes[station] = (dates[garder], valeurs, np.where(heures[garder] != TEMPS_ABSENT, dates[garder], TEMPS_ABSENT))
+    return colonnes, erreurs
+
+
+@pytest.mark.parametrize("paquet", [None, 2000])
+def test_differentiel_avec_l_analyseur_ligne_a_ligne(monkeypatch, paquet):
+    """Sur des trames tirées au hasard (valides, abîmées, pièges de float()), le décodage massif retient
+    exactement les mêmes échantillons et signale les mêmes erreurs que l'analyse ligne à ligne."""
+    if paquet is not None:  # Petits paquets : beaucoup de coupures entre paquets
+        monkeypatch.setattr(noyau_meteo, "PAQUET_DECODAGE_MASSIF", paquet)
+    aleatoire = random.Random(2024)
+    lignes = [trame_aleatoire(aleatoire) for _ in range(20000)]
+    attendues, erreurs_attendues = reference(lignes)
+    colonnes, erreurs = DecodeurMassif(STATIONS).decoder(b"".join(lignes), JOUR)
+
+    assert list(colonnes) == list(attendues)
+    for station, (temps, valeurs, appareil) in attendues.items():
+        np.testing.assert_array_equal(colonnes[station][0], temps)
+        np.testing.assert_array_equal(colonnes[station][1], valeurs)  # NaN aux mêmes places, valeurs au bit près
+        np.testing.assert_array_equal(colonnes[station][2], appareil)
+    for nature in ("illisibles", "inconnus"):
+        assert sorted(erreurs[nature].tolist()) == erreurs_attendues[nature]
+    for nature in ("incomplets", "malformes"):
+        attendu = {station: lignes for station, lignes in erreurs_attendues[nature].items() if lignes}
+        assert {station: sorted(indices.tolist()) for station, indices in erreurs[nature].items()} == attendu
+
+
+def test_derniere_ligne_sans_fin_et_tampon_vide():
+    """Une dernière trame sans retour à la ligne est décodée ; un tampon vide ne donne rien."""
+    colonnes, _ = DecodeurMassif(STATIONS).decoder(b"| 1 | R | 00:00:01 | 1.5 |\n| 2 | B | 00:00:02 | 2 | 3 |", JOUR)
+    assert colonnes["Rennes"][1].tolist() == [[1.5]] and colonnes["Brest"][1].tolist() == [[2.0, 3.0]]
+    colonnes, erreurs = DecodeurMassif(STATIONS).decoder(b"", JOUR)
+    assert colonnes == {} and len(erreurs["illisibles"]) == 0
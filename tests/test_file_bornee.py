@@ -0,0 +1,129 @@
+import threading
+from datetime import date
+import time
+
+import numpy as np
+
+from noyau_meteo import BLOCAGE, FUSION, NS_PAR_JOUR, FileBornee, JournalBinaire, LecteurJournal, NotificateurDonnees
+
+
+def test_perte_plus_ancien():
+    """File pleine : les plus anciens sont jetés et comptés ; un élément trop grand entre dans une file vide."""
+    file = FileBornee(5)
+    for i in range(8):
+        assert file.deposer(i)
+    assert file.retirer_lot()[0] == [3, 4, 5, 6, 7]
+    assert (file.deposes, file.retires, file.perdus) == (8, 5, 3)
+    file.deposer("gros", 10)
+    file.deposer("petit")
+    assert file.retirer_lot()[0] == ["petit"]
+
+
+def test_fusion_par_cle():
+    """Le dernier élément d'une clé remplace le précédent à sa place ; le rappel n'est appelé qu'au début d'un lot."""
+    rappels = []
+    file = FileBornee(3, FUSION, lambda: rappels.append(1))
+    file.deposer_lot([("a", "a1", 1), ("b", "b1", 1), ("a", "a2", 1)])
+    file.deposer("b2", cle="b")
+    file.deposer("c1", cle="c")
+    file.deposer("d1", cle="d")
+    assert rappels == [1]
+    assert file.retirer_lot()[0] == ["b2", "c1", "d1"]
+    assert (file.fusionnes, file.perdus) == (2, 1)
+
+
+def test_retrait_par_lots():
+    """Un retrait limité prend au moins un élément, puis tant que le maximum d'échantillons n'est pas dépassé."""
+    file = FileBornee(100)
+    for i in range(10):
+        file.deposer(i, 3)
+    assert file.retirer_lot(maximum=7)[0] == [0, 1]
+    assert file.retirer_lot(maximum=1)[0] == [2]
+    assert len(file) == 21
+
+
+def test_attente_des_elements_laisses_dans_la_file():
+    """Après un retrait partiel, le lot suivant date de son plus ancien dépôt, pas du retrait précédent."""
+    file = FileBornee(100)
+    avant = time.perf_counter()
+    file.deposer("a")
+    file.deposer("b")
+    time.sleep(0.05)
+    _, debut = file.retirer_lot(maximum=1)
+    assert avant <= debut < avant + 0.05
+    _, debut = file.retirer_lot()
+    assert avant <= debut < avant + 0.05
+    assert file.retirer_lot() == ([], None)
+
+
+def test_blocage():
+    """Le producteur attend de la place, le consommateur est réveillé plus tôt ; délai écoulé ou file fermée : refus."""
+    file = FileBornee(4, BLOCAGE)
+    for i in range(4):
+        file.deposer(i)
+    resultats = []
+    producteur = threading.Thread(target=lambda: resultats.append(file.deposer(99)))
+    producteur.start()
+    time.sleep(0.05)
+    assert producteur.is_alive()
+    file.attendre(5)
+    file.retirer_lot(maximum=2)
+    producteur.join(1)
+    assert resultats == [True]
+    assert not file.deposer(6, 2, delai=0.02) and file.perdus == 2
+    file.fermer()
+    assert not file.deposer(7)
+    assert file.retirer_lot()[0] == [2, 3, 99]
+
+
+def test_plusieurs_producteurs_sans_perte():
+    """Avec BLOCAGE, rien n'est perdu et l'ordre de chaque producteur est conservé."""
+    file, n = FileBornee(100, BLOCAGE), 5000
+    producteurs = [threading.Thread(target=lambda k=k: [file.deposer((k, i)) for i in range(n)]) for k in range(4)]
+    for producteur in producteurs:
+        producteur.start()
+    recus = {k: [] for k in range(4)}
+    while sum(map(len, recus.values())) < 4 * n:
+        for k, i in file.retirer_lot(maximum=50, attente=0.1)[0]:
+            recus[k].append(i)
+    for producteur in producteurs:
+        producteur.join()
+    assert all(recus[k] == list(range(n)) for k in range(4)) and file.perdus == 0
+
+
+def test_notificateur():
+    """Les clés signalées sont rendues une fois chacune, avec l'instant de début du lot."""
+    notificateur = NotificateurDonnees()
+    notificateur.signaler([("A", "x"), ("A", "y")])
+    notificateur.signaler([("A", "x")])
+    cles, debut = notificateur.recuperer()
+    assert cles == {("A", "x"), ("A", "y")} and debut is not None
+    assert notificateur.recuperer() == (set(), None)
+
+
+def test_journal_ne_bloque_pas(tmp_path):
+    """Par défaut, une file de journal pleine jette les plus anciens au lieu de bloquer la réception."""
+    journal = JournalBinaire({"A": ["x"]}, str(tmp_path), periode=60, capacite=100)
+    debut = time.perf_counter()
+    for i in range(1000):
+        journal.ajouter("A", 20000 * NS_PAR_JOUR + i, [float(i)])
+    assert time.perf_counter() - debut < 5
+    journal.fermer()
+    compteurs = journal.file.compteurs()
+    temps, valeurs, _ = LecteurJournal({"A": ["x"]}, str(tmp_path)).charger("A", 10)
+    assert compteurs["perdus"] + len(temps) == 1000
+    assert valeurs[-1, 0] == 999.0 and np.all(np.diff(temps) > 0)
+
+
+def test_import_de_capture_complet(tmp_path):
+    """L'import d'une capture plus grande que la file du journal écrit tous les échantillons."""
+    from noyau_meteo import CAPACITE_FILE_JOURNAL, STATIONS, GenerateurTrames, importer_capture
+    stations = STATIONS
+    generateur = GenerateurTrames(stations, 0, graine=0)
+    nombre = CAPACITE_FILE_JOURNAL // len(stations) + 1000  # Au total, plus que la capacité de la file
+    chemin = tmp_path / "capture.txt"
+    chemin.write_bytes(b"".join(generateur.readline() for _ in range(nombre)))
+    colonnes, _ = importer_capture(str(chemin), stations, str(tmp_path / "historique"), jour=date(2024, 1, 1))
+    lecteur = LecteurJournal(stations, str(tmp_path / "historique"))
+    for station, (temps, _, _) in colonnes.items():
+        assert len(lecteur.charger(station, 10)[0]) == len(temps)
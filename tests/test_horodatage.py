@@ -0,0 +1,110 @@
+import time
+
+import numpy as np
+
+from noyau_meteo import (NS_PAR_JOUR, STATIONS as STATIONS_METEO, TEMPS_ABSENT, GenerateurTrames, Horodateur,
+                         ReceptionMultiPorts, StockageAnneau)
+
+STATIONS = {"Rennes": ["x"]}
+MIDI = 1000 * NS_PAR_JOUR + NS_PAR_JOUR // 2  # Réception loin de minuit
+DECALAGE = -3600 * 10**9  # Horloge de la station en retard d'une heure sur la réception
+LATENCE = 50 * 10**6
+
+
+def heure(appareil):
+    """Heure de la station (ns depuis minuit) pour un temps d'appareil."""
+    return appareil % NS_PAR_JOUR
+
+
+def test_trame_en_retard_reste_dans_l_ordre():
+    """Une trame très en retard ne remonte pas le temps aligné : les temps restent triés, les requêtes par
+    fenêtre rendent les bons échantillons et seul le temps de l'appareil garde son instant d'origine."""
+    for par_lot in (False, True):
+        horodateur, donnees = Horodateur(), StockageAnneau(STATIONS)
+        secondes = list(range(90, 106)) + [50] + list(range(106, 111))  # La trame de 50 s arrive après 105 s
+        for rang, seconde in enumerate(secondes):
+            appareil = MIDI + DECALAGE + seconde * 10**9
+            reception = MIDI + (90 + rang) * 10**9 + LATENCE
+            if par_lot:
+                temps, appareils = horodateur.horodater_lot("Rennes", np.array([heure(appareil)]), reception)
+                temps, appareils = int(temps[0]), int(appareils[0])
+            else:
+                temps, appareils = horodateur.horodater("Rennes", heure(appareil), reception)
+            assert appareils == appareil
+            donnees.ajouter("Rennes", temps, [float(seconde)], appareils)
+        temps_ranges = donnees.temps("Rennes")
+        assert (np.diff(temps_ranges) >= 0).all()
+        t0, t1 = MIDI + 95 * 10**9, MIDI + 100 * 10**9 + LATENCE
+        temps, valeurs = donnees.serie("Rennes", "x", t0, t1, 1000)
+        assert valeurs.tolist() == [95.0, 96.0, 97.0, 98.0, 99.0, 100.0]
+        temps, valeurs = donnees.lire_serie("Rennes", "x", MIDI + 40 * 10**9, MIDI + 60 * 10**9, 1000)
+        assert len(valeurs) == 0
+        assert donnees.premier_temps("Rennes") == temps_ranges[0] and donnees.dernier_temps("Rennes") == temps_ranges[-1]
+
+
+def test_arriere_ligne_a_ligne_comme_en_bloc():
+    """Un arriéré vidé à la connexion, reçu ligne à ligne ou d'un bloc : même ancrage sur la trame la plus récente,
+    mêmes trames comptées en retard, mêmes temps pour les trames en direct qui suivent."""
+    fin_arriere = MIDI + DECALAGE + 200 * 10**9
+    appareils = fin_arriere - np.arange(99, -1, -1) * 10**9  # 100 trames, une par seconde
+    reception = fin_arriere - DECALAGE + LATENCE
+    ligne_a_ligne, en_bloc = Horodateur(), Horodateur()
+    temps_arriere = [ligne_a_ligne.horodater("Rennes", heure(int(a)), reception - (99 - k) * 10**6)[0]
+                     for k, a in enumerate(appareils)]
+    en_bloc.horodater_lot("Rennes", heure(appareils), reception)
+    assert all(t <= reception for t in temps_arriere) and temps_arriere == sorted(temps_arriere)
+    for horodateur in (ligne_a_ligne, en_bloc):
+        assert horodateur.recalage("Rennes").en_retard == 99
+        assert abs(horodateur.recalage("Rennes").attendu(reception) - (DECALAGE - LATENCE)) < 10**6
+    for seconde in range(1, 20):  # Direct : une trame par seconde, reçue avec la même latence
+        appareil = fin_arriere + seconde * 10**9
+        temps = [horodateur.horodater("Rennes", heure(appareil), appareil - DECALAGE + LATENCE)
+                 for horodateur in (ligne_a_ligne, en_bloc)]
+        assert temps[0] == temps[1] and abs(temps[0][0] - (appareil - DECALAGE + LATENCE)) <= 5 * 10**8
+    assert ligne_a_ligne.recalage("Rennes").en_retard == en_bloc.recalage("Rennes").en_retard == 99
+
+
+def test_heure_illisible_apres_un_temps_aligne_en_avance():
+    """Une trame sans heure lisible reçoit au moins le dernier temps aligné de sa station, qui peut dépasser
+    l'instant de sa réception."""
+    horodateur = Horodateur()
+    for seconde in range(12):  # Estimation établie : décalage nul
+        horodateur.horodater("Rennes", heure(MIDI + seconde * 10**9), MIDI + seconde * 10**9)
+    reception = MIDI + 12 * 10**9
+    temps, _ = horodateur.horodater("Rennes", heure(reception + 1900 * 10**6), reception)  # Cohérent, en avance
+    assert temps > reception
+    suivant, appareil = horodateur.horodater("Rennes", None, reception + 1)
+    assert suivant >= temps and appareil == TEMPS_ABSENT
+    lot, _ = horodateur.horodater_lot("Rennes", np.array([TEMPS_ABSENT]), reception + 2)
+    assert lot[0] >= suivant
+
+
+def test_estimations_des_processus_de_decodage():
+    """Avec le décodage délégué, l'horodateur de la réception reprend les estimations tenues par les processus."""
+    generateur = GenerateurTrames(STATIONS_METEO, 0, graine=0)
+    lignes = [generateur.readline() for _ in range(50)]
+
+    class Source:
+        def readline(self):
+            if lignes:
+                return lignes.pop(0)
+            time.sleep(0.01)
+            return b""
+
+        def close(self):
+            pass
+
+    donnees = StockageAnneau(STATIONS_METEO)
+    reception = ReceptionMultiPorts(STATIONS_METEO, donnees, entrees=[Source], processus=1)
+    try:
+        station = next(iter(STATIONS_METEO))
+        for _ in range(1000):
+            if len(donnees.temps(station)) == 50:
+                break
+            time.sleep(0.01)
+        assert len(donnees.temps(station)) == 50
+        recalage = reception.horodateur.recalages.get(station)
+        assert recalage is not None and recalage.poids > 0
+        assert any(ligne.startswith(station) for ligne in reception.horodateur.texte().splitlines())
+    finally:
+        reception.stop()
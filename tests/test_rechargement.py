@@ -0,0 +1,65 @@
+import threading
+import time
+
+import numpy as np
+
+from noyau_meteo import (STATIONS, GenerateurTrames, JournalBinaire, RechargementHistorique, ReceptionDonnees,
+                         StatistiquesGlissantes, StockageAnneau)
+
+STATION = next(iter(STATIONS))
+
+
+class SourceFinie:
+    def __init__(self, lignes):
+        """Source qui rend quelques trames puis plus rien (comme un port série muet)."""
+        self.lignes = list(lignes)
+        self.lues = 0
+
+    def readline(self):
+        if self.lues < len(self.lignes):
+            self.lues += 1
+            return self.lignes[self.lues - 1]
+        time.sleep(0.01)
+        return b""
+
+    def close(self):
+        pass
+
+
+def test_reception_pendant_le_rechargement(tmp_path):
+    """La source est lue sans attendre le rechargement ; ses trames sont rangées après l'historique, dans l'ordre."""
+    maintenant = time.time_ns()
+    historique = maintenant - np.arange(3600, 600, -1, dtype=np.int64) * 10**9  # Une trame par seconde, il y a une heure
+    journal = JournalBinaire(STATIONS, str(tmp_path))
+    journal.ajouter_bloc(STATION, historique, np.random.rand(len(historique), len(STATIONS[STATION])))
+    journal.fermer()
+
+    libere = threading.Event()
+
+    class StockageRetenu(StockageAnneau):
+        def ajouter_bloc(self, *arguments):
+            libere.wait(5)  # Rechargement lent
+            super().ajouter_bloc(*arguments)
+
+    donnees, statistiques = StockageRetenu(STATIONS), StatistiquesGlissantes(STATIONS)
+    generateur = GenerateurTrames(STATIONS, 0, graine=0)
+    source = SourceFinie([generateur.readline() for _ in range(20)])
+    rechargement = RechargementHistorique(STATIONS, donnees, statistiques, str(tmp_path))
+    reception = ReceptionDonnees(STATIONS, donnees, source=lambda: source, statistiques=statistiques,
+                                 rechargement=rechargement)
+    try:
+        for _ in range(500):
+            if source.lues == len(source.lignes):
+                break
+            time.sleep(0.01)
+        assert source.lues == len(source.lignes)  # Toute la source lue pendant le rechargement
+        assert len(donnees.temps(STATION)) == 0 and not rechargement.termine.is_set()
+        libere.set()
+        assert rechargement.attendre(5)
+        temps = donnees.temps(STATION)
+        assert len(temps) == len(historique) + 20
+        assert np.array_equal(temps[:len(historique)], historique) and (np.diff(temps) >= 0).all()
+        assert statistiques.resume(STATION)[0][0].sum() > 0
+    finally:
+        libere.set()
+        reception.stop()
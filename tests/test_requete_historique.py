@@ -0,0 +1,43 @@
+import numpy as np
+
+from noyau_meteo import NS_PAR_JOUR, JournalBinaire, RequeteHistorique, StockageAnneau
+
+STATIONS = {"A": ["x", "y"]}
+FIN = 20000 * NS_PAR_JOUR + 12 * 3600 * 10**9  # Midi, pour que les fenêtres restent dans le même jour
+
+
+def ecrire_journal(dossier, temps, valeurs):
+    """Écrit des échantillons de la station A dans le journal d'un dossier."""
+    journal = JournalBinaire(STATIONS, str(dossier))
+    journal.ajouter_bloc("A", temps, valeurs)
+    journal.fermer()
+
+
+def test_fenetre_sans_seau_dans_le_journal(tmp_path):
+    """Une fenêtre large avant le premier enregistrement du jour (par agrégats) ne trouve rien, sans erreur."""
+    temps = FIN - np.arange(3600, 0, -1, dtype=np.int64) * 10**9  # Dernière heure seulement
+    ecrire_journal(tmp_path, temps, np.random.rand(len(temps), 2))
+    requete = RequeteHistorique(StockageAnneau(STATIONS), str(tmp_path))
+    for heures in (6, 24):
+        t1 = FIN - 2 * 3600 * 10**9
+        series = requete.requete([("A", "x"), ("A", "y")], t1 - heures * 3600 * 10**9, t1, 600)
+        for temps_serie, valeurs in series.values():
+            assert len(temps_serie) == len(valeurs) == 0
+
+
+def test_enveloppe_et_brut_du_journal(tmp_path):
+    """Grande fenêtre : enveloppe qui encadre les valeurs ; petite fenêtre : échantillons bruts exacts."""
+    n = 2 * 86400
+    temps = FIN - np.arange(n, 0, -1, dtype=np.int64) * 10**9
+    valeurs = np.column_stack((np.sin(np.arange(n) / 5000.0), np.arange(n, dtype=float)))
+    ecrire_journal(tmp_path, temps, valeurs)
+    requete = RequeteHistorique(StockageAnneau(STATIONS), str(tmp_path))
+
+    t_serie, v_serie = requete.requete([("A", "y")], int(temps[0]), FIN, 600)[("A", "y")]
+    assert len(t_serie) <= 700 and np.all(np.diff(t_serie) >= 0)
+    assert v_serie.min() == valeurs[0, 1] and v_serie.max() == valeurs[-1, 1]
+
+    t0 = int(temps[1000])
+    t_serie, v_serie = requete.requete([("A", "y")], t0, t0 + 100 * 10**9, 600)[("A", "y")]
+    garder = (temps >= t0) & (temps <= t0 + 100 * 10**9)
+    assert np.array_equal(t_serie, temps[garder]) and np.array_equal(v_serie, valeurs[garder, 1])
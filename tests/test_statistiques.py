@@ -0,0 +1,49 @@
+import numpy as np
+
+from noyau_meteo import StatistiquesStation
+
+DUREES = [60, 600, 3600]
+
+
+def echantillons(aleatoire, nombre, depart=10**12):
+    """Temps croissants (quelques trames par seconde, parfois des trous) et valeurs à une décimale, avec des NaN."""
+    temps = depart + np.cumsum(aleatoire.integers(0, 7 * 10**8, nombre))
+    valeurs = aleatoire.normal(size=(nombre, 3)).round(1)
+    valeurs[aleatoire.random((nombre, 3)) < 0.2] = np.nan
+    return temps, valeurs
+
+
+def secondes_des_files(statistiques, files):
+    """Secondes des candidates de chaque file (les numéros dépendent des secondes sautées au rechargement)."""
+    return [[int(statistiques.secondes[numero % statistiques.capacite]) for numero in file] for par_variable in files
+            for file in par_variable]
+
+
+def test_rechargement_en_bloc_comme_echantillon_par_echantillon():
+    """Un long bloc (rechargement de l'historique) donne les mêmes statistiques et les mêmes files de minimums
+    et maximums que les mêmes échantillons reçus un par un, y compris pour les échantillons qui suivent."""
+    aleatoire = np.random.default_rng(1)
+    temps, valeurs = echantillons(aleatoire, 20000)
+    suite, valeurs_suite = echantillons(aleatoire, 500, temps[-1])
+    en_bloc, un_par_un = StatistiquesStation(3, DUREES), StatistiquesStation(3, DUREES)
+    en_bloc.ajouter_bloc(temps, valeurs)
+    for t, ligne in zip(temps, valeurs):
+        un_par_un.ajouter(t, ligne.tolist())
+    for etape in range(2):
+        for attendu, obtenu in zip(un_par_un.resume(), en_bloc.resume()):
+            np.testing.assert_allclose(obtenu, attendu, rtol=1e-9, atol=1e-12)
+        assert secondes_des_files(en_bloc, en_bloc.files_min) == secondes_des_files(un_par_un, un_par_un.files_min)
+        assert secondes_des_files(en_bloc, en_bloc.files_max) == secondes_des_files(un_par_un, un_par_un.files_max)
+        for t, ligne in zip(suite, valeurs_suite):
+            en_bloc.ajouter(t, ligne.tolist())
+            un_par_un.ajouter(t, ligne.tolist())
+
+
+def test_seconde_en_cours_copiee():
+    """La seconde en cours ne dépend pas du tampon de l'appelant (zone partagée recyclée, journal projeté)."""
+    statistiques = StatistiquesStation(1, DUREES)
+    tampon = np.array([[1.0], [2.0], [3.0]])
+    statistiques.ajouter_bloc(np.array([0, 10**9, 10**9 + 1]), tampon)
+    tampon[:] = 100.0
+    comptes, moyennes, _, mins, maxs = statistiques.resume()
+    assert comptes[0, 0] == 3 and moyennes[0, 0] == 2.0 and (mins[0, 0], maxs[0, 0]) == (1.0, 3.0)
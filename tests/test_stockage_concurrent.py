@@ -0,0 +1,52 @@
+import threading
+
+import numpy as np
+
+from noyau_meteo import StockageAnneau
+
+
+def stockage_plein():
+    """Stockage d'une station dont l'anneau de 10 échantillons (temps 0 à 9, valeur = temps) est plein."""
+    stockage = StockageAnneau({"A": ["x"]}, capacite=10)
+    stockage.ajouter_bloc("A", np.arange(10, dtype=np.int64), np.arange(10, dtype=float)[:, None])
+    return stockage
+
+
+def test_lecture_traversee_par_une_ecriture():
+    """Une lecture pendant laquelle la réception écrit est recommencée : temps et valeurs restent appariés."""
+    stockage = stockage_plein()
+    lire_serie, appels = stockage.lire_serie, []
+
+    def lire_pendant_une_ecriture(*arguments):
+        appels.append(arguments)
+        resultat = lire_serie(*arguments)
+        if len(appels) == 1:
+            stockage.ajouter("A", 10, [10.0])  # Le thread de réception écrit au milieu de la lecture
+        return resultat
+
+    stockage.lire_serie = lire_pendant_une_ecriture
+    temps, valeurs = stockage.serie("A", "x", 1, 100, 100)
+    assert len(appels) == 2
+    assert list(temps) == list(range(1, 11)) and np.array_equal(valeurs, temps.astype(float))
+
+
+def test_premier_temps_attend_la_fin_de_l_ecriture():
+    """Pendant une écriture, l'élément 0 de l'anneau plein contient déjà le nouveau temps : la lecture attend."""
+    stockage = stockage_plein()
+    anneau = stockage.anneaux["A"]
+    ajouter, lus, lecteurs = anneau.ajouter, [], []
+
+    def ajouter_lentement(temps, ligne):
+        ajouter(temps, ligne)
+        anneau.position = (anneau.position - 1) % anneau.capacite  # Temps écrit, position pas encore avancée
+        lecteur = threading.Thread(target=lambda: lus.append((stockage.premier_temps("A"), stockage.dernier_temps("A"))))
+        lecteur.start()
+        lecteur.join(0.05)
+        assert lecteur.is_alive()  # Séquence impaire : le lecteur attend la fin de l'écriture
+        anneau.position = (anneau.position + 1) % anneau.capacite
+        lecteurs.append(lecteur)
+
+    anneau.ajouter = ajouter_lentement
+    stockage.ajouter("A", 10, [10.0])
+    lecteurs[0].join()
+    assert lus == [(1, 10)]